@@ -0,0 +1,156 @@
+"""
+Microbenchmark for the agent_outputs reducer (state.merge_agent_outputs).
+
+Replays one decision cycle's agent_outputs updates (ingestion reset, the four
+agents, execution) through the reducer the way LangGraph applies them, for:
+- before: the reducer as it was (copies on every update, including empty
+  ones), execution_node re-sending the whole dict, and the streaming
+  consumer's hand-merge loop over every node's output
+- after: state.merge_agent_outputs with delta-only node updates; the final
+  state is LangGraph's last "values" chunk, so there is no consumer merge
+
+Latency is time.perf_counter() over many cycles with tracing off; memory is
+the tracemalloc peak of a single cycle (max over a few traced cycles).
+
+Run with:
+    python benchmarks/bench_state_merge.py [--iterations 200000] [--repeats 5]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from records import DemandOutput, ExecutionOutput, InventoryOutput, LogisticsOutput, RiskOutput
+from state import merge_agent_outputs
+
+
+# ================================================================
+# ONE CYCLE'S OUTPUTS
+# ================================================================
+
+# Records are immutable and shared by both paths; only the dict handling differs
+DEMAND = DemandOutput(demand_risk='HIGH', reasoning='Stock below reorder point')
+INVENTORY = InventoryOutput(action='REORDER', quantity=150, reasoning='Reorder to target level')
+RISK = RiskOutput(supplier_risk='LOW', logistics_risk='HIGH', reasoning='Two shipments overdue')
+LOGISTICS = LogisticsOutput(expedite=True, reasoning='Expedite: logistics risk is high')
+EXECUTION = ExecutionOutput(executed=True, message='PO created', po_id=1, log_id=1)
+
+AGENT_UPDATES = (
+    ('demand_agent', 'demand', DEMAND),
+    ('inventory_agent', 'inventory', INVENTORY),
+    ('risk_agent', 'risk', RISK),
+    ('logistics_agent', 'logistics', LOGISTICS),
+)
+
+
+# ================================================================
+# BEFORE / AFTER
+# ================================================================
+
+def previous_merge_agent_outputs(left: dict, right: dict | None) -> dict:
+    """The reducer before delta-only updates: copies even when a side is empty."""
+    if right is None:
+        return left
+    return {**left, **right}
+
+
+def cycle_before() -> dict:
+    channel = {}
+    node_outputs = [('ingest_data', {'agent_outputs': {}})]
+    channel = previous_merge_agent_outputs(channel, {})
+
+    for node_name, key, output in AGENT_UPDATES:
+        update = {key: output}
+        channel = previous_merge_agent_outputs(channel, update)
+        node_outputs.append((node_name, {'agent_outputs': update}))
+
+    # execution_node returned the whole dict plus its own entry
+    update = {**channel, 'execution': EXECUTION}
+    channel = previous_merge_agent_outputs(channel, update)
+    node_outputs.append(('execute', {'agent_outputs': update}))
+
+    # Streaming consumer rebuilt the final state by hand
+    final_state = {'agent_outputs': {}}
+    for node_name, node_output in node_outputs:
+        for key, value in node_output.items():
+            if key == 'agent_outputs' and key in final_state:
+                final_state['agent_outputs'].update(value)
+            else:
+                final_state[key] = value
+    return final_state['agent_outputs']
+
+
+def cycle_after() -> dict:
+    channel = {}
+    channel = merge_agent_outputs(channel, {})
+
+    for _, key, output in AGENT_UPDATES:
+        channel = merge_agent_outputs(channel, {key: output})
+
+    channel = merge_agent_outputs(channel, {'execution': EXECUTION})
+
+    # The final state is the last "values" chunk: the channel itself
+    return channel
+
+
+CASES = (('before', cycle_before), ('after', cycle_after))
+
+
+# ================================================================
+# MEASUREMENT
+# ================================================================
+
+def time_per_cycle(cycle, iterations: int) -> float:
+    """Mean seconds per cycle over `iterations` cycles."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        cycle()
+    return (time.perf_counter() - start) / iterations
+
+
+def peak_bytes_per_cycle(cycle, repeats: int = 100) -> int:
+    """Largest tracemalloc peak of a single cycle."""
+    cycle()   # warm up (interned strings, caches) outside the trace
+    peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(repeats):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            cycle()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def parse_args(argv=None):
+    """Parse CLI options."""
+    parser = argparse.ArgumentParser(description="Benchmark the agent_outputs reducer over one cycle's updates")
+    parser.add_argument('--iterations', type=int, default=200_000, help="Cycles per timing run (default 200000)")
+    parser.add_argument('--repeats', type=int, default=5, help="Timing runs per case; best and worst are shown (default 5)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    expected = cycle_after()
+    for name, cycle in CASES:
+        assert cycle() == expected, f"{name} path produced different agent_outputs"
+
+    print(f"agent_outputs updates per cycle: {len(AGENT_UPDATES) + 2} "
+          f"({args.iterations:,} cycles x {args.repeats} runs)")
+    for name, cycle in CASES:
+        runs = [time_per_cycle(cycle, args.iterations) for _ in range(args.repeats)]
+        peak = peak_bytes_per_cycle(cycle)
+        print(f"  {name:<6} {min(runs) * 1e6:.2f}-{max(runs) * 1e6:.2f} us/cycle, {peak} B peak allocation")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,8 @@
 from state import SupplyChainState
-from llm_config import get_llm
+from llm_config import invoke_llm
+from explanations import explanations_deferred
+from supplier_index import SupplierRanking
+from records import DecisionDetails, FinalDecision
 
 
 async def coordinator_agent_node(state: SupplyChainState) -> dict:
@@ -12,28 +15,47 @@ async def coordinator_agent_node(state: SupplyChainState) -> dict:
     - Final decision is made with full explanation
     
     LLM handles conflict resolution and step-by-step reasoning.
+    
+    With EXPLANATION_MODE=deferred the coordination rules are applied
+    directly (see direct_decision) and the LLM only explains the decision,
+    after the cycle (see explanations.py).
     """
     snapshot = state['db_snapshot']
     agent_outputs = state['agent_outputs']
     
-    # Extract all agent recommendations
-    demand_output = agent_outputs.get('demand', {})
-    inventory_output = agent_outputs.get('inventory', {})
-    risk_output = agent_outputs.get('risk', {})
-    logistics_output = agent_outputs.get('logistics', {})
+    if explanations_deferred():
+        # Follow the coordination rules directly; the narrative comes later
+        return {'final_decision': rule_based_decision(state)}
+    
+    # Extract all agent recommendations (None if an agent produced no output)
+    demand_output = agent_outputs.get('demand')
+    inventory_output = agent_outputs.get('inventory')
+    risk_output = agent_outputs.get('risk')
+    logistics_output = agent_outputs.get('logistics')
     
     # Get current state
-    current_qty = snapshot['inventory']['quantity']
-    reorder_point = snapshot['inventory']['reorder_point']
-    suppliers = snapshot['suppliers']
+    current_qty = snapshot.inventory.quantity
+    reorder_point = snapshot.inventory.reorder_point
+    suppliers = snapshot.suppliers
+    
+    # Ranked shortlist from the catalog's supplier index (built here if absent)
+    candidates = snapshot.supplier_candidates or SupplierRanking(suppliers).candidates()
+    most_reliable = candidates.most_reliable
+    fastest = candidates.fastest
     
-    # Format supplier options
+    # Format supplier options: only the Pareto frontier of reliability vs lead time.
+    # Any other supplier is both less reliable and slower than one listed here.
     supplier_options = "\n".join([
-        f"  • Supplier {s['id']} ({s['name']}): "
-        f"reliability {s['reliability_score']:.0%}, "
-        f"lead time {s['lead_time_days']} days"
-        for s in suppliers
+        f"  • Supplier {s.id} ({s.name}): "
+        f"reliability {s.reliability_score:.0%}, "
+        f"lead time {s.lead_time_days} days"
+        for s in candidates.frontier
     ])
+    if most_reliable:
+        supplier_options += (
+            f"\n\n  Highest reliability: Supplier {most_reliable.id}"
+            f"\n  Shortest lead time: Supplier {fastest.id}"
+        )
     
     # Build comprehensive coordination prompt
     prompt = f"""You are the coordination agent for a supply chain control tower.
@@ -48,24 +70,24 @@ CURRENT STATE:
 AGENT RECOMMENDATIONS:
 
 1. DEMAND AGENT:
-   - Demand risk: {demand_output.get('demand_risk', 'N/A')}
-   - Reasoning: {demand_output.get('reasoning', 'N/A')}
+   - Demand risk: {getattr(demand_output, 'demand_risk', 'N/A')}
+   - Reasoning: {getattr(demand_output, 'reasoning', 'N/A')}
 
 2. INVENTORY AGENT:
-   - Action: {inventory_output.get('action', 'N/A')}
-   - Quantity: {inventory_output.get('quantity', 0)} units
-   - Reasoning: {inventory_output.get('reasoning', 'N/A')}
+   - Action: {getattr(inventory_output, 'action', 'N/A')}
+   - Quantity: {getattr(inventory_output, 'quantity', 0)} units
+   - Reasoning: {getattr(inventory_output, 'reasoning', 'N/A')}
 
 3. RISK AGENT:
-   - Supplier risk: {risk_output.get('supplier_risk', 'N/A')}
-   - Logistics risk: {risk_output.get('logistics_risk', 'N/A')}
-   - Reasoning: {risk_output.get('reasoning', 'N/A')}
+   - Supplier risk: {getattr(risk_output, 'supplier_risk', 'N/A')}
+   - Logistics risk: {getattr(risk_output, 'logistics_risk', 'N/A')}
+   - Reasoning: {getattr(risk_output, 'reasoning', 'N/A')}
 
 4. LOGISTICS AGENT:
-   - Expedite shipping: {logistics_output.get('expedite', False)}
-   - Reasoning: {logistics_output.get('reasoning', 'N/A')}
+   - Expedite shipping: {getattr(logistics_output, 'expedite', False)}
+   - Reasoning: {getattr(logistics_output, 'reasoning', 'N/A')}
 
-AVAILABLE SUPPLIERS:
+CANDIDATE SUPPLIERS (best reliability / lead-time trade-offs of {len(suppliers)} suppliers):
 {supplier_options}
 
 COORDINATION RULES:
@@ -105,21 +127,22 @@ REASONING: [Step-by-step explanation covering:
 """
     
     # Invoke LLM for coordination
-    llm = get_llm()
-    response = llm.invoke(
+    response = await invoke_llm(
     prompt,
+    agent="coordinator",
     config={
         "run_name": "coordinator_agent_final_decision",
         "tags": ["coordinator", "decision_synthesis", "conflict_resolution"],
         "metadata": {
             "agent": "coordinator",
             "num_agent_inputs": len(agent_outputs),
-            "demand_risk": demand_output.get('demand_risk'),
-            "inventory_action": inventory_output.get('action'),
-            "supplier_risk": risk_output.get('supplier_risk'),
-            "logistics_risk": risk_output.get('logistics_risk'),
-            "expedite_recommended": logistics_output.get('expedite'),
+            "demand_risk": getattr(demand_output, 'demand_risk', None),
+            "inventory_action": getattr(inventory_output, 'action', None),
+            "supplier_risk": getattr(risk_output, 'supplier_risk', None),
+            "logistics_risk": getattr(risk_output, 'logistics_risk', None),
+            "expedite_recommended": getattr(logistics_output, 'expedite', None),
             "num_suppliers_available": len(suppliers),
+            "num_supplier_candidates": len(candidates.frontier),
             "critical_decision": True  # Coordinator makes final call
         }
     }
@@ -153,14 +176,14 @@ REASONING: [Step-by-step explanation covering:
                     supplier_id = int(parts.split()[0])
                 except:
                     # Default to highest reliability supplier
-                    supplier_id = max(suppliers, key=lambda s: s['reliability_score'])['id']
+                    supplier_id = most_reliable.id if most_reliable else None
             
             elif "QUANTITY:" in line_upper:
                 parts = line.split(':')[1].strip()
                 try:
                     quantity = int(parts.split()[0])
                 except:
-                    quantity = inventory_output.get('quantity', 0)
+                    quantity = getattr(inventory_output, 'quantity', 0)
             
             elif "EXPEDITE:" in line_upper:
                 expedite = "TRUE" in line_upper
@@ -171,24 +194,150 @@ REASONING: [Step-by-step explanation covering:
     
     except Exception as e:
         # Fallback: use agent recommendations directly
-        if inventory_output.get('action') == 'REORDER':
-            decision_type = "REORDER"
-            quantity = inventory_output.get('quantity', 0)
-            supplier_id = max(suppliers, key=lambda s: s['reliability_score'])['id']
-            expedite = logistics_output.get('expedite', False)
+        if getattr(inventory_output, 'action', None) == 'REORDER':
+            decision_type, details = direct_decision(inventory_output, logistics_output, risk_output, candidates)
+            supplier_id, quantity, expedite = details.supplier_id, details.quantity, details.expedite
         explanation = f"Coordination parsing failed. Using direct agent outputs. Error: {str(e)}\n\n{response_text}"
     
     # Build final decision structure
-    final_decision = {
-        'decision_type': decision_type,
-        'details': {
-            'supplier_id': supplier_id,
-            'quantity': quantity,
-            'expedite': expedite
-        },
-        'explanation': explanation
-    }
+    final_decision = FinalDecision(
+        decision_type=decision_type,
+        details=DecisionDetails(
+            supplier_id=supplier_id,
+            quantity=quantity,
+            expedite=expedite
+        ),
+        explanation=explanation
+    )
     
     return {
         'final_decision': final_decision
     }
+
+
+def select_supplier(risk_output, candidates):
+    """
+    Supplier the coordination rules pick: the most reliable one, or the one
+    with the shortest lead time when logistics risk is HIGH.
+    """
+    if getattr(risk_output, 'logistics_risk', None) == 'HIGH' and candidates.fastest:
+        return candidates.fastest
+    return candidates.most_reliable
+
+
+def direct_decision(inventory_output, logistics_output, risk_output, candidates) -> tuple[str, DecisionDetails]:
+    """
+    Decision taken straight from agent recommendations by the coordination
+    rules: the inventory agent's action and quantity, the supplier chosen by
+    select_supplier and the logistics agent's expedite flag.
+    """
+    if getattr(inventory_output, 'action', None) != 'REORDER':
+        return "HOLD", DecisionDetails(supplier_id=None, quantity=0, expedite=False)
+    supplier = select_supplier(risk_output, candidates)
+    return "REORDER", DecisionDetails(
+        supplier_id=supplier.id if supplier else None,
+        quantity=getattr(inventory_output, 'quantity', 0),
+        expedite=getattr(logistics_output, 'expedite', False)
+    )
+
+
+def templated_decision_explanation(decision_type: str, details: DecisionDetails, risk_output=None) -> str:
+    """Explanation of a direct decision without the LLM."""
+    if decision_type == "REORDER":
+        if getattr(risk_output, 'logistics_risk', None) == 'HIGH':
+            supplier = "logistics risk is HIGH, so the supplier with the shortest lead time"
+        else:
+            supplier = "the most reliable supplier"
+        return (
+            f"The inventory agent recommends reordering {details.quantity} units; {supplier} "
+            f"(#{details.supplier_id}) is selected and expedite={details.expedite} follows the "
+            f"logistics agent."
+        )
+    return "The inventory agent recommends HOLD."
+
+
+def rule_based_decision(state: SupplyChainState, fallback: bool = False) -> FinalDecision:
+    """
+    Direct decision from agent outputs, with a templated explanation.
+    
+    Args:
+        state: Graph state with the snapshot and agent outputs
+        fallback: True when used because the coordinator missed its deadline
+                  (escalated for review); False for deferred explanations
+                  (narrative generated after the cycle)
+    """
+    snapshot = state['db_snapshot']
+    agent_outputs = state['agent_outputs']
+    candidates = snapshot.supplier_candidates or SupplierRanking(snapshot.suppliers).candidates()
+    
+    risk_output = agent_outputs.get('risk')
+    decision_type, details = direct_decision(
+        agent_outputs.get('inventory'), agent_outputs.get('logistics'), risk_output, candidates
+    )
+    explanation = templated_decision_explanation(decision_type, details, risk_output)
+    if fallback:
+        explanation = "Deadline exceeded; decision taken directly from agent outputs. " + explanation
+    
+    return FinalDecision(
+        decision_type=decision_type,
+        details=details,
+        explanation=explanation,
+        fallback=fallback,
+        explanation_pending=not fallback
+    )
+
+
+def decision_explanation_prompt(snapshot, agent_outputs, final_decision: FinalDecision) -> str:
+    """Prompt asking the LLM to explain a decision that has already been executed."""
+    demand_output = agent_outputs.get('demand')
+    inventory_output = agent_outputs.get('inventory')
+    risk_output = agent_outputs.get('risk')
+    logistics_output = agent_outputs.get('logistics')
+    details = final_decision.details
+    
+    supplier = next((s for s in snapshot.suppliers if s.id == details.supplier_id), None)
+    if supplier:
+        supplier_line = (
+            f"Supplier {supplier.id} ({supplier.name}): reliability {supplier.reliability_score:.0%}, "
+            f"lead time {supplier.lead_time_days} days"
+        )
+    else:
+        supplier_line = "N/A"
+    
+    return f"""You are the coordination agent for a supply chain control tower.
+
+A procurement decision has ALREADY been taken by the coordination rules
+and executed. Your task is ONLY to explain it for the decision log.
+
+CURRENT STATE:
+- Current inventory: {snapshot.inventory.quantity} units
+- Reorder point: {snapshot.inventory.reorder_point} units
+
+AGENT RECOMMENDATIONS:
+- Demand risk: {getattr(demand_output, 'demand_risk', 'N/A')}
+- Inventory action: {getattr(inventory_output, 'action', 'N/A')} ({getattr(inventory_output, 'quantity', 0)} units)
+- Supplier risk: {getattr(risk_output, 'supplier_risk', 'N/A')}
+- Logistics risk: {getattr(risk_output, 'logistics_risk', 'N/A')}
+- Expedite recommended: {getattr(logistics_output, 'expedite', False)}
+
+DECISION TAKEN:
+- Decision: {final_decision.decision_type}
+- Supplier: {supplier_line}
+- Quantity: {details.quantity} units
+- Expedite: {details.expedite}
+
+Explain step by step why this decision follows from the agent
+recommendations, which risks are accepted or mitigated, and how any
+conflicts between agents were resolved. Do NOT change the decision or
+suggest alternatives.
+"""
+
+
+def coordinator_fallback(state: SupplyChainState) -> dict:
+    """
+    Direct decision from agent outputs, used when the coordinator misses its
+    deadline (same rule as the parsing-failure fallback above).
+    """
+    return {
+        'final_decision': rule_based_decision(state, fallback=True)
+    }
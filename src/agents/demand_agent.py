@@ -1,5 +1,6 @@
 from state import SupplyChainState
-from llm_config import get_llm
+from llm_config import invoke_llm
+from records import DemandOutput
 
 
 async def demand_agent_node(state: SupplyChainState) -> dict:
@@ -7,12 +8,12 @@ async def demand_agent_node(state: SupplyChainState) -> dict:
     Analyze demand signals using LLM reasoning with explicit criteria.
     """
     snapshot = state['db_snapshot']
-    inventory = snapshot['inventory']
-    purchase_orders = snapshot['purchase_orders']
+    inventory = snapshot.inventory
+    purchase_orders = snapshot.purchase_orders
     
     # Build context
     po_list = "\n".join([
-        f"  - PO #{po['id']}: {po['quantity']} units, status: {po['status']}"
+        f"  - PO #{po.id}: {po.quantity} units, status: {po.status}"
         for po in purchase_orders
     ]) if purchase_orders else "  - No active purchase orders"
     
@@ -20,8 +21,8 @@ async def demand_agent_node(state: SupplyChainState) -> dict:
     prompt = f"""You are a supply chain demand analyst.
 
 CURRENT DATA:
-- Current inventory: {inventory['quantity']} units
-- Reorder point: {inventory['reorder_point']} units
+- Current inventory: {inventory.quantity} units
+- Reorder point: {inventory.reorder_point} units
 - Active purchase orders: {len(purchase_orders)}
 
 {po_list}
@@ -43,16 +44,16 @@ REASONING: [Your explanation based on the rules]
 """
     
     # Invoke LLM
-    llm = get_llm()
-    response = llm.invoke(
+    response = await invoke_llm(
         prompt,
+        agent="demand",
         config={
             "run_name": "demand_agent_analysis",  # Shows up in LangSmith UI
             "tags": ["demand", "risk_classification", "inventory_check"],
             "metadata": {
                 "agent": "demand",
-                "inventory_level": inventory['quantity'],
-                "reorder_point": inventory['reorder_point'],
+                "inventory_level": inventory.quantity,
+                "reorder_point": inventory.reorder_point,
                 "active_pos": len(purchase_orders)
             }
         }
@@ -73,9 +74,33 @@ REASONING: [Your explanation based on the rules]
     
     return {
         'agent_outputs': {
-            'demand': {
-                "demand_risk": demand_risk,
-                "reasoning": reasoning
-            }
+            'demand': DemandOutput(demand_risk=demand_risk, reasoning=reasoning)
+        }
+    }
+
+
+def demand_fallback(state: SupplyChainState) -> dict:
+    """
+    Rule-derived demand risk, used when the agent misses its deadline.
+    Applies the same classification rules the prompt gives the LLM.
+    """
+    snapshot = state['db_snapshot']
+    inventory = snapshot.inventory
+    active_pos = len(snapshot.purchase_orders)
+    
+    high = inventory.quantity < inventory.reorder_point or active_pos == 0
+    reasoning = (
+        f"Deadline exceeded; rule-based classification. Stock of {inventory.quantity} units "
+        f"vs. reorder point of {inventory.reorder_point} units with {active_pos} active "
+        f"purchase order(s)."
+    )
+    
+    return {
+        'agent_outputs': {
+            'demand': DemandOutput(
+                demand_risk="HIGH" if high else "LOW",
+                reasoning=reasoning,
+                fallback=True
+            )
         }
     }
@@ -1,5 +1,7 @@
 from state import SupplyChainState
-from llm_config import get_llm
+from llm_config import invoke_llm
+from explanations import explanations_deferred
+from records import InventoryOutput
 
 
 async def inventory_agent_node(state: SupplyChainState) -> dict:
@@ -14,27 +16,78 @@ async def inventory_agent_node(state: SupplyChainState) -> dict:
     LLM:
     - Receives the action, quantity, and demand risk
     - Explains the reasoning in natural language
+    - Skipped with EXPLANATION_MODE=deferred: the decision is emitted with a
+      templated explanation and the narrative is backfilled after the cycle
     """
     snapshot = state["db_snapshot"]
-    inventory = snapshot["inventory"]
-    demand_output = state["agent_outputs"].get("demand", {})
+    inventory = snapshot.inventory
+    demand_output = state["agent_outputs"].get("demand")
 
-    current_qty = inventory["quantity"]
-    reorder_point = inventory["reorder_point"]
+    current_qty = inventory.quantity
+    reorder_point = inventory.reorder_point
 
     # Deterministic decision (no LLM involved)
-    if current_qty < reorder_point:
-        action = "REORDER"
-        # Simple quantity rule for MVP: top up to 2x reorder point
-        quantity = reorder_point * 2 - current_qty
-    else:
-        action = "HOLD"
-        quantity = 0
-
-    demand_risk = demand_output.get("demand_risk", "UNKNOWN")
+    action, quantity = decide_inventory_action(current_qty, reorder_point)
+
+    demand_risk = demand_output.demand_risk if demand_output else "UNKNOWN"
+
+    if explanations_deferred():
+        # Emit the decision now; the narrative is generated after the cycle
+        return {
+            "agent_outputs": {
+                "inventory": InventoryOutput(
+                    action=action,
+                    quantity=quantity,
+                    reasoning=templated_inventory_reasoning(current_qty, reorder_point, action, quantity),
+                    explanation_pending=True,
+                )
+            }
+        }
 
     # Build detailed explanation prompt (LLM only explains)
-    prompt = f"""You are an inventory management expert.
+    prompt = inventory_explanation_prompt(snapshot, state["agent_outputs"])
+
+    response = await invoke_llm(
+    prompt,
+    agent="inventory",
+    config={
+        "run_name": "inventory_agent_explanation",
+        "tags": ["inventory", "reorder_decision", "explanation"],
+        "metadata": {
+            "agent": "inventory",
+            "current_quantity": current_qty,
+            "reorder_point": reorder_point,
+            "action_taken": action,  # REORDER or HOLD
+            "quantity_ordered": quantity,
+            "demand_risk": demand_risk,
+            "deterministic_logic": True  # Indicates LLM only explains, doesn't decide
+        }
+    }
+)
+
+    reasoning = response.content.strip()
+
+    return {
+        "agent_outputs": {
+            "inventory": InventoryOutput(
+                action=action,
+                quantity=quantity,
+                reasoning=reasoning,
+            )
+        }
+    }
+
+
+def inventory_explanation_prompt(snapshot, agent_outputs) -> str:
+    """Prompt asking the LLM to explain the deterministic inventory decision."""
+    inventory = snapshot.inventory
+    demand_output = agent_outputs.get("demand")
+    current_qty = inventory.quantity
+    reorder_point = inventory.reorder_point
+    action, quantity = decide_inventory_action(current_qty, reorder_point)
+    demand_risk = demand_output.demand_risk if demand_output else "UNKNOWN"
+
+    return f"""You are an inventory management expert.
 
 We manage a single product with the following data:
 
@@ -56,32 +109,47 @@ Explain in 2–4 sentences, using clear business reasoning.
 Do not recommend any new actions or options.
 """
 
-    llm = get_llm()
-    response = llm.invoke(
-    prompt,
-    config={
-        "run_name": "inventory_agent_explanation",
-        "tags": ["inventory", "reorder_decision", "explanation"],
-        "metadata": {
-            "agent": "inventory",
-            "current_quantity": current_qty,
-            "reorder_point": reorder_point,
-            "action_taken": action,  # REORDER or HOLD
-            "quantity_ordered": quantity,
-            "demand_risk": demand_risk,
-            "deterministic_logic": True  # Indicates LLM only explains, doesn't decide
-        }
-    }
-)
 
-    reasoning = response.content.strip()
+def templated_inventory_reasoning(current_qty: int, reorder_point: int, action: str, quantity: int) -> str:
+    """Explanation of the reorder rule without the LLM."""
+    if action == "REORDER":
+        return (
+            f"Stock of {current_qty} units is below the reorder point of {reorder_point} units, "
+            f"so {quantity} units are reordered to restore stock to twice the reorder point."
+        )
+    return (
+        f"Stock of {current_qty} units is at or above the reorder point of {reorder_point} units, "
+        f"so no reorder is needed."
+    )
+
+
+def decide_inventory_action(current_qty: int, reorder_point: int) -> tuple[str, int]:
+    """Deterministic reorder rule: (action, quantity)."""
+    if current_qty < reorder_point:
+        # Simple quantity rule for MVP: top up to 2x reorder point
+        return "REORDER", reorder_point * 2 - current_qty
+    return "HOLD", 0
+
+
+def inventory_fallback(state: SupplyChainState) -> dict:
+    """
+    Inventory output without the LLM explanation, used when the agent
+    misses its deadline. The decision itself is always rule-based.
+    """
+    inventory = state["db_snapshot"].inventory
+    action, quantity = decide_inventory_action(inventory.quantity, inventory.reorder_point)
+
+    reasoning = "Deadline exceeded; templated explanation. " + templated_inventory_reasoning(
+        inventory.quantity, inventory.reorder_point, action, quantity
+    )
 
     return {
         "agent_outputs": {
-            "inventory": {
-                "action": action,
-                "quantity": quantity,
-                "reasoning": reasoning,
-            }
+            "inventory": InventoryOutput(
+                action=action,
+                quantity=quantity,
+                reasoning=reasoning,
+                fallback=True,
+            )
         }
     }
@@ -1,5 +1,10 @@
 from state import SupplyChainState
-from llm_config import get_llm
+from llm_config import invoke_llm
+from records import LogisticsOutput
+
+
+# "Near reorder point" for the supplier-risk expedite rule
+NEAR_REORDER_MULTIPLE = 1.2
 
 
 async def logistics_agent_node(state: SupplyChainState) -> dict:
@@ -17,18 +22,18 @@ async def logistics_agent_node(state: SupplyChainState) -> dict:
     agent_outputs = state['agent_outputs']
     
     # Get previous agent outputs
-    inventory_output = agent_outputs.get('inventory', {})
-    demand_output = agent_outputs.get('demand', {})
-    risk_output = agent_outputs.get('risk', {})
+    inventory_output = agent_outputs.get('inventory')
+    demand_output = agent_outputs.get('demand')
+    risk_output = agent_outputs.get('risk')
     
     # Extract relevant data
-    inventory_action = inventory_output.get('action', 'UNKNOWN')
-    inventory_qty = snapshot['inventory']['quantity']
-    reorder_point = snapshot['inventory']['reorder_point']
+    inventory_action = inventory_output.action if inventory_output else 'UNKNOWN'
+    inventory_qty = snapshot.inventory.quantity
+    reorder_point = snapshot.inventory.reorder_point
     
-    demand_risk = demand_output.get('demand_risk', 'UNKNOWN')
-    supplier_risk = risk_output.get('supplier_risk', 'UNKNOWN')
-    logistics_risk = risk_output.get('logistics_risk', 'UNKNOWN')
+    demand_risk = demand_output.demand_risk if demand_output else 'UNKNOWN'
+    supplier_risk = risk_output.supplier_risk if risk_output else 'UNKNOWN'
+    logistics_risk = risk_output.logistics_risk if risk_output else 'UNKNOWN'
     
     # Build detailed prompt with explicit decision criteria
     prompt = f"""You are a logistics planning expert for a supply chain operation.
@@ -71,9 +76,9 @@ REASONING: [Your explanation of the cost vs urgency trade-off]
 """
     
     # Invoke LLM
-    llm = get_llm()
-    response = llm.invoke(
+    response = await invoke_llm(
     prompt,
+    agent="logistics",
     config={
         "run_name": "logistics_agent_expedite_decision",
         "tags": ["logistics", "shipping_decision", "cost_tradeoff"],
@@ -114,9 +119,44 @@ REASONING: [Your explanation of the cost vs urgency trade-off]
     
     return {
         'agent_outputs': {
-            'logistics': {
-                'expedite': expedite,
-                'reasoning': reasoning
-            }
+            'logistics': LogisticsOutput(expedite=expedite, reasoning=reasoning)
+        }
+    }
+
+
+def logistics_fallback(state: SupplyChainState) -> dict:
+    """
+    Rule-derived expedite decision, used when the agent misses its deadline.
+    Applies the prompt's decision criteria directly.
+    """
+    agent_outputs = state['agent_outputs']
+    inventory = state['db_snapshot'].inventory
+    inventory_output = agent_outputs.get('inventory')
+    demand_output = agent_outputs.get('demand')
+    risk_output = agent_outputs.get('risk')
+    
+    inventory_action = inventory_output.action if inventory_output else 'UNKNOWN'
+    demand_risk = demand_output.demand_risk if demand_output else 'UNKNOWN'
+    supplier_risk = risk_output.supplier_risk if risk_output else 'UNKNOWN'
+    logistics_risk = risk_output.logistics_risk if risk_output else 'UNKNOWN'
+    below_reorder = inventory.quantity < inventory.reorder_point
+    
+    reasons = []
+    if inventory_action == 'REORDER' and below_reorder:
+        reasons.append("reorder needed with stock below reorder point")
+    if demand_risk == 'HIGH' and logistics_risk == 'HIGH':
+        reasons.append("demand and logistics risk are both HIGH")
+    if supplier_risk == 'HIGH' and inventory.quantity < NEAR_REORDER_MULTIPLE * inventory.reorder_point:
+        reasons.append("supplier risk is HIGH with stock near reorder point")
+    
+    expedite = bool(reasons)
+    reasoning = "Deadline exceeded; rule-based decision. " + (
+        f"Expedite: {'; '.join(reasons)}." if expedite
+        else "Normal shipping: no expedite criterion applies."
+    )
+    
+    return {
+        'agent_outputs': {
+            'logistics': LogisticsOutput(expedite=expedite, reasoning=reasoning, fallback=True)
         }
     }
@@ -1,132 +1,308 @@
+import asyncio
 from state import SupplyChainState
-from llm_config import get_llm
+from llm_config import invoke_llm
+from records import RiskOutput
 from datetime import datetime
 
 
+# Number of supplier-table versions whose assessment is kept in memory
+SUPPLIER_RISK_CACHE_SIZE = 8
+
+# Classification thresholds (as stated in the prompts), used by the fallback
+MIN_SUPPLIER_RELIABILITY = 0.90
+MAX_TIMELY_ETA_DAYS = 7
+
+# Completed run-level supplier assessments, keyed by supplier-table version
+_supplier_risk_cache = {}
+
+# In-flight assessments, so concurrent cycles share one LLM call per version
+_supplier_risk_inflight = {}
+
+
 async def risk_agent_node(state: SupplyChainState) -> dict:
-    """Assess supplier and shipment risk using LLM reasoning."""
+    """
+    Assess supplier and shipment risk.
+    
+    Supplier risk depends only on the supplier table, which is identical for
+    every product, so it comes from the shared run-level assessment
+    (one LLM call per supplier-table version). Only the product-specific
+    logistics risk is evaluated here with LLM reasoning.
+    """
     
     snapshot = state['db_snapshot']
-    suppliers = snapshot['suppliers']
-    shipments = snapshot['shipments']
+    suppliers = snapshot.suppliers
+    shipments = snapshot.shipments
     
-    # Format supplier data
-    supplier_data = "\n".join([
-        f"• {s['name']}: reliability {s['reliability_score']:.0%}, "
-        f"lead time {s['lead_time_days']} days"
-        for s in suppliers
-    ])
+    supplier_assessment = await assess_supplier_risk(suppliers)
     
     # Format shipment data (human-readable with calculated ETA)
-    shipment_data = format_shipment_data_for_llm(shipments)
+    now = datetime.utcnow()
+    shipment_data = format_shipment_data_for_llm(shipments, now)
     
     # Detailed prompt
     prompt = f"""You are a supply chain risk analyst.
 
-SUPPLIER DATA:
-{supplier_data}
-
 SHIPMENT DATA:
 {shipment_data}
 
 CLASSIFICATION RULES:
 
-Supplier Risk:
-- HIGH: any supplier reliability < 90%
-- LOW: all suppliers reliability >= 90%
-
 Logistics Risk:
 - HIGH: any shipment arriving > 7 days away, overdue, or no active shipments
 - LOW: all shipments arriving within 7 days with normal status
 
 TASK:
-Classify supplier risk and logistics risk as LOW or HIGH.
+Classify logistics risk as LOW or HIGH.
 Explain in 2-3 sentences using specific data.
 
 FORMAT:
-SUPPLIER_RISK: [LOW or HIGH]
 LOGISTICS_RISK: [LOW or HIGH]
 REASONING: [explanation]
 """
     
-    llm = get_llm()
-    response = llm.invoke(
+    response = await invoke_llm(
     prompt,
+    agent="risk",
     config={
-        "run_name": "risk_agent_assessment",
-        "tags": ["risk", "supplier_evaluation", "logistics_evaluation"],
+        "run_name": "risk_agent_logistics_assessment",
+        "tags": ["risk", "logistics_evaluation"],
         "metadata": {
             "agent": "risk",
-            "num_suppliers": len(suppliers),
             "num_shipments": len(shipments),
-            "avg_supplier_reliability": round(
-                sum(s['reliability_score'] for s in suppliers) / len(suppliers), 2
-            ) if suppliers else 0,
             "has_overdue_shipments": any(
-                sh.get('expected_arrival', '').startswith('-') 
+                sh.expected_arrival is not None and sh.expected_arrival < now
                 for sh in shipments
+            ),
+            "supplier_risk": supplier_assessment['supplier_risk'],
+            "supplier_table_version": supplier_assessment['version']
+        }
+    }
+)
+
+    response_text = response.content
+    
+    # Parse response
+    logistics_risk = "UNKNOWN"
+    reasoning = response_text
+    
+    try:
+        for line in response_text.split('\n'):
+            if "LOGISTICS_RISK:" in line:
+                logistics_risk = "HIGH" if "HIGH" in line.upper() else "LOW"
+        
+        if "REASONING:" in response_text:
+            reasoning = response_text.split("REASONING:")[1].strip()
+    except:
+        pass
+    
+    return {
+        'agent_outputs': {
+            'risk': RiskOutput(
+                supplier_risk=supplier_assessment['supplier_risk'],
+                logistics_risk=logistics_risk,
+                reasoning=(
+                    f"Supplier risk: {supplier_assessment['reasoning']}\n\n"
+                    f"Logistics risk: {reasoning}"
+                )
             )
         }
     }
+
+
+def supplier_table_version(suppliers) -> tuple:
+    """Content fingerprint of the supplier table (changes whenever any supplier does)."""
+    return tuple(sorted(
+        (s.id, s.reliability_score, s.lead_time_days)
+        for s in suppliers
+    ))
+
+
+async def assess_supplier_risk(suppliers) -> dict:
+    """
+    Run-level supplier risk assessment, shared across all product cycles.
+    
+    Evaluated once per supplier-table version: repeated and concurrent calls
+    with the same supplier table reuse the same result (and the same
+    in-flight LLM call).
+    
+    Returns:
+        Dictionary with supplier_risk, reasoning and version
+    """
+    version = supplier_table_version(suppliers)
+    
+    cached = _supplier_risk_cache.get(version)
+    if cached is not None:
+        return cached
+    
+    loop = asyncio.get_running_loop()
+    task = _supplier_risk_inflight.get(version)
+    if task is None or task.get_loop() is not loop:
+        task = loop.create_task(_classify_supplier_risk(suppliers, version))
+        _supplier_risk_inflight[version] = task
+    
+    try:
+        assessment = await asyncio.shield(task)
+    finally:
+        if task.done() and _supplier_risk_inflight.get(version) is task:
+            del _supplier_risk_inflight[version]
+    
+    _remember_supplier_risk(version, assessment)
+    return assessment
+
+
+def seed_supplier_risk(suppliers, assessment) -> None:
+    """
+    Reuse an assessment made elsewhere (e.g. by the parent of a sharded run).
+    
+    Ignored if the local supplier table no longer matches the version the
+    assessment was made for; the next cycle then assesses it afresh.
+    """
+    version = supplier_table_version(suppliers)
+    if assessment['version'] == hash(version):
+        _remember_supplier_risk(version, assessment)
+
+
+def _remember_supplier_risk(version, assessment) -> None:
+    # An unparseable answer is not worth reusing for the whole run
+    if assessment['supplier_risk'] == 'UNKNOWN':
+        return
+    
+    _supplier_risk_cache[version] = assessment
+    while len(_supplier_risk_cache) > SUPPLIER_RISK_CACHE_SIZE:
+        _supplier_risk_cache.pop(next(iter(_supplier_risk_cache)))
+
+
+async def _classify_supplier_risk(suppliers, version) -> dict:
+    """Classify supplier risk for the whole supplier table with LLM reasoning."""
+    
+    # Format supplier data
+    supplier_data = "\n".join([
+        f"• {s.name}: reliability {s.reliability_score:.0%}, "
+        f"lead time {s.lead_time_days} days"
+        for s in suppliers
+    ])
+    
+    prompt = f"""You are a supply chain risk analyst.
+
+SUPPLIER DATA:
+{supplier_data}
+
+CLASSIFICATION RULES:
+
+Supplier Risk:
+- HIGH: any supplier reliability < 90%
+- LOW: all suppliers reliability >= 90%
+
+TASK:
+Classify supplier risk as LOW or HIGH.
+Explain in 2-3 sentences using specific data.
+
+FORMAT:
+SUPPLIER_RISK: [LOW or HIGH]
+REASONING: [explanation]
+"""
+    
+    response = await invoke_llm(
+    prompt,
+    agent="risk",
+    config={
+        "run_name": "risk_agent_supplier_assessment",
+        "tags": ["risk", "supplier_evaluation", "run_level"],
+        "metadata": {
+            "agent": "risk",
+            "num_suppliers": len(suppliers),
+            "avg_supplier_reliability": round(
+                sum(s.reliability_score for s in suppliers) / len(suppliers), 2
+            ) if suppliers else 0
+        }
+    }
 )
 
     response_text = response.content
     
     # Parse response
     supplier_risk = "UNKNOWN"
-    logistics_risk = "UNKNOWN"
     reasoning = response_text
     
     try:
         for line in response_text.split('\n'):
             if "SUPPLIER_RISK:" in line:
                 supplier_risk = "HIGH" if "HIGH" in line.upper() else "LOW"
-            elif "LOGISTICS_RISK:" in line:
-                logistics_risk = "HIGH" if "HIGH" in line.upper() else "LOW"
         
         if "REASONING:" in response_text:
             reasoning = response_text.split("REASONING:")[1].strip()
     except:
         pass
     
+    return {
+        'supplier_risk': supplier_risk,
+        'reasoning': reasoning,
+        'version': hash(version)
+    }
+
+
+def risk_fallback(state: SupplyChainState) -> dict:
+    """
+    Rule-derived supplier and logistics risk, used when the agent misses
+    its deadline. Applies the classification rules from the prompts.
+    """
+    snapshot = state['db_snapshot']
+    suppliers = snapshot.suppliers
+    shipments = snapshot.shipments
+    now = datetime.utcnow()
+    
+    unreliable = [s for s in suppliers if s.reliability_score < MIN_SUPPLIER_RELIABILITY]
+    supplier_risk = "HIGH" if unreliable or not suppliers else "LOW"
+    
+    late = [
+        sh for sh in shipments
+        if sh.expected_arrival is None
+        or sh.expected_arrival < now
+        or (sh.expected_arrival - now).days > MAX_TIMELY_ETA_DAYS
+    ]
+    logistics_risk = "HIGH" if late or not shipments else "LOW"
+    
+    reasoning = (
+        f"Deadline exceeded; rule-based classification. "
+        f"{len(unreliable)} of {len(suppliers)} suppliers are below "
+        f"{MIN_SUPPLIER_RELIABILITY:.0%} reliability. "
+        f"{len(late)} of {len(shipments)} active shipments are overdue, unscheduled "
+        f"or more than {MAX_TIMELY_ETA_DAYS} days away."
+    )
+    
     return {
         'agent_outputs': {
-            'risk': {
-                'supplier_risk': supplier_risk,
-                'logistics_risk': logistics_risk,
-                'reasoning': reasoning
-            }
+            'risk': RiskOutput(
+                supplier_risk=supplier_risk,
+                logistics_risk=logistics_risk,
+                reasoning=reasoning,
+                fallback=True
+            )
         }
     }
 
 
-def format_shipment_data_for_llm(shipments):
+def format_shipment_data_for_llm(shipments, now=None):
     """Convert shipments to human-readable format."""
     if not shipments:
         return "No active shipments"
     
     lines = []
-    now = datetime.utcnow()
+    now = now or datetime.utcnow()
     
     for sh in shipments:
-        eta_str = sh.get('expected_arrival')
-        
-        if eta_str:
-            try:
-                eta = datetime.fromisoformat(eta_str)
-                days = (eta - now).days
-                
-                if days < 0:
-                    eta_text = f"OVERDUE by {abs(days)} days"
-                elif days == 0:
-                    eta_text = "arriving TODAY"
-                else:
-                    eta_text = f"arriving in {days} days"
-            except:
-                eta_text = "ETA unknown"
+        if sh.expected_arrival is not None:
+            days = (sh.expected_arrival - now).days
+            
+            if days < 0:
+                eta_text = f"OVERDUE by {abs(days)} days"
+            elif days == 0:
+                eta_text = "arriving TODAY"
+            else:
+                eta_text = f"arriving in {days} days"
         else:
             eta_text = "ETA not set"
         
-        lines.append(f"• Shipment #{sh['id']}: {sh['status']}, {eta_text}")
+        lines.append(f"• Shipment #{sh.id}: {sh.status}, {eta_text}")
     
     return "\n".join(lines)
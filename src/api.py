@@ -0,0 +1,290 @@
+"""
+Async HTTP service for the Supply Chain Control Tower.
+
+Wraps the LangGraph decision engine so UIs and automations can submit
+cycles concurrently and poll or stream their results.
+
+Run with:
+    python -m src.api
+"""
+
+import os
+import sys
+import json
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+if __name__ == '__main__':
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import text
+
+from db_service import engine, query_decisions, search_decisions
+from db_init import prepare_database
+from graph import get_supply_chain_graph
+from job_queue import CycleJob, CycleJobQueue, QueueFullError
+from scheduler import prioritize_products
+from explanations import drain_explanations
+from records import to_dict
+from retention import read_archived_decisions
+
+
+# Maximum number of decision cycles executing at the same time
+MAX_CONCURRENT_CYCLES = int(os.getenv('API_MAX_CONCURRENT_CYCLES', '8'))
+
+# Cycles allowed to wait for a worker before submissions are rejected (429)
+MAX_QUEUED_CYCLES = int(os.getenv('API_MAX_QUEUED_CYCLES', '1000'))
+
+# Number of finished jobs kept in memory for polling
+JOB_HISTORY_SIZE = int(os.getenv('API_JOB_HISTORY_SIZE', '1000'))
+
+# Upper bound on products accepted in one batch submission
+MAX_BATCH_SIZE = int(os.getenv('API_MAX_BATCH_SIZE', '500'))
+
+# Upper bound on decision log rows returned per page
+MAX_DECISION_PAGE = int(os.getenv('API_MAX_DECISION_PAGE', '500'))
+
+
+# ================================================================
+# REQUEST MODELS
+# ================================================================
+
+class CycleRequest(BaseModel):
+    product_id: int = Field(..., ge=1)
+
+
+class BatchCycleRequest(BaseModel):
+    product_ids: list[int] = Field(..., min_length=1)
+
+
+# ================================================================
+# JOB TRACKING
+# ================================================================
+
+class JobRegistry:
+    """
+    Index of submitted jobs for polling, bounded to the most recent ones.
+
+    Execution itself is delegated to the shared CycleJobQueue.
+    """
+
+    def __init__(self, queue: CycleJobQueue, history_size: int):
+        self.queue = queue
+        self._history_size = history_size
+        self._jobs = OrderedDict()
+
+    def submit(self, product_id: int, priority: float = 0.0) -> CycleJob:
+        job = self.queue.try_submit(product_id, priority)
+        self._jobs[job.id] = job
+        self._evict_finished()
+        return job
+
+    def get(self, job_id: str) -> CycleJob | None:
+        return self._jobs.get(job_id)
+
+    def _evict_finished(self) -> None:
+        """Drop the oldest finished jobs once history exceeds its limit."""
+        excess = len(self._jobs) - self._history_size
+        if excess <= 0:
+            return
+        for job_id in [jid for jid, job in self._jobs.items() if job.done][:excess]:
+            del self._jobs[job_id]
+
+
+# ================================================================
+# APPLICATION
+# ================================================================
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bring the schema up to date and compile the shared graph before accepting traffic
+    await asyncio.to_thread(prepare_database)
+    get_supply_chain_graph()
+    # JobRegistry keeps (and evicts) its own job references, so finished
+    # jobs are not also held for completed()
+    queue = CycleJobQueue(workers=MAX_CONCURRENT_CYCLES, max_queue_depth=MAX_QUEUED_CYCLES,
+                          collect_results=False)
+    queue.start()
+    app.state.jobs = JobRegistry(queue, JOB_HISTORY_SIZE)
+    yield
+    await queue.shutdown()
+    # Let deferred explanations already queued finish their backfill
+    await drain_explanations()
+
+
+app = FastAPI(title="Supply Chain Control Tower", lifespan=lifespan)
+
+
+def _get_job(job_id: str) -> CycleJob:
+    job = app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@app.get("/health")
+async def health():
+    """Liveness probe: the process is up and serving requests."""
+    return {'status': 'ok'}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: the database is reachable and the graph is compiled."""
+    try:
+        await asyncio.to_thread(_ping_database)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Database unavailable: {e}")
+
+    return {
+        'status': 'ready',
+        'max_concurrent_cycles': MAX_CONCURRENT_CYCLES,
+        **app.state.jobs.queue.progress()
+    }
+
+
+def _ping_database() -> None:
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+@app.post("/cycles", status_code=202)
+async def submit_cycle(request: CycleRequest):
+    """Submit a decision cycle for one product."""
+    ranked = await asyncio.to_thread(prioritize_products, [request.product_id])
+    try:
+        job = app.state.jobs.submit(request.product_id, priority=-ranked[0][1])
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {'job_id': job.id, 'status': job.status}
+
+
+@app.post("/cycles/batch", status_code=202)
+async def submit_batch(request: BatchCycleRequest):
+    """Submit decision cycles for several products at once."""
+    if len(request.product_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.product_ids)} > {MAX_BATCH_SIZE}"
+        )
+    queue = app.state.jobs.queue
+    if queue.progress()['queued'] + len(request.product_ids) > MAX_QUEUED_CYCLES:
+        raise HTTPException(status_code=429, detail="Cycle queue cannot accept this batch right now")
+    # Most urgent products are dispatched first
+    urgency = dict(await asyncio.to_thread(prioritize_products, request.product_ids))
+    ordered = sorted(request.product_ids, key=lambda pid: -urgency[pid])
+    jobs = [app.state.jobs.submit(pid, priority=-urgency[pid]) for pid in ordered]
+    return {'jobs': [{'job_id': job.id, 'product_id': job.product_id} for job in jobs]}
+
+
+@app.get("/cycles/{job_id}")
+async def get_cycle(job_id: str, include_events: bool = False):
+    """Poll the status and result of a submitted cycle."""
+    return _get_job(job_id).to_dict(include_events=include_events)
+
+
+@app.get("/cycles/{job_id}/stream")
+async def stream_cycle(job_id: str):
+    """Stream node events of a cycle as Server-Sent Events until it finishes."""
+    job = _get_job(job_id)
+
+    async def event_stream():
+        sent = 0
+        while True:
+            while sent < len(job.events):
+                yield _sse('node', job.events[sent])
+                sent += 1
+            if job.done:
+                yield _sse(job.status, job.to_dict())
+                return
+            await job.wait_for_change()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.get("/decisions")
+async def list_decisions(
+    product_id: int | None = None,
+    decision_type: str | None = None,
+    agent_name: str | None = None,
+    cycle_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(50, ge=1, le=MAX_DECISION_PAGE),
+    offset: int = Query(0, ge=0)
+):
+    """Page through the decision log (newest first), filtered by product, type, agent, cycle and time."""
+    decisions, total = await asyncio.to_thread(
+        query_decisions,
+        product_id=product_id,
+        decision_type=decision_type,
+        agent_name=agent_name,
+        cycle_id=cycle_id,
+        since=since,
+        until=until,
+        limit=limit,
+        offset=offset
+    )
+    return {'total': total, 'limit': limit, 'offset': offset, 'decisions': to_dict(decisions)}
+
+
+@app.get("/decisions/search")
+async def search_decision_log(
+    q: str = Query(..., min_length=1),
+    product_id: int | None = None,
+    limit: int = Query(20, ge=1, le=MAX_DECISION_PAGE),
+    offset: int = Query(0, ge=0)
+):
+    """Full-text search over decision summaries and reasoning, best matches first."""
+    decisions, total = await asyncio.to_thread(
+        search_decisions, q, product_id=product_id, limit=limit, offset=offset
+    )
+    return {'total': total, 'limit': limit, 'offset': offset, 'decisions': to_dict(decisions)}
+
+
+@app.get("/decisions/archived")
+async def list_archived_decisions(
+    product_id: int | None = None,
+    log_id: list[int] | None = Query(None),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(50, ge=1, le=MAX_DECISION_PAGE),
+    offset: int = Query(0, ge=0)
+):
+    """Page through decisions moved to the archive by the retention job, by product, ID and time."""
+    decisions, total = await asyncio.to_thread(
+        read_archived_decisions,
+        log_ids=log_id,
+        product_id=product_id,
+        since=since,
+        until=until,
+        limit=limit,
+        offset=offset
+    )
+    return {'total': total, 'limit': limit, 'offset': offset, 'decisions': to_dict(decisions)}
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def main():
+    """Serve the API with uvicorn."""
+    import uvicorn
+
+    uvicorn.run(
+        app,
+        host=os.getenv('API_HOST', '127.0.0.1'),
+        port=int(os.getenv('API_PORT', '8000'))
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -7,9 +7,13 @@ UI calls this, never touches agents directly.
 import asyncio
 import json
 import time
+import threading
 from pathlib import Path
 
-from graph import create_supply_chain_graph
+from graph import get_supply_chain_graph
+from state import new_cycle_state
+from records import to_dict
+from explanations import schedule_explanations
 
 
 # #region agent log
@@ -44,6 +48,136 @@ def _agent_debug_log(
 # #endregion
 
 
+async def run_cycle_async(product_id: int = 1, on_event=None, snapshot=None) -> dict:
+    """
+    Execute one complete decision cycle for a product on the running event loop.
+
+    Uses the shared compiled graph, so any number of cycles can run
+    concurrently (API workers, batch runs) without recompiling.
+
+    Args:
+        product_id: Product to analyze
+        on_event: Optional callback ``on_event(node_name, node_output)``
+                  invoked as each node finishes (used for streaming progress),
+                  and again for each deferred explanation once it arrives
+        snapshot: Optional prefetched Snapshot; skips ingestion's database read
+
+    Returns:
+        Structured output with all agent decisions and reasoning,
+        as plain dicts (records are serialized here, at the UI/API boundary)
+    """
+    app = get_supply_chain_graph()
+
+    # "updates" carries each node's delta (for progress), "values" the
+    # reducer-merged state, so the last "values" chunk is the final state
+    final_state = {}
+    async for mode, chunk in app.astream(
+        new_cycle_state(product_id, snapshot), stream_mode=["updates", "values"]
+    ):
+        if mode == "values":
+            final_state = chunk
+        elif on_event is not None:
+            for node_name, node_output in chunk.items():
+                on_event(node_name, node_output)
+
+    # EXPLANATION_MODE=deferred: narratives are generated after returning
+    schedule_explanations(final_state, on_event)
+
+    # Return structured output
+    return to_dict({
+        "db_snapshot": final_state.get("db_snapshot") or {},
+        "agent_outputs": final_state.get("agent_outputs", {}),
+        "final_decision": final_state.get("final_decision"),
+        "decision_risk": final_state.get("decision_risk"),
+        "human_feedback": final_state.get("human_feedback"),
+    })
+
+
+class BackgroundCycleRunner:
+    """
+    Runs cycles on a dedicated event loop thread, for the UI.
+
+    Streamlit reruns its script on every interaction, on the session's own
+    thread. Cycles are therefore submitted here and run in the background
+    through a CycleJobQueue (bounded concurrency, retries), and the UI polls
+    the returned CycleJob for status and node events. One runner is shared
+    by every UI session, so all operators share one LLM client pool and
+    rate limiter.
+
+    Args:
+        workers: Cycles executing concurrently (default: CYCLE_WORKERS)
+        max_queue_depth: Cycles allowed to wait before submit() raises QueueFullError
+    """
+
+    def __init__(self, workers: int | None = None, max_queue_depth: int | None = None):
+        # job_queue imports this module, so it is imported here rather than at the top
+        from job_queue import CycleJobQueue
+
+        queue_kwargs = {}
+        if workers:
+            queue_kwargs['workers'] = workers
+        if max_queue_depth:
+            queue_kwargs['max_queue_depth'] = max_queue_depth
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='cycle-runner', daemon=True)
+        self._thread.start()
+
+        async def start_queue():
+            # Sessions keep their own CycleJob; nothing consumes completed()
+            queue = CycleJobQueue(collect_results=False, **queue_kwargs)
+            queue.start()
+            return queue
+
+        self._queue = self._call(start_queue())
+
+    def _call(self, coroutine):
+        """Run a coroutine on the runner's loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def submit(self, product_id: int, priority: float = 0.0):
+        """
+        Queue a cycle without waiting for it.
+
+        Returns:
+            CycleJob to poll (status, events, result)
+
+        Raises:
+            QueueFullError: If the queue is at its depth limit
+        """
+        async def submit_job():
+            return self._queue.try_submit(product_id, priority)
+
+        return self._call(submit_job())
+
+    def run(self, product_id: int) -> dict:
+        """
+        Run one cycle on the runner's loop and wait for its decision.
+
+        Bypasses the queue (the caller is already waiting), but shares the
+        loop's LLM clients, rate limiter and explanation worker, which
+        keeps backfilling the cycle's deferred explanations afterwards.
+        """
+        return self._call(run_cycle_async(product_id))
+
+    def progress(self) -> dict:
+        """Queue counters (see CycleJobQueue.progress)."""
+        return self._queue.progress()
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_cycle_runner() -> BackgroundCycleRunner:
+    """The process-wide cycle runner (started on first use)."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = BackgroundCycleRunner()
+        return _runner
+
+
 def run_one_cycle(product_id: int = 1) -> dict:
     """
     Execute one complete decision cycle for a product.
@@ -63,32 +197,8 @@ def run_one_cycle(product_id: int = 1) -> dict:
     )
     # #endregion
 
-    # Create graph
-    app = create_supply_chain_graph()
-
-    # Initial state
-    initial_state = {
-        "product_id": product_id,
-        "db_snapshot": {},
-        "agent_outputs": {},
-        "final_decision": None,
-        "decision_risk": None,
-        "human_feedback": None,
-    }
-
-    # Run async workflow synchronously
-    async def _run():
-        final_state = {}
-        async for event in app.astream(initial_state):
-            for node_name, node_output in event.items():
-                for key, value in node_output.items():
-                    if key == "agent_outputs" and key in final_state:
-                        final_state["agent_outputs"].update(value)
-                    else:
-                        final_state[key] = value
-        return final_state
-
-    result = asyncio.run(_run())
+    # Run on the shared runner's loop: one LLM client pool and rate limiter per process
+    result = get_cycle_runner().run(product_id)
 
     # #region agent log
     _agent_debug_log(
@@ -102,11 +212,5 @@ def run_one_cycle(product_id: int = 1) -> dict:
     )
     # #endregion
 
-    # Return structured output
-    return {
-        "db_snapshot": result.get("db_snapshot", {}),
-        "agent_outputs": result.get("agent_outputs", {}),
-        "final_decision": result.get("final_decision"),
-        "decision_risk": result.get("decision_risk"),
-        "human_feedback": result.get("human_feedback"),
-    }
+    return result
+
@@ -0,0 +1,325 @@
+"""
+Synthetic catalog generator for load testing.
+
+The demo seed (db_init.seed_data) holds 3 hand-written scenarios. This
+generates reproducible catalogs of any size with realistic distributions:
+- Suppliers: lead times skewed towards a week (lognormal), reliability
+  mostly 80-98% with a tail of poor performers (beta)
+- Inventory: reorder points spread over two orders of magnitude, stock
+  coverage around 1.5x the reorder point, ~30% of SKUs below it, a few
+  stocked out
+- Purchase orders: a Poisson-distributed history per product over the past
+  year; status follows from timing (pending until confirmed, in transit
+  until arrived), plus a few cancellations
+- Shipments: one per confirmed or delivered order; arrival is the supplier
+  lead time plus a delay that grows as reliability drops, so unreliable
+  suppliers produce most of the overdue in-transit shipments
+
+Columns are drawn as NumPy arrays from one seeded generator and written with
+the driver's executemany, never one ORM object at a time, all in a single
+transaction (a failed run leaves no partial catalog).
+
+Dates are relative to a reference time, fixed by default (DEFAULT_NOW), so
+the same seed gives the same catalog on every run.
+
+Run with:
+    python src/datagen.py --products 100000 --suppliers 500 --seed 42 [--now 2026-01-01] [--reset]
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+if __name__ == '__main__':
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
+
+import numpy as np
+from sqlalchemy import func, insert, select
+
+from models import Base, Product, Inventory, Supplier, PurchaseOrder, Shipment
+
+
+# Rows per executemany call (all calls share the catalog's one transaction)
+INSERT_BATCH_SIZE = 50000
+
+# Reference time order and shipment dates are generated relative to
+DEFAULT_NOW = datetime(2026, 1, 1)
+
+# Share of purchase orders cancelled (the rest go pending -> confirmed -> delivered)
+CANCELLED_SHARE = 0.03
+
+# Mean days from order to supplier confirmation
+CONFIRMATION_DAYS = 1.5
+
+# Days of order history generated
+HISTORY_DAYS = 365
+
+
+# ================================================================
+# COLUMN GENERATORS
+# ================================================================
+
+def generate_suppliers(rng, count):
+    """Supplier columns: lead time in days and reliability score."""
+    lead_time = np.clip(np.round(rng.lognormal(np.log(7), 0.6, count)), 1, 90).astype(np.int64)
+    reliability = np.clip(rng.beta(9, 1.5, count), 0.3, 0.999).round(3)
+    return {
+        'id': np.arange(1, count + 1),
+        'name': np.char.add('Supplier ', np.arange(1, count + 1).astype(str)),
+        'lead_time_days': lead_time,
+        'reliability_score': reliability
+    }
+
+
+def generate_products(rng, count):
+    """Product and inventory columns (one inventory row per product)."""
+    ids = np.arange(1, count + 1)
+    reorder_point = np.clip(np.round(rng.lognormal(np.log(100), 0.8, count)), 5, 5000).astype(np.int64)
+    coverage = rng.gamma(3.0, 0.5, count)
+    coverage[rng.random(count) < 0.03] = 0.0   # stocked out
+    quantity = np.round(reorder_point * coverage).astype(np.int64)
+
+    padded = np.char.zfill(ids.astype(str), 7)
+    return {
+        'product': {
+            'id': ids,
+            'name': np.char.add('Product ', padded),
+            'sku': np.char.add('SKU-', padded)
+        },
+        'inventory': {
+            'id': ids,
+            'product_id': ids,
+            'quantity': quantity,
+            'reorder_point': reorder_point
+        }
+    }
+
+
+def generate_orders(rng, product_count, suppliers, orders_per_product, now):
+    """
+    Purchase order and shipment columns.
+
+    Returns:
+        (purchase order columns, shipment columns)
+    """
+    per_product = rng.poisson(orders_per_product, product_count)
+    count = int(per_product.sum())
+    product_id = np.repeat(np.arange(1, product_count + 1), per_product)
+
+    supplier_index = rng.integers(0, len(suppliers['id']), count)
+    supplier_id = suppliers['id'][supplier_index]
+    lead_time = suppliers['lead_time_days'][supplier_index]
+    reliability = suppliers['reliability_score'][supplier_index]
+
+    age_days = rng.uniform(0, HISTORY_DAYS, count)
+    quantity = np.clip(np.round(rng.lognormal(np.log(150), 0.7, count)), 10, 10000).astype(np.int64)
+
+    # Status follows from timing, in days before now: an order is pending
+    # until the supplier confirms it, then ships and arrives lead time plus
+    # a delay (growing as reliability drops) later
+    confirmed_days = age_days - rng.exponential(CONFIRMATION_DAYS, count)
+    expected_days = confirmed_days - lead_time
+    arrived_days = expected_days - rng.exponential(1.0 + 20.0 * (1.0 - reliability))
+
+    status = np.where(
+        confirmed_days < 0, 'pending',
+        np.where(arrived_days < 0, 'confirmed', 'delivered')
+    ).astype(object)
+    status[rng.random(count) < CANCELLED_SHARE] = 'cancelled'
+
+    purchase_orders = {
+        'id': np.arange(1, count + 1),
+        'supplier_id': supplier_id,
+        'product_id': product_id,
+        'quantity': quantity,
+        'status': status,
+        'created_at': _days_before(now, age_days)
+    }
+
+    # Confirmed orders are in transit, delivered ones have arrived
+    shipped = np.flatnonzero((status == 'confirmed') | (status == 'delivered'))
+    delivered = status[shipped] == 'delivered'
+    actual_arrival = _days_before(now, arrived_days[shipped])
+    actual_arrival[~delivered] = np.datetime64('NaT')
+
+    shipments = {
+        'id': np.arange(1, len(shipped) + 1),
+        'po_id': shipped + 1,
+        'status': np.where(delivered, 'delivered', 'in_transit'),
+        'expected_arrival': _days_before(now, expected_days[shipped]),
+        'actual_arrival': actual_arrival
+    }
+    return purchase_orders, shipments
+
+
+def _days_before(now, days):
+    """datetime64 array of the times the given (fractional) days before now."""
+    offsets = np.round(np.asarray(days) * 86400e6).astype('timedelta64[us]')
+    return np.datetime64(now, 'us') - offsets
+
+
+# ================================================================
+# BULK INSERT
+# ================================================================
+
+def bulk_insert(connection, model, columns, batch_size=INSERT_BATCH_SIZE):
+    """
+    Insert column arrays with the driver's executemany, batch_size rows per call.
+
+    Rows go to the DBAPI as plain tuples: SQLAlchemy's per-row parameter
+    processing would cost several times the insert itself. On SQLite,
+    datetime64 columns are formatted in NumPy into the same text SQLAlchemy
+    stores (NaT becomes NULL).
+
+    Args:
+        connection: Connection inside the caller's transaction
+        model: Mapped class of the target table
+        columns: Dictionary of equal-length arrays keyed by column name
+
+    Returns:
+        Rows inserted
+    """
+    names = list(columns)
+    compiled = insert(model).compile(dialect=connection.dialect, column_keys=names)
+    order = compiled.positiontup if compiled.positional else names
+    values = [_column_values(columns[name], connection.dialect.name) for name in order]
+
+    count = len(values[0]) if values else 0
+    for start in range(0, count, batch_size):
+        rows = list(zip(*(column[start:start + batch_size] for column in values)))
+        if not compiled.positional:
+            rows = [dict(zip(order, row)) for row in rows]
+        connection.exec_driver_sql(compiled.string, rows)
+    return count
+
+
+def _column_values(column, dialect_name):
+    """Python values of a column array, ready for the DBAPI."""
+    if not np.issubdtype(column.dtype, np.datetime64):
+        return column.tolist()
+
+    missing = np.isnat(column)
+    if dialect_name == 'sqlite':
+        values = np.char.replace(np.datetime_as_string(column, unit='us'), 'T', ' ').astype(object)
+    else:
+        values = column.astype('datetime64[us]').astype(datetime)
+    values[missing] = None
+    return values.tolist()
+
+
+def generate_catalog(engine, products, suppliers, orders_per_product=10.0, seed=42, now=None):
+    """
+    Generate a synthetic catalog into an empty database.
+
+    The same arguments (including now) always produce the same rows. All
+    tables are written in one transaction.
+
+    Args:
+        engine: Target engine (schema must exist; product tables must be empty)
+        products: Number of products (one inventory row each)
+        suppliers: Number of suppliers
+        orders_per_product: Mean purchase orders per product (Poisson)
+        seed: Random seed
+        now: Reference time for order and shipment dates (default: DEFAULT_NOW)
+
+    Returns:
+        Dictionary of rows inserted per table
+    """
+    rng = np.random.default_rng(seed)
+    now = now or DEFAULT_NOW
+
+    supplier_columns = generate_suppliers(rng, suppliers)
+    catalog = generate_products(rng, products)
+    purchase_orders, shipments = generate_orders(rng, products, supplier_columns, orders_per_product, now)
+
+    counts = {}
+    with engine.begin() as connection:
+        existing = connection.execute(select(func.count()).select_from(Product)).scalar()
+        if existing:
+            raise ValueError(f"Database already has {existing} products (use --reset to replace them)")
+
+        counts['suppliers'] = bulk_insert(connection, Supplier, supplier_columns)
+        counts['products'] = bulk_insert(connection, Product, catalog['product'])
+        counts['inventory'] = bulk_insert(connection, Inventory, catalog['inventory'])
+        counts['purchase_orders'] = bulk_insert(connection, PurchaseOrder, purchase_orders)
+        counts['shipments'] = bulk_insert(connection, Shipment, shipments)
+    return counts
+
+
+def reset_catalog(engine):
+    """Drop and recreate every table (all data, including the decision log, is lost)."""
+    Base.metadata.drop_all(engine)
+    if engine.dialect.name == 'sqlite':
+        with engine.begin() as connection:
+            connection.exec_driver_sql('DROP TABLE IF EXISTS decision_search')
+            connection.exec_driver_sql('PRAGMA user_version = 0')
+
+
+# ================================================================
+# CLI
+# ================================================================
+
+def _reference_time(value):
+    """argparse type for --now: an ISO date or date and time."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an ISO date or datetime, got {value!r}")
+
+
+def parse_args(argv=None):
+    """Parse CLI options."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic supply chain catalog")
+    parser.add_argument('--products', type=int, default=100000, help="Products to generate (default 100000)")
+    parser.add_argument('--suppliers', type=int, default=500, help="Suppliers to generate (default 500)")
+    parser.add_argument(
+        '--orders-per-product', type=float, default=10.0,
+        help="Mean purchase orders per product (default 10)"
+    )
+    parser.add_argument('--seed', type=int, default=42, help="Random seed (default 42)")
+    parser.add_argument(
+        '--now', type=_reference_time, default=DEFAULT_NOW,
+        help=f"Reference time for order and shipment dates, ISO format (default {DEFAULT_NOW.date()}); "
+             "pass today's date for a catalog with current shipments"
+    )
+    parser.add_argument(
+        '--reset', action='store_true',
+        help="Drop all existing tables and data first"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Generate a catalog into DATABASE_URL and report throughput."""
+    args = parse_args(argv)
+
+    from db_service import engine, DATABASE_URL
+    from db_init import prepare_database
+
+    if args.reset:
+        reset_catalog(engine)
+    prepare_database(engine, seed=False)
+
+    start = time.perf_counter()
+    try:
+        counts = generate_catalog(
+            engine, args.products, args.suppliers,
+            orders_per_product=args.orders_per_product, seed=args.seed, now=args.now
+        )
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    total = sum(counts.values())
+    print(f"✓ Generated {total:,} rows into {DATABASE_URL} in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    for table, count in counts.items():
+        print(f"  - {table}: {count:,}")
+
+
+if __name__ == '__main__':
+    main()
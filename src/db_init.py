@@ -1,6 +1,6 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, update
 from sqlalchemy.orm import sessionmaker
-from models import Base, Product, Inventory, Supplier, PurchaseOrder, Shipment
+from models import Base, Product, Inventory, Supplier, PurchaseOrder, Shipment, DecisionLog, ReasoningBlob
 from datetime import datetime, timedelta
 import os
 
@@ -13,6 +13,182 @@ def init_database():
     return engine
 
 
+# Bump when the models change. prepare_database() re-runs create_all, adds
+# missing columns and indexes and re-runs the seed probe for any database
+# not stamped with this version.
+# 2: decision_log (timestamp, agent_name) index
+# 3: decision_log product/PO/cycle linkage, structured decision fields and indexes
+# 4: decision_archive_index table (retention.py)
+# 5: reasoning_blobs table, decision_log.reasoning_hash (inline reasoning moved to blobs)
+# 6: decision_search full-text index (SQLite FTS5)
+# 7: inventory (product_id) index
+SCHEMA_VERSION = 7
+
+
+def get_schema_version(engine):
+    """Version stamped in a SQLite database (PRAGMA user_version, 0 if never stamped)."""
+    with engine.connect() as connection:
+        return connection.exec_driver_sql('PRAGMA user_version').scalar()
+
+
+def prepare_database(engine=None, seed=True):
+    """
+    Make sure the schema exists and the database is seeded, cheaply when it is.
+    
+    A SQLite database already stamped with SCHEMA_VERSION is used as-is: one
+    PRAGMA read instead of create_all (a table probe per model) plus the seed
+    probe. Otherwise missing tables, columns and indexes are created, the
+    database is seeded if empty, and the version is stamped. Other databases always take the create_all path.
+    
+    Args:
+        engine: Engine to prepare (default: the application engine, DATABASE_URL)
+        seed: Seed the demo scenarios into an empty database (datagen.py
+            passes False and fills the catalog itself)
+    
+    Returns:
+        True if the database had to be initialized, False if it was current
+    """
+    if engine is None:
+        from db_service import engine
+    
+    is_sqlite = engine.dialect.name == 'sqlite'
+    if is_sqlite:
+        database = engine.url.database
+        if database and database != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(database)), exist_ok=True)
+        if get_schema_version(engine) == SCHEMA_VERSION:
+            return False
+    
+    Base.metadata.create_all(engine)
+    add_missing_columns(engine)
+    create_missing_indexes(engine)
+    backfill_decision_types(engine)
+    move_reasoning_to_blobs(engine)
+    build_search_index(engine)
+    if seed:
+        seed_data(engine)
+    
+    if is_sqlite:
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    return True
+
+
+def add_missing_columns(engine):
+    """
+    Add model columns missing from existing tables (ALTER TABLE ... ADD COLUMN).
+    
+    Only nullable columns can be added this way; existing rows get NULL.
+    Foreign keys of added columns are not enforced on SQLite (it cannot add
+    constraints to an existing table).
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.exec_driver_sql(
+                    f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                )
+
+
+def backfill_decision_types(engine):
+    """Derive decision_type for decision log rows written before it existed."""
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "UPDATE decision_log SET decision_type = CASE "
+            "WHEN decision LIKE 'REORDER%' THEN 'REORDER' "
+            "WHEN decision LIKE 'HOLD%' THEN 'HOLD' "
+            "WHEN decision = 'HUMAN_APPROVAL_REQUESTED' THEN decision "
+            "END "
+            "WHERE decision_type IS NULL"
+        )
+
+
+def move_reasoning_to_blobs(engine, batch_size=5000):
+    """
+    Move inline decision log reasoning into content-addressed blobs.
+    
+    Freed pages are reused by new rows; VACUUM returns them to the OS.
+    
+    Returns:
+        Number of rows moved
+    """
+    from db_service import store_reasoning
+    
+    Session = sessionmaker(bind=engine)
+    moved = 0
+    while True:
+        with Session() as session, session.begin():
+            rows = session.query(DecisionLog.id, DecisionLog.reasoning).filter(
+                DecisionLog.reasoning.is_not(None)
+            ).limit(batch_size).all()
+            if not rows:
+                return moved
+            hashes = store_reasoning(session, [reasoning for _, reasoning in rows])
+            session.execute(update(DecisionLog), [
+                {'id': log_id, 'reasoning': None, 'reasoning_hash': reasoning_hash}
+                for (log_id, _), reasoning_hash in zip(rows, hashes)
+            ])
+        moved += len(rows)
+
+
+def build_search_index(engine, batch_size=5000):
+    """
+    Create the decision_search full-text index and index existing decisions.
+    
+    Does nothing if the index already exists (the log writers keep it in sync).
+    
+    Returns:
+        Number of decisions indexed
+    """
+    from db_service import create_search_index, index_decisions, inflate_reasoning
+    
+    with engine.begin() as connection:
+        if not create_search_index(connection):
+            return 0
+    
+    Session = sessionmaker(bind=engine)
+    indexed = 0
+    last_id = 0
+    while True:
+        with Session() as session, session.begin():
+            rows = session.query(
+                DecisionLog.id, DecisionLog.decision, DecisionLog.reasoning, ReasoningBlob.data
+            ).outerjoin(
+                ReasoningBlob, ReasoningBlob.hash == DecisionLog.reasoning_hash
+            ).filter(
+                DecisionLog.id > last_id
+            ).order_by(DecisionLog.id).limit(batch_size).all()
+            if not rows:
+                return indexed
+            index_decisions(session, [
+                (log_id, decision, inflate_reasoning(reasoning, data))
+                for log_id, decision, reasoning, data in rows
+            ])
+        indexed += len(rows)
+        last_id = rows[-1][0]
+
+
+def create_missing_indexes(engine):
+    """
+    Create model indexes missing from existing tables.
+    
+    create_all only creates indexes together with a new table, so indexes
+    added to a model later have to be created separately on older databases.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
 def seed_data(engine):
     """
     Seed database with controlled multi-product scenarios.
@@ -117,6 +293,6 @@ def seed_data(engine):
 
 
 if __name__ == '__main__':
-    engine = init_database()
-    seed_data(engine)
-    print("\nDatabase initialized at data/supply_chain.db")
+    from db_service import DATABASE_URL
+    prepare_database()
+    print(f"\nDatabase ready at {DATABASE_URL}")
@@ -1,8 +1,18 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, func, insert, update, delete, select, text
+from sqlalchemy.orm import aliased, sessionmaker
 from contextlib import contextmanager
-from models import Product, Inventory, Supplier, PurchaseOrder, Shipment, DecisionLog
-from datetime import datetime
+from models import (
+    Product, Inventory, Supplier, PurchaseOrder, Shipment, DecisionLog, ReasoningBlob
+)
+from supplier_index import SupplierRanking
+from records import (
+    ProductRecord, InventoryRecord, SupplierRecord,
+    PurchaseOrderRecord, ShipmentRecord, Snapshot, DecisionLogRecord
+)
+from datetime import datetime, timedelta
+import threading
+import hashlib
+import zlib
 import os
 
 
@@ -12,6 +22,17 @@ engine = create_engine(DATABASE_URL, echo=False)
 SessionLocal = sessionmaker(bind=engine)
 
 
+if engine.dialect.name == 'sqlite':
+    @event.listens_for(engine, 'connect')
+    def _configure_sqlite(dbapi_connection, connection_record):
+        # WAL lets readers proceed during writes, and the busy timeout makes
+        # concurrent writers (e.g. sharded runner processes) wait instead of failing
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA busy_timeout=30000')
+        cursor.close()
+
+
 @contextmanager
 def get_session():
     """Context manager for database sessions"""
@@ -26,91 +47,166 @@ def get_session():
         session.close()
 
 
-# READ FUNCTIONS (for agents)
+# CATALOG CACHE (suppliers and products change rarely)
 
-def read_supply_chain_snapshot():
+class CatalogCache:
     """
-    Read complete supply chain state.
-    Returns a dictionary with all relevant data.
-    Used by agents for decision-making.
+    Read-through, versioned in-process cache for catalog data.
+    
+    Holds the supplier table (with its SupplierRanking index) and Product
+    rows so snapshot assembly only has to query volatile inventory, purchase
+    order and shipment rows.
+    
+    The version counter is bumped on every invalidation (catalog writes call
+    invalidate_catalog), so callers can tell when cached data was replaced.
+    Cached values are shared between callers and must be treated as read-only.
     """
-    with get_session() as session:
-        # Read product
-        product = session.query(Product).first()
+    
+    def __init__(self):
+        # Nodes run in worker threads, so guard the cache with a lock
+        self._lock = threading.Lock()
+        self._version = 0
+        self._suppliers = None
+        self._ranking = None
+        self._products = {}
+    
+    @property
+    def version(self):
+        return self._version
+    
+    def suppliers(self, session):
+        """Supplier table as a tuple of SupplierRecords, loaded on first use."""
+        return self._load_suppliers(session)[0]
+    
+    def supplier_candidates(self, session):
+        """Top supplier candidates (most reliable, fastest, Pareto frontier)."""
+        ranking = self._load_suppliers(session)[1]
+        with self._lock:
+            return ranking.candidates()
+    
+    def _load_suppliers(self, session):
+        with self._lock:
+            if self._suppliers is not None:
+                return self._suppliers, self._ranking
+            version = self._version
         
-        # Read inventory
-        inventory = session.query(Inventory).filter_by(product_id=product.id).first()
+        suppliers = tuple(
+            SupplierRecord(
+                id=s.id,
+                name=s.name,
+                lead_time_days=s.lead_time_days,
+                reliability_score=s.reliability_score
+            )
+            for s in session.query(Supplier).all()
+        )
+        ranking = SupplierRanking(suppliers)
         
-        # Read suppliers
-        suppliers = session.query(Supplier).all()
+        with self._lock:
+            # Don't store data read before a concurrent invalidation
+            if self._version == version:
+                self._suppliers = suppliers
+                self._ranking = ranking
+        return suppliers, ranking
+    
+    def apply_supplier_update(self, supplier):
+        """
+        Apply one written supplier row to the cache incrementally.
         
-        # Read active purchase orders
-        purchase_orders = session.query(PurchaseOrder).filter(
-            PurchaseOrder.status.in_(['pending', 'confirmed'])
-        ).all()
+        The supplier tuple is replaced (snapshots holding the old one are
+        unaffected); the ranking index is updated in place.
+        """
+        with self._lock:
+            if self._suppliers is not None:
+                others = tuple(s for s in self._suppliers if s.id != supplier.id)
+                self._suppliers = others + (supplier,)
+                self._ranking.upsert(supplier)
+            self._version += 1
+    
+    def product(self, session, product_id):
+        """ProductRecord (None if not found), loaded on first use."""
+        with self._lock:
+            if product_id in self._products:
+                return self._products[product_id]
+            version = self._version
         
-        # Read active shipments
-        shipments = session.query(Shipment).filter_by(status='in_transit').all()
-        
-        # Build snapshot dictionary
-        snapshot = {
-            'product': {
-                'id': product.id,
-                'name': product.name,
-                'sku': product.sku
-            },
-            'inventory': {
-                'quantity': inventory.quantity,
-                'reorder_point': inventory.reorder_point
-            },
-            'suppliers': [
-                {
-                    'id': s.id,
-                    'name': s.name,
-                    'lead_time_days': s.lead_time_days,
-                    'reliability_score': s.reliability_score
-                }
-                for s in suppliers
-            ],
-            'purchase_orders': [
-                {
-                    'id': po.id,
-                    'supplier_id': po.supplier_id,
-                    'quantity': po.quantity,
-                    'status': po.status,
-                    'created_at': po.created_at.isoformat()
-                }
-                for po in purchase_orders
-            ],
-            'shipments': [
-                {
-                    'id': sh.id,
-                    'po_id': sh.po_id,
-                    'status': sh.status,
-                    'expected_arrival': sh.expected_arrival.isoformat() if sh.expected_arrival else None
-                }
-                for sh in shipments
-            ]
-        }
+        product = session.query(Product).filter_by(id=product_id).first()
+        if product is None:
+            return None
         
-        return snapshot
+        entry = ProductRecord(id=product.id, name=product.name, sku=product.sku)
+        with self._lock:
+            if self._version == version:
+                self._products[product_id] = entry
+        return entry
+    
+    def invalidate(self, product_id=None, suppliers=False):
+        """
+        Drop cached entries and bump the version.
+        
+        Args:
+            product_id: Drop only this product's entry
+            suppliers: Drop the supplier table
+            
+        With no arguments, drops everything.
+        """
+        with self._lock:
+            if product_id is None and not suppliers:
+                self._suppliers = None
+                self._ranking = None
+                self._products.clear()
+            else:
+                if product_id is not None:
+                    self._products.pop(product_id, None)
+                if suppliers:
+                    self._suppliers = None
+                    self._ranking = None
+            self._version += 1
+
+
+_catalog = CatalogCache()
+
+
+def catalog_version():
+    """Current catalog cache version (bumped on every invalidation)."""
+    return _catalog.version
+
+
+def invalidate_catalog(product_id=None, suppliers=False):
+    """
+    Invalidate cached catalog data after writes.
+    
+    Args:
+        product_id: Invalidate only this product's cached row
+        suppliers: Invalidate the cached supplier table
+    
+    With no arguments, the whole catalog cache is dropped.
+    """
+    _catalog.invalidate(product_id=product_id, suppliers=suppliers)
+
+
+# READ FUNCTIONS (for agents)
 
 def read_supply_chain_snapshot(product_id=None):
     """
     Read complete supply chain state.
     
+    Product and supplier data come from the catalog cache; only the volatile
+    inventory, purchase order and shipment rows are queried each time.
+    
     Args:
         product_id: Optional. If provided, filters data for specific product.
                     If None, returns data for first product (default behavior).
     
-    Returns dictionary with all relevant data.
+    Returns:
+        Snapshot record with all relevant data
     """
     with get_session() as session:
         # Get product
         if product_id:
-            product = session.query(Product).filter_by(id=product_id).first()
+            product = _catalog.product(session, product_id)
         else:
-            product = session.query(Product).first()
+            first = session.query(Product).first()
+            product = _catalog.product(session, first.id) if first else None
         
         if not product:
             raise ValueError(f"Product not found: {product_id}")
@@ -118,8 +214,9 @@ def read_supply_chain_snapshot(product_id=None):
         # Read inventory for this product
         inventory = session.query(Inventory).filter_by(product_id=product.id).first()
         
-        # Read all suppliers (not product-specific)
-        suppliers = session.query(Supplier).all()
+        # Read all suppliers (not product-specific) and the ranked shortlist
+        suppliers = _catalog.suppliers(session)
+        supplier_candidates = _catalog.supplier_candidates(session)
         
         # Read purchase orders for this product
         purchase_orders = session.query(PurchaseOrder).filter(
@@ -138,49 +235,577 @@ def read_supply_chain_snapshot(product_id=None):
             shipments = []
         
         # Build snapshot
-        snapshot = {
-            'product': {
-                'id': product.id,
-                'name': product.name,
-                'sku': product.sku
-            },
-            'inventory': {
-                'quantity': inventory.quantity,
-                'reorder_point': inventory.reorder_point
-            },
-            'suppliers': [
-                {
-                    'id': s.id,
-                    'name': s.name,
-                    'lead_time_days': s.lead_time_days,
-                    'reliability_score': s.reliability_score
-                }
-                for s in suppliers
-            ],
-            'purchase_orders': [
-                {
-                    'id': po.id,
-                    'supplier_id': po.supplier_id,
-                    'quantity': po.quantity,
-                    'status': po.status,
-                    'created_at': po.created_at.isoformat()
-                }
+        snapshot = Snapshot(
+            product=product,
+            inventory=InventoryRecord(
+                quantity=inventory.quantity,
+                reorder_point=inventory.reorder_point
+            ),
+            suppliers=suppliers,
+            supplier_candidates=supplier_candidates,
+            purchase_orders=tuple(
+                PurchaseOrderRecord(
+                    id=po.id,
+                    supplier_id=po.supplier_id,
+                    quantity=po.quantity,
+                    status=po.status,
+                    created_at=po.created_at
+                )
                 for po in purchase_orders
-            ],
-            'shipments': [
-                {
-                    'id': sh.id,
-                    'po_id': sh.po_id,
-                    'status': sh.status,
-                    'expected_arrival': sh.expected_arrival.isoformat() if sh.expected_arrival else None
-                }
+            ),
+            shipments=tuple(
+                ShipmentRecord(
+                    id=sh.id,
+                    po_id=sh.po_id,
+                    status=sh.status,
+                    expected_arrival=sh.expected_arrival
+                )
                 for sh in shipments
-            ]
-        }
+            )
+        )
         
         return snapshot
 
 
+def read_supply_chain_snapshots(product_ids):
+    """
+    Read snapshots for many products at once.
+    
+    Same data as read_supply_chain_snapshot, but the inventory, purchase
+    order and shipment rows of the whole batch are fetched with three
+    column queries instead of three ORM queries per product. Used by the
+    pipelined portfolio runner to prefetch upcoming products.
+    
+    Args:
+        product_ids: Product IDs to read
+    
+    Returns:
+        Dictionary {product_id: Snapshot}; unknown products are omitted
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return {}
+    
+    with get_session() as session:
+        suppliers = _catalog.suppliers(session)
+        supplier_candidates = _catalog.supplier_candidates(session)
+        
+        product_rows = session.query(
+            Product.id, Product.name, Product.sku, Inventory.quantity, Inventory.reorder_point
+        ).join(
+            Inventory, Inventory.product_id == Product.id
+        ).filter(
+            Product.id.in_(product_ids)
+        ).order_by(Inventory.id).all()
+        
+        po_rows = session.query(
+            PurchaseOrder.id, PurchaseOrder.product_id, PurchaseOrder.supplier_id,
+            PurchaseOrder.quantity, PurchaseOrder.status, PurchaseOrder.created_at
+        ).filter(
+            PurchaseOrder.product_id.in_(product_ids),
+            PurchaseOrder.status.in_(['pending', 'confirmed'])
+        ).order_by(PurchaseOrder.id).all()
+        
+        po_product = {row[0]: row[1] for row in po_rows}
+        if po_product:
+            shipment_rows = session.query(
+                Shipment.id, Shipment.po_id, Shipment.status, Shipment.expected_arrival
+            ).filter(
+                Shipment.po_id.in_(list(po_product)),
+                Shipment.status == 'in_transit'
+            ).order_by(Shipment.id).all()
+        else:
+            shipment_rows = []
+    
+    # Group rows per product
+    purchase_orders = {}
+    for po_id, product_id, supplier_id, quantity, status, created_at in po_rows:
+        purchase_orders.setdefault(product_id, []).append(PurchaseOrderRecord(
+            id=po_id,
+            supplier_id=supplier_id,
+            quantity=quantity,
+            status=status,
+            created_at=created_at
+        ))
+    shipments = {}
+    for shipment_id, po_id, status, expected_arrival in shipment_rows:
+        shipments.setdefault(po_product[po_id], []).append(ShipmentRecord(
+            id=shipment_id,
+            po_id=po_id,
+            status=status,
+            expected_arrival=expected_arrival
+        ))
+    
+    snapshots = {}
+    for product_id, name, sku, quantity, reorder_point in product_rows:
+        if product_id in snapshots:
+            # Like the single-product reader, use the first inventory row
+            continue
+        snapshots[product_id] = Snapshot(
+            product=ProductRecord(id=product_id, name=name, sku=sku),
+            inventory=InventoryRecord(quantity=quantity, reorder_point=reorder_point),
+            suppliers=suppliers,
+            supplier_candidates=supplier_candidates,
+            purchase_orders=tuple(purchase_orders.get(product_id, ())),
+            shipments=tuple(shipments.get(product_id, ()))
+        )
+    
+    return snapshots
+
+
+def search_products(query='', limit=50, offset=0):
+    """
+    Page through products matching a search, for product pickers.
+    
+    Filtering and pagination run in SQL, so a picker over a large catalog
+    only loads one page of rows.
+    
+    Args:
+        query: Case-insensitive substring of the product name or SKU ('' matches all)
+        limit: Page size
+        offset: Rows to skip (page * limit)
+    
+    Returns:
+        (list of ProductRecords ordered by ID, total number of matches)
+    """
+    with get_session() as session:
+        products = session.query(Product.id, Product.name, Product.sku)
+        query = (query or '').strip()
+        if query:
+            pattern = f'%{query}%'
+            products = products.filter(Product.name.ilike(pattern) | Product.sku.ilike(pattern))
+        
+        total = products.order_by(None).count()
+        rows = products.order_by(Product.id).limit(limit).offset(offset).all()
+    
+    return [ProductRecord(id=row[0], name=row[1], sku=row[2]) for row in rows], total
+
+
+def query_decisions(product_id=None, decision_type=None, agent_name=None, cycle_id=None,
+                    since=None, until=None, limit=50, offset=0):
+    """
+    Page through the decision log, newest first.
+    
+    Every filter is optional and combined with AND. Product, decision type
+    and time-range filters are served by decision_log indexes.
+    
+    Args:
+        product_id: Only decisions for this product
+        decision_type: Only this decision type (REORDER, HOLD, HUMAN_APPROVAL_REQUESTED)
+        agent_name: Only decisions logged by this agent
+        cycle_id: Only decisions of this cycle
+        since: Only decisions at or after this datetime
+        until: Only decisions before this datetime
+        limit: Page size
+        offset: Rows to skip (page * limit)
+    
+    Returns:
+        (list of DecisionLogRecords, total number of matches)
+    """
+    with get_session() as session:
+        decisions = session.query(DecisionLog, ReasoningBlob.data).outerjoin(
+            ReasoningBlob, ReasoningBlob.hash == DecisionLog.reasoning_hash
+        )
+        if product_id is not None:
+            decisions = decisions.filter(DecisionLog.product_id == product_id)
+        if decision_type is not None:
+            decisions = decisions.filter(DecisionLog.decision_type == decision_type)
+        if agent_name is not None:
+            decisions = decisions.filter(DecisionLog.agent_name == agent_name)
+        if cycle_id is not None:
+            decisions = decisions.filter(DecisionLog.cycle_id == cycle_id)
+        if since is not None:
+            decisions = decisions.filter(DecisionLog.timestamp >= since)
+        if until is not None:
+            decisions = decisions.filter(DecisionLog.timestamp < until)
+        
+        total = decisions.with_entities(func.count(DecisionLog.id)).scalar()
+        rows = decisions.order_by(
+            DecisionLog.timestamp.desc(), DecisionLog.id.desc()
+        ).limit(limit).offset(offset).all()
+        
+        return [_decision_record(row, data) for row, data in rows], total
+
+
+# Matches counted per search. Ranking needs every match scored, so searches
+# matching at least this many decisions are returned newest first instead.
+SEARCH_COUNT_LIMIT = 10000
+
+
+def search_decisions(query, product_id=None, limit=20, offset=0):
+    """
+    Full-text search over decision summaries and reasoning, best matches first.
+    
+    Served by the decision_search FTS5 index (SQLite), ranked by BM25.
+    Each whitespace-separated term must appear (case-insensitive, stemmed);
+    a trailing * makes a term a prefix, e.g. "expedit* overdue".
+    Searches too broad to rank quickly (SEARCH_COUNT_LIMIT or more matches)
+    and searches within one product's (short) history are returned newest
+    first: BM25 needs corpus-wide term statistics, which would cost more
+    than the product's matches themselves.
+    
+    Args:
+        query: Search terms
+        product_id: Only decisions for this product
+        limit: Page size
+        offset: Rows to skip (page * limit)
+    
+    Returns:
+        (list of DecisionLogRecords, number of matches counted up to
+        SEARCH_COUNT_LIMIT: a total equal to the limit means "at least")
+    """
+    match = _match_expression(query)
+    if match is None:
+        return [], 0
+    
+    where = 'decision_search MATCH :match'
+    params = {'match': match, 'limit': limit, 'offset': offset, 'count_limit': SEARCH_COUNT_LIMIT}
+    if product_id is not None:
+        where += ' AND decision_search.rowid IN (SELECT id FROM decision_log WHERE product_id = :product_id)'
+        params['product_id'] = product_id
+    
+    with get_session() as session:
+        total = session.execute(
+            text(f'SELECT count(*) FROM (SELECT rowid FROM decision_search WHERE {where} LIMIT :count_limit)'),
+            params
+        ).scalar()
+        ranked = product_id is None and total < SEARCH_COUNT_LIMIT
+        order = 'rank' if ranked else 'rowid DESC'
+        log_ids = session.execute(
+            text(f'SELECT rowid FROM decision_search WHERE {where} ORDER BY {order} LIMIT :limit OFFSET :offset'),
+            params
+        ).scalars().all()
+        
+        rows = session.query(DecisionLog, ReasoningBlob.data).outerjoin(
+            ReasoningBlob, ReasoningBlob.hash == DecisionLog.reasoning_hash
+        ).filter(DecisionLog.id.in_(log_ids)).all()
+        records = {row.id: _decision_record(row, data) for row, data in rows}
+    
+    return [records[log_id] for log_id in log_ids if log_id in records], total
+
+
+def _match_expression(query):
+    """FTS5 MATCH expression requiring every term (quoted, so operators and punctuation are literal)."""
+    terms = []
+    for term in (query or '').split():
+        prefix = term.endswith('*')
+        term = term.rstrip('*')
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"' + ('*' if prefix else ''))
+    return ' '.join(terms) or None
+
+
+def _decision_record(row, blob_data):
+    return DecisionLogRecord(
+        id=row.id,
+        timestamp=row.timestamp,
+        agent_name=row.agent_name,
+        decision=row.decision,
+        reasoning=inflate_reasoning(row.reasoning, blob_data),
+        product_id=row.product_id,
+        po_id=row.po_id,
+        cycle_id=row.cycle_id,
+        decision_type=row.decision_type,
+        supplier_id=row.supplier_id,
+        quantity=row.quantity,
+        expedite=row.expedite
+    )
+
+
+def read_suppliers():
+    """
+    Read the supplier table (served from the catalog cache).
+    Supplier data is not product-specific, so run-level stages read it once.
+    """
+    with get_session() as session:
+        return _catalog.suppliers(session)
+
+
+def read_portfolio_columns(product_ids=None):
+    """
+    Read inventory, purchase order and shipment columns for many products.
+    
+    Selects plain column tuples (no ORM objects) so whole-catalog reads stay cheap.
+    Used by the vectorized scheduler and pre-screen.
+    
+    Args:
+        product_ids: Optional list of product IDs. If None, reads every product.
+    
+    Returns:
+        Dictionary of column groups (parallel lists):
+        - 'inventory': product_id, name, sku, quantity, reorder_point
+        - 'active_pos': product_id, count (active purchase orders per product)
+        - 'inbound': product_id, expected_arrival, reliability_score
+          (one row per in-transit shipment on an active purchase order)
+    """
+    with get_session() as session:
+        inventory_query = session.query(
+            Inventory.product_id, Product.name, Product.sku,
+            Inventory.quantity, Inventory.reorder_point
+        ).join(
+            Product, Product.id == Inventory.product_id
+        )
+        active_po_query = session.query(
+            PurchaseOrder.product_id, func.count(PurchaseOrder.id)
+        ).filter(
+            PurchaseOrder.status.in_(['pending', 'confirmed'])
+        ).group_by(
+            PurchaseOrder.product_id
+        )
+        inbound_query = session.query(
+            PurchaseOrder.product_id, Shipment.expected_arrival, Supplier.reliability_score
+        ).join(
+            Shipment, Shipment.po_id == PurchaseOrder.id
+        ).join(
+            Supplier, Supplier.id == PurchaseOrder.supplier_id
+        ).filter(
+            PurchaseOrder.status.in_(['pending', 'confirmed']),
+            Shipment.status == 'in_transit'
+        )
+        
+        if product_ids is not None:
+            inventory_query = inventory_query.filter(Inventory.product_id.in_(product_ids))
+            active_po_query = active_po_query.filter(PurchaseOrder.product_id.in_(product_ids))
+            inbound_query = inbound_query.filter(PurchaseOrder.product_id.in_(product_ids))
+        
+        inventory_rows = inventory_query.all()
+        active_po_rows = active_po_query.all()
+        inbound_rows = inbound_query.all()
+    
+    return {
+        'inventory': {
+            'product_id': [row[0] for row in inventory_rows],
+            'name': [row[1] for row in inventory_rows],
+            'sku': [row[2] for row in inventory_rows],
+            'quantity': [row[3] for row in inventory_rows],
+            'reorder_point': [row[4] for row in inventory_rows]
+        },
+        'active_pos': {
+            'product_id': [row[0] for row in active_po_rows],
+            'count': [row[1] for row in active_po_rows]
+        },
+        'inbound': {
+            'product_id': [row[0] for row in inbound_rows],
+            'expected_arrival': [row[1] for row in inbound_rows],
+            'reliability_score': [row[2] for row in inbound_rows]
+        }
+    }
+
+
+def _hour_bucket(column):
+    """SQL expression truncating a timestamp column to its hour."""
+    if engine.dialect.name == 'sqlite':
+        return func.strftime('%Y-%m-%d %H:00', column)
+    return func.date_trunc('hour', column)
+
+
+def read_portfolio_overview(hours=24, now=None):
+    """
+    Portfolio-wide dashboard figures, computed by SQL aggregates.
+    
+    Every figure is a COUNT (or a grouped COUNT) evaluated in the database,
+    so the cost does not depend on loading per-product rows into Python.
+    
+    Args:
+        hours: Window for the decision and approval figures
+        now: Reference time (default: utcnow)
+    
+    Returns:
+        Dictionary with:
+        - 'products': number of products
+        - 'below_reorder_point': products whose stock is below their reorder point
+        - 'overdue_shipments': in-transit shipments past their expected arrival
+        - 'pending_approvals': approval requests whose cycle has not executed a
+          decision yet (rows logged before cycle IDs existed are not counted)
+        - 'approval_requests': approvals requested within the window
+        - 'decisions': decisions logged within the window
+        - 'decisions_per_hour': list of (hour, count) within the window, oldest first
+    """
+    now = now or datetime.utcnow()
+    since = now - timedelta(hours=hours)
+    decision_agents = ['coordinator', 'prescreen']
+    
+    with get_session() as session:
+        products = session.query(func.count(Product.id)).scalar()
+        below_reorder_point = session.query(func.count(Inventory.id)).filter(
+            Inventory.quantity < Inventory.reorder_point
+        ).scalar()
+        overdue_shipments = session.query(func.count(Shipment.id)).filter(
+            Shipment.status == 'in_transit',
+            Shipment.expected_arrival < now
+        ).scalar()
+        # Derived from the decision log (nothing writes approval_queue): a
+        # request is pending until its cycle logs the executed decision
+        executed = aliased(DecisionLog)
+        pending_approvals = session.query(func.count(DecisionLog.id)).filter(
+            DecisionLog.decision_type == 'HUMAN_APPROVAL_REQUESTED',
+            DecisionLog.cycle_id.isnot(None),
+            ~select(executed.id).where(
+                executed.cycle_id == DecisionLog.cycle_id,
+                executed.agent_name == 'coordinator'
+            ).exists()
+        ).scalar()
+        approval_requests = session.query(func.count(DecisionLog.id)).filter(
+            DecisionLog.timestamp >= since,
+            DecisionLog.agent_name == 'system',
+            DecisionLog.decision == 'HUMAN_APPROVAL_REQUESTED'
+        ).scalar()
+        
+        hour = _hour_bucket(DecisionLog.timestamp)
+        decisions_per_hour = session.query(hour, func.count(DecisionLog.id)).filter(
+            DecisionLog.timestamp >= since,
+            DecisionLog.agent_name.in_(decision_agents)
+        ).group_by(hour).order_by(hour).all()
+    
+    return {
+        'products': products,
+        'below_reorder_point': below_reorder_point,
+        'overdue_shipments': overdue_shipments,
+        'pending_approvals': pending_approvals,
+        'approval_requests': approval_requests,
+        'decisions': sum(count for _, count in decisions_per_hour),
+        'decisions_per_hour': [(str(bucket), count) for bucket, count in decisions_per_hour]
+    }
+
+
+# REASONING BLOBS (content-addressed, zlib-compressed)
+
+# zlib level for reasoning blobs (6: most of level 9's ratio at a fraction of the CPU)
+REASONING_COMPRESSION_LEVEL = 6
+
+
+def store_reasoning(session, texts):
+    """
+    Store reasoning texts as content-addressed blobs in the given session.
+    
+    Each distinct text is stored once, keyed by the SHA-256 of its content
+    and zlib-compressed; texts already stored are not rewritten.
+    
+    On SQLite every blob goes through INSERT OR IGNORE, even ones already
+    stored: the write takes the database write lock before the caller relies
+    on the blob, so delete_unreferenced_reasoning cannot remove it between a
+    check and the insert of the rows referring to it.
+    
+    Args:
+        session: Session of the transaction writing the referencing rows
+        texts: Reasoning strings (None entries stay None)
+    
+    Returns:
+        List of blob hashes, aligned with texts
+    """
+    hashes = []
+    new_blobs = {}
+    for text in texts:
+        if text is None:
+            hashes.append(None)
+            continue
+        raw = text.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        hashes.append(digest)
+        new_blobs.setdefault(digest, raw)
+    
+    blob_insert = insert(ReasoningBlob)
+    if session.get_bind().dialect.name == 'sqlite':
+        blob_insert = blob_insert.prefix_with('OR IGNORE')
+    elif new_blobs:
+        stored = session.scalars(
+            select(ReasoningBlob.hash).where(ReasoningBlob.hash.in_(list(new_blobs)))
+        )
+        for digest in stored:
+            del new_blobs[digest]
+    if new_blobs:
+        session.execute(blob_insert, [
+            {'hash': digest, 'data': zlib.compress(raw, REASONING_COMPRESSION_LEVEL), 'size': len(raw)}
+            for digest, raw in new_blobs.items()
+        ])
+    
+    return hashes
+
+
+def inflate_reasoning(inline_text, blob_data):
+    """Reasoning text of a decision log row: its blob if it has one, else the legacy inline text."""
+    if blob_data is None:
+        return inline_text
+    return zlib.decompress(blob_data).decode('utf-8')
+
+
+def delete_unreferenced_reasoning():
+    """
+    Delete reasoning blobs no decision log row refers to (e.g. after archiving).
+    
+    Returns:
+        Number of blobs deleted
+    """
+    with get_session() as session:
+        referenced = select(DecisionLog.reasoning_hash).where(DecisionLog.reasoning_hash.is_not(None))
+        result = session.execute(delete(ReasoningBlob).where(ReasoningBlob.hash.not_in(referenced)))
+        return result.rowcount
+
+
+# DECISION SEARCH INDEX (SQLite FTS5)
+#
+# decision_search is contentless (content=''): it stores only the token
+# index, since the text itself already lives in reasoning_blobs. It is kept
+# in sync by the functions writing decision_log, in the same transaction.
+# Removing a row from a contentless index needs the text it was indexed
+# with, so callers pass the old decision and reasoning.
+
+def create_search_index(connection):
+    """
+    Create the decision_search index if it does not exist (SQLite only).
+    
+    Returns:
+        True if it was created (existing decisions still need indexing)
+    """
+    if connection.dialect.name != 'sqlite':
+        return False
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = 'decision_search'"
+    ).scalar()
+    if exists:
+        return False
+    connection.exec_driver_sql(
+        "CREATE VIRTUAL TABLE decision_search USING fts5("
+        "decision, reasoning, content='', tokenize='porter unicode61')"
+    )
+    return True
+
+
+def index_decisions(session, entries):
+    """
+    Add decisions to the search index.
+    
+    Args:
+        session: Session of the transaction writing the decision log rows
+        entries: Iterable of (log_id, decision, reasoning)
+    """
+    _write_search_index(session, entries, "INSERT INTO decision_search (rowid, decision, reasoning) "
+                                          "VALUES (:id, :decision, :reasoning)")
+
+
+def unindex_decisions(session, entries):
+    """
+    Remove decisions from the search index.
+    
+    Args:
+        session: Session of the transaction changing or deleting the rows
+        entries: Iterable of (log_id, decision, reasoning) exactly as indexed
+    """
+    _write_search_index(session, entries, "INSERT INTO decision_search (decision_search, rowid, decision, reasoning) "
+                                          "VALUES ('delete', :id, :decision, :reasoning)")
+
+
+def _write_search_index(session, entries, statement):
+    if session.get_bind().dialect.name != 'sqlite':
+        return
+    params = [
+        {'id': log_id, 'decision': decision, 'reasoning': reasoning or ''}
+        for log_id, decision, reasoning in entries
+    ]
+    if params:
+        session.execute(text(statement), params)
+
+
 # WRITE FUNCTIONS (for execution nodes only)
 
 def create_purchase_order(supplier_id, product_id, quantity):
@@ -203,21 +828,125 @@ def create_purchase_order(supplier_id, product_id, quantity):
     return po_id
 
 
-def log_decision(agent_name, decision, reasoning):
+def upsert_supplier(name, lead_time_days, reliability_score, supplier_id=None):
+    """
+    Create or update a supplier.
+    The cached supplier table and ranking index are updated incrementally.
+    
+    Returns:
+        Supplier ID
+    """
+    with get_session() as session:
+        supplier = session.get(Supplier, supplier_id) if supplier_id else None
+        if supplier is None:
+            supplier = Supplier(id=supplier_id)
+            session.add(supplier)
+        supplier.name = name
+        supplier.lead_time_days = lead_time_days
+        supplier.reliability_score = reliability_score
+        session.flush()
+        entry = SupplierRecord(
+            id=supplier.id,
+            name=supplier.name,
+            lead_time_days=supplier.lead_time_days,
+            reliability_score=supplier.reliability_score
+        )
+    
+    _catalog.apply_supplier_update(entry)
+    return entry.id
+
+
+def log_decision(agent_name, decision, reasoning, product_id=None, po_id=None, cycle_id=None,
+                 decision_type=None, supplier_id=None, quantity=None, expedite=None):
     """
     Log an agent's decision with reasoning.
     Only called from execution nodes, never from agents.
+    
+    Args:
+        agent_name: Who decided ('coordinator', 'system', ...)
+        decision: Human-readable decision summary
+        reasoning: Explanation of the decision
+        product_id, po_id, cycle_id: Product, purchase order and cycle the decision belongs to
+        decision_type, supplier_id, quantity, expedite: Structured decision fields
+    
+    Returns:
+        Decision log ID
     """
     with get_session() as session:
         log_entry = DecisionLog(
             agent_name=agent_name,
             decision=decision,
-            reasoning=reasoning,
-            timestamp=datetime.utcnow()
+            reasoning_hash=store_reasoning(session, [reasoning])[0],
+            timestamp=datetime.utcnow(),
+            product_id=product_id,
+            po_id=po_id,
+            cycle_id=cycle_id,
+            decision_type=decision_type,
+            supplier_id=supplier_id,
+            quantity=quantity,
+            expedite=expedite
         )
         session.add(log_entry)
         session.flush()
         log_id = log_entry.id
+        index_decisions(session, [(log_id, decision, reasoning)])
         
     return log_id
 
+
+def update_decision_reasoning(log_id, reasoning):
+    """
+    Replace a logged decision's reasoning.
+    Used to backfill deferred explanations (see explanations.py).
+    """
+    with get_session() as session:
+        old = session.query(DecisionLog, ReasoningBlob.data).outerjoin(
+            ReasoningBlob, ReasoningBlob.hash == DecisionLog.reasoning_hash
+        ).filter(DecisionLog.id == log_id).first()
+        if old is None:
+            return
+        row, data = old
+        unindex_decisions(session, [(log_id, row.decision, inflate_reasoning(row.reasoning, data))])
+        session.execute(
+            update(DecisionLog).where(DecisionLog.id == log_id).values(
+                reasoning=None,
+                reasoning_hash=store_reasoning(session, [reasoning])[0]
+            )
+        )
+        index_decisions(session, [(log_id, row.decision, reasoning)])
+
+
+def log_decisions(entries):
+    """
+    Log many decisions in one transaction.
+    Used by the portfolio pre-screen, which auto-decides products in bulk.
+    
+    Args:
+        entries: List of dicts with agent_name, decision, reasoning and
+                 optionally any of log_decision()'s linkage and structured fields
+    
+    Returns:
+        List of decision log IDs, in the same order as entries
+    """
+    if not entries:
+        return []
+    
+    timestamp = datetime.utcnow()
+    
+    with get_session() as session:
+        hashes = store_reasoning(session, [entry.get('reasoning') for entry in entries])
+        rows = [
+            {**entry, 'reasoning': None, 'reasoning_hash': reasoning_hash, 'timestamp': timestamp}
+            for entry, reasoning_hash in zip(entries, hashes)
+        ]
+        result = session.execute(
+            insert(DecisionLog).returning(DecisionLog.id, sort_by_parameter_order=True),
+            rows
+        )
+        log_ids = list(result.scalars())
+        index_decisions(session, [
+            (log_id, entry['decision'], entry.get('reasoning'))
+            for log_id, entry in zip(log_ids, entries)
+        ])
+    
+    return log_ids
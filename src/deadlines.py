@@ -0,0 +1,68 @@
+"""
+Per-node and whole-cycle deadlines for agent nodes.
+
+A slow LLM response should not hold up a cycle indefinitely. Every agent
+node runs under a deadline; when it is exceeded, the node's rule-derived
+fallback output is used instead. The fallback is flagged
+(``fallback=True``) so the decision gate escalates the decision for review.
+
+Configuration (seconds):
+- AGENT_TIMEOUT_S: default per-node deadline (default 45)
+- <NODE>_TIMEOUT_S: per-node override, e.g. COORDINATOR_TIMEOUT_S=60
+- CYCLE_TIMEOUT_S: deadline for the whole cycle, counted from data
+  ingestion (default 120). Each node gets at most the time remaining.
+"""
+
+import os
+import time
+import asyncio
+from functools import wraps
+
+
+DEFAULT_AGENT_TIMEOUT_S = float(os.getenv('AGENT_TIMEOUT_S', '45'))
+CYCLE_TIMEOUT_S = float(os.getenv('CYCLE_TIMEOUT_S', '120'))
+
+
+def node_timeout(node_name: str) -> float:
+    """Configured deadline for one node, in seconds."""
+    return float(os.getenv(f'{node_name.upper()}_TIMEOUT_S', DEFAULT_AGENT_TIMEOUT_S))
+
+
+def start_cycle_deadline() -> float:
+    """Deadline (time.monotonic() based) for a cycle starting now."""
+    return time.monotonic() + CYCLE_TIMEOUT_S
+
+
+def remaining_budget(state, node_name: str) -> float:
+    """Seconds the node may run: its own deadline, capped by the cycle's."""
+    budget = node_timeout(node_name)
+    cycle_deadline = state.get('cycle_deadline')
+    if cycle_deadline is not None:
+        budget = min(budget, cycle_deadline - time.monotonic())
+    return budget
+
+
+def with_deadline(node_name: str, node, fallback):
+    """
+    Wrap an async agent node so it returns `fallback(state)` on timeout.
+
+    Args:
+        node_name: Graph node name (selects <NODE>_TIMEOUT_S)
+        node: Async node function
+        fallback: Sync function returning the node's rule-derived state update
+
+    Returns:
+        Async node function with the same signature
+    """
+    @wraps(node)
+    async def run_with_deadline(state):
+        budget = remaining_budget(state, node_name)
+        if budget <= 0:
+            # Cycle deadline already passed: skip the LLM entirely
+            return fallback(state)
+        try:
+            return await asyncio.wait_for(node(state), timeout=budget)
+        except asyncio.TimeoutError:
+            return fallback(state)
+
+    return run_with_deadline
@@ -0,0 +1,232 @@
+"""
+Deferred explanation generation.
+
+The inventory action and quantity are deterministic, and so is the
+coordinator's decision when it follows the coordination rules directly.
+With EXPLANATION_MODE=deferred those nodes emit their structured output
+straight away with a templated explanation (flagged
+``explanation_pending=True``), the purchase order and decision log are
+written immediately, and the LLM narratives are generated afterwards by a
+background worker. When a narrative arrives, the worker:
+- Backfills DecisionLog.reasoning for the cycle's logged decision (for a
+  HOLD pruned past the coordinator, that is the inventory narrative)
+- Emits an ``explanation`` event, which the job queue uses to update the
+  job's stored result
+
+Configuration:
+- EXPLANATION_MODE: "inline" (default, explain before deciding) or "deferred"
+- EXPLANATION_WORKERS: concurrent narrative requests per process (default 4)
+"""
+
+import os
+import asyncio
+import weakref
+from dataclasses import dataclass
+
+
+EXPLANATION_MODE = os.getenv('EXPLANATION_MODE', 'inline').lower()
+EXPLANATION_WORKERS = int(os.getenv('EXPLANATION_WORKERS', '4'))
+
+# Node name used for backfill events passed to on_event callbacks
+EXPLANATION_EVENT = 'explanation'
+
+# One worker per event loop (its tasks and LLM clients cannot cross loops)
+_workers = weakref.WeakKeyDictionary()
+
+
+def explanations_deferred() -> bool:
+    """True when explanation prompts run after the decision instead of before it."""
+    return EXPLANATION_MODE == 'deferred'
+
+
+@dataclass(frozen=True, slots=True)
+class ExplanationTask:
+    """One narrative to generate for an already-taken decision."""
+    agent: str                  # 'inventory' or 'coordinator' (selects the model profile)
+    prompt: str
+    product_id: int
+    log_id: int | None = None   # DecisionLog row to backfill, if the decision was logged
+    log_prefix: str = ''        # Logged ahead of the narrative (e.g. a synthesized HOLD's)
+
+
+class ExplanationWorker:
+    """
+    Background pool generating narratives off the cycle's critical path.
+
+    Tasks are queued without blocking the caller. A failed request leaves
+    the templated explanation in place.
+
+    Args:
+        workers: Number of narrative requests in flight at once
+    """
+
+    def __init__(self, workers: int = EXPLANATION_WORKERS):
+        self._num_workers = workers
+        self._pending = asyncio.Queue()
+        self._workers = []
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker())
+                for _ in range(self._num_workers)
+            ]
+
+    def submit(self, task: ExplanationTask, on_done=None) -> None:
+        """
+        Queue a narrative.
+
+        Args:
+            task: What to explain and where to store it
+            on_done: Optional callback ``on_done(task, reasoning)`` after the backfill
+        """
+        self.start()
+        self.submitted += 1
+        self._pending.put_nowait((task, on_done))
+
+    async def drain(self) -> None:
+        """Wait until every queued narrative has been generated (or has failed)."""
+        await self._pending.join()
+
+    async def shutdown(self) -> None:
+        """Cancel the workers, abandoning queued narratives."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> dict:
+        return {
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'pending': self.submitted - self.completed - self.failed
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            task, on_done = await self._pending.get()
+            try:
+                reasoning = await _generate(task)
+                if on_done is not None:
+                    on_done(task, reasoning)
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failed += 1
+            finally:
+                self._pending.task_done()
+
+
+async def _generate(task: ExplanationTask) -> str:
+    """Run one narrative prompt and backfill the decision log."""
+    from llm_config import invoke_llm
+    from db_service import update_decision_reasoning
+
+    response = await invoke_llm(
+        task.prompt,
+        agent=task.agent,
+        config={
+            "run_name": f"{task.agent}_deferred_explanation",
+            "tags": [task.agent, "explanation", "deferred"],
+            "metadata": {
+                "agent": task.agent,
+                "product_id": task.product_id,
+                "decision_log_id": task.log_id
+            }
+        }
+    )
+    reasoning = response.content.strip()
+    if task.log_id is not None:
+        logged = f'{task.log_prefix} {reasoning}'.strip()
+        await asyncio.to_thread(update_decision_reasoning, task.log_id, logged)
+    return reasoning
+
+
+def get_explanation_worker() -> ExplanationWorker:
+    """The explanation worker for the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    worker = _workers.get(loop)
+    if worker is None:
+        worker = ExplanationWorker()
+        _workers[loop] = worker
+    return worker
+
+
+def schedule_explanations(final_state: dict, on_event=None) -> int:
+    """
+    Queue narratives for a finished cycle's pending explanations.
+
+    Args:
+        final_state: Final graph state (records, not yet serialized)
+        on_event: Optional callback ``on_event(EXPLANATION_EVENT, update)`` invoked
+                  as each narrative arrives, where update is
+                  {'agent_outputs': {'inventory': {...}}} or {'final_decision': {...}};
+                  without it, only narratives backfilling a logged decision are queued
+
+    Returns:
+        Number of narratives queued
+    """
+    from agents.inventory_agent import inventory_explanation_prompt
+    from agents.coordinator_agent import decision_explanation_prompt
+    from nodes.hold_synthesis import HOLD_EXPLANATION_PREFIX, decided_by_hold_synthesizer, hold_explanation
+
+    snapshot = final_state.get('db_snapshot')
+    agent_outputs = final_state.get('agent_outputs') or {}
+    final_decision = final_state.get('final_decision')
+    if snapshot is None:
+        return 0
+
+    tasks = []
+    log_id = getattr(agent_outputs.get('execution'), 'log_id', None)
+    # A pruned HOLD is explained (and logged) with the inventory reasoning,
+    # so its narrative backfills the decision too, not a coordinator one
+    hold_synthesized = final_decision is not None and decided_by_hold_synthesizer(agent_outputs)
+    inventory_output = agent_outputs.get('inventory')
+    # Otherwise the inventory narrative is only delivered through on_event
+    # (no log row holds it), so without a listener it is not worth an LLM call
+    if (inventory_output is not None and inventory_output.explanation_pending
+            and (on_event is not None or hold_synthesized)):
+        tasks.append(ExplanationTask(
+            agent='inventory',
+            prompt=inventory_explanation_prompt(snapshot, agent_outputs),
+            product_id=snapshot.product.id,
+            log_id=log_id if hold_synthesized else None,
+            log_prefix=HOLD_EXPLANATION_PREFIX if hold_synthesized else ''
+        ))
+    if final_decision is not None and final_decision.explanation_pending and not hold_synthesized:
+        tasks.append(ExplanationTask(
+            agent='coordinator',
+            prompt=decision_explanation_prompt(snapshot, agent_outputs, final_decision),
+            product_id=snapshot.product.id,
+            log_id=log_id
+        ))
+    if not tasks:
+        return 0
+
+    def on_done(task, reasoning):
+        if task.agent == 'inventory':
+            update = {'agent_outputs': {'inventory': {'reasoning': reasoning, 'explanation_pending': False}}}
+            if hold_synthesized:
+                update['final_decision'] = {'explanation': hold_explanation(reasoning), 'explanation_pending': False}
+        else:
+            update = {'final_decision': {'explanation': reasoning, 'explanation_pending': False}}
+        on_event(EXPLANATION_EVENT, update)
+
+    worker = get_explanation_worker()
+    for task in tasks:
+        worker.submit(task, on_done if on_event is not None else None)
+    return len(tasks)
+
+
+async def drain_explanations() -> dict:
+    """Wait for this loop's queued narratives; returns the worker's counters."""
+    worker = _workers.get(asyncio.get_running_loop())
+    if worker is None:
+        return {'submitted': 0, 'completed': 0, 'failed': 0, 'pending': 0}
+    await worker.drain()
+    return worker.stats()
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from langgraph.graph import StateGraph, END
 from state import SupplyChainState
 
@@ -7,15 +9,89 @@ from nodes.decision_gate import decision_gate_node, should_request_human_approva
 from nodes.execution import execution_node
 from nodes.human_approval import human_approval_node, post_approval_routing
 
-# Import all agents
-from agents.demand_agent import demand_agent_node
-from agents.inventory_agent import inventory_agent_node
-from agents.risk_agent import risk_agent_node
-from agents.logistics_agent import logistics_agent_node
-from agents.coordinator_agent import coordinator_agent_node
+# Import all agents (and their rule-derived deadline fallbacks)
+from agents.demand_agent import demand_agent_node, demand_fallback
+from agents.inventory_agent import inventory_agent_node, inventory_fallback
+from agents.risk_agent import risk_agent_node, risk_fallback
+from agents.logistics_agent import logistics_agent_node, logistics_fallback
+from agents.coordinator_agent import coordinator_agent_node, coordinator_fallback
+from nodes.hold_synthesis import (
+    hold_synthesizer_node, route_after_inventory_decision, HOLD_PRUNING, HOLD_PRUNING_MODES
+)
+from deadlines import with_deadline
+
+
+# Agent nodes in flow order: (node name, node, fallback used on deadline)
+AGENT_NODES = [
+    ("demand_agent", demand_agent_node, demand_fallback),
+    ("inventory_agent", inventory_agent_node, inventory_fallback),
+    ("risk_agent", risk_agent_node, risk_fallback),
+    ("logistics_agent", logistics_agent_node, logistics_fallback),
+    ("coordinator", coordinator_agent_node, coordinator_fallback),
+]
+
+
+def add_agent_nodes(workflow):
+    """Add every agent node, each bounded by its deadline (see deadlines.py)."""
+    for name, node, fallback in AGENT_NODES:
+        workflow.add_node(name, with_deadline(name, node, fallback))
+
+
+def add_agent_edges(workflow, hold_pruning: str = HOLD_PRUNING):
+    """
+    Wire data ingestion through the agents to the decision gate.
+    
+    Without pruning the agents run in sequence:
+        ingest → demand → inventory → risk → logistics → coordinator → gate
+    With pruning, a HOLD from the inventory agent takes a shorter path
+    ending in the deterministic HOLD synthesizer instead of the coordinator:
+        standard:   inventory → risk → hold_synthesizer → gate
+        aggressive: inventory → hold_synthesizer → gate
+    
+    Args:
+        workflow: StateGraph with the agent nodes already added
+        hold_pruning: "off", "standard" or "aggressive" (default: HOLD_PRUNING)
+    """
+    if hold_pruning not in HOLD_PRUNING_MODES:
+        raise ValueError(f"Unknown HOLD_PRUNING mode: {hold_pruning} (expected one of {HOLD_PRUNING_MODES})")
+    
+    workflow.add_edge("ingest_data", "demand_agent")
+    workflow.add_edge("demand_agent", "inventory_agent")
+    
+    if hold_pruning == "off":
+        workflow.add_edge("inventory_agent", "risk_agent")
+        workflow.add_edge("risk_agent", "logistics_agent")
+    else:
+        workflow.add_node("hold_synthesizer", hold_synthesizer_node)
+        workflow.add_edge("hold_synthesizer", "decision_gate")
+        
+        if hold_pruning == "standard":
+            # HOLD still gets a risk assessment (shown to reviewers), nothing more
+            workflow.add_edge("inventory_agent", "risk_agent")
+            workflow.add_conditional_edges(
+                "risk_agent",
+                route_after_inventory_decision,  # Returns "full" or "hold"
+                {
+                    "full": "logistics_agent",
+                    "hold": "hold_synthesizer"
+                }
+            )
+        else:
+            workflow.add_conditional_edges(
+                "inventory_agent",
+                route_after_inventory_decision,
+                {
+                    "full": "risk_agent",
+                    "hold": "hold_synthesizer"
+                }
+            )
+            workflow.add_edge("risk_agent", "logistics_agent")
+    
+    workflow.add_edge("logistics_agent", "coordinator")
+    workflow.add_edge("coordinator", "decision_gate")
 
 
-def create_supply_chain_graph():
+def create_supply_chain_graph(hold_pruning: str = HOLD_PRUNING):
     """
     Create the LangGraph workflow for the supply chain control tower.
     
@@ -31,6 +107,12 @@ def create_supply_chain_graph():
     5. Execute OR Human Approval
     6. Loop back to ingestion (continuous monitoring)
     
+    HOLD decisions skip the agents whose output cannot change them
+    (see add_agent_edges).
+    
+    Args:
+        hold_pruning: "off", "standard" or "aggressive" (default: HOLD_PRUNING env)
+    
     Returns:
         Compiled LangGraph StateGraph
     """
@@ -45,12 +127,8 @@ def create_supply_chain_graph():
     # Data ingestion (entry point)
     workflow.add_node("ingest_data", data_ingestion_node)
     
-    # Agent nodes (reasoning layer)
-    workflow.add_node("demand_agent", demand_agent_node)
-    workflow.add_node("inventory_agent", inventory_agent_node)
-    workflow.add_node("risk_agent", risk_agent_node)
-    workflow.add_node("logistics_agent", logistics_agent_node)
-    workflow.add_node("coordinator", coordinator_agent_node)
+    # Agent nodes (reasoning layer), each with a deadline and rule-based fallback
+    add_agent_nodes(workflow)
     
     # Decision and execution nodes
     workflow.add_node("decision_gate", decision_gate_node)
@@ -64,26 +142,11 @@ def create_supply_chain_graph():
     workflow.set_entry_point("ingest_data")
     
     # ================================================================
-    # ADD EDGES (Sequential Flow)
+    # ADD EDGES (Sequential Flow, with HOLD pruning)
     # ================================================================
     
-    # Data ingestion → Demand agent
-    workflow.add_edge("ingest_data", "demand_agent")
-    
-    # Demand agent → Inventory agent
-    workflow.add_edge("demand_agent", "inventory_agent")
-    
-    # Inventory agent → Risk agent
-    workflow.add_edge("inventory_agent", "risk_agent")
-    
-    # Risk agent → Logistics agent
-    workflow.add_edge("risk_agent", "logistics_agent")
-    
-    # Logistics agent → Coordinator
-    workflow.add_edge("logistics_agent", "coordinator")
-    
-    # Coordinator → Decision gate
-    workflow.add_edge("coordinator", "decision_gate")
+    # Data ingestion → agents → Coordinator (or HOLD synthesizer) → Decision gate
+    add_agent_edges(workflow, hold_pruning)
     
     # ================================================================
     # ADD CONDITIONAL EDGES (Branching Logic)
@@ -119,11 +182,22 @@ def create_supply_chain_graph():
     return workflow.compile()
 
 
+@lru_cache(maxsize=1)
+def get_supply_chain_graph():
+    """
+    Return the shared compiled supply chain graph.
+
+    Compiling is done once per process; the compiled graph is stateless
+    between invocations, so every caller (CLI, UI, API) can reuse it.
+    """
+    return create_supply_chain_graph()
+
+
 # ================================================================
 # OPTIONAL: Continuous Monitoring Loop
 # ================================================================
 
-def create_continuous_monitoring_graph():
+def create_continuous_monitoring_graph(hold_pruning: str = HOLD_PRUNING):
     """
     Alternative graph with continuous loop.
     After execution, loops back to data ingestion for next cycle.
@@ -134,24 +208,15 @@ def create_continuous_monitoring_graph():
     
     # Add all nodes (same as above)
     workflow.add_node("ingest_data", data_ingestion_node)
-    workflow.add_node("demand_agent", demand_agent_node)
-    workflow.add_node("inventory_agent", inventory_agent_node)
-    workflow.add_node("risk_agent", risk_agent_node)
-    workflow.add_node("logistics_agent", logistics_agent_node)
-    workflow.add_node("coordinator", coordinator_agent_node)
+    add_agent_nodes(workflow)
     workflow.add_node("decision_gate", decision_gate_node)
     workflow.add_node("execute", execution_node)
     workflow.add_node("human_approval", human_approval_node)
     
     workflow.set_entry_point("ingest_data")
     
-    # Sequential edges
-    workflow.add_edge("ingest_data", "demand_agent")
-    workflow.add_edge("demand_agent", "inventory_agent")
-    workflow.add_edge("inventory_agent", "risk_agent")
-    workflow.add_edge("risk_agent", "logistics_agent")
-    workflow.add_edge("logistics_agent", "coordinator")
-    workflow.add_edge("coordinator", "decision_gate")
+    # Sequential edges (with HOLD pruning)
+    add_agent_edges(workflow, hold_pruning)
     
     # Conditional edges
     workflow.add_conditional_edges(
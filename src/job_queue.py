@@ -0,0 +1,312 @@
+"""
+Bounded-concurrency job queue for decision cycles.
+
+Portfolio runs and the HTTP API submit cycles here instead of launching
+one task per product. The queue provides:
+- A fixed number of workers (CYCLE_WORKERS)
+- Queue-depth backpressure (CYCLE_QUEUE_DEPTH)
+- Priority dispatch (lower priority value runs first, ties in submission order)
+- Retries with exponential backoff and jitter (CYCLE_MAX_RETRIES)
+- Progress reporting and results delivered as jobs complete
+
+Per-provider LLM concurrency caps are enforced in llm_config.invoke_llm.
+"""
+
+import os
+import uuid
+import random
+import asyncio
+import itertools
+import time
+from datetime import datetime
+
+from backend_interface import run_cycle_async
+from records import to_dict
+from metrics import LatencyStats
+from explanations import EXPLANATION_EVENT
+
+
+DEFAULT_WORKERS = int(os.getenv('CYCLE_WORKERS', '8'))
+DEFAULT_QUEUE_DEPTH = int(os.getenv('CYCLE_QUEUE_DEPTH', '100'))
+DEFAULT_MAX_RETRIES = int(os.getenv('CYCLE_MAX_RETRIES', '2'))
+DEFAULT_BACKOFF_BASE = float(os.getenv('CYCLE_RETRY_BACKOFF_S', '1.0'))
+MAX_BACKOFF = 30.0
+
+# Errors that will fail the same way on every attempt (e.g. unknown product)
+NON_RETRYABLE_ERRORS = (ValueError,)
+
+
+class QueueFullError(Exception):
+    """Raised by try_submit when the queue is at its depth limit."""
+
+
+class CycleJob:
+    """One submitted decision cycle and its progress events."""
+
+    def __init__(self, product_id: int, priority: float = 0.0):
+        self.id = uuid.uuid4().hex
+        self.product_id = product_id
+        self.priority = priority
+        self.status = 'queued'
+        self.attempts = 0
+        self.submitted_at = datetime.utcnow()
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.events = []
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    def record_event(self, node_name: str, node_output: dict) -> None:
+        """Append a node completion event and wake any stream readers."""
+        if node_name == EXPLANATION_EVENT and self.result is not None:
+            # Deferred narrative arriving after the cycle: update the stored result
+            _merge_into(self.result, node_output)
+        self.events.append({
+            'node': node_name,
+            'output': to_dict(node_output),
+            'at': datetime.utcnow().isoformat()
+        })
+        self._changed.set()
+
+    def finish(self, status: str) -> None:
+        self.status = status
+        self.finished_at = datetime.utcnow()
+        self._changed.set()
+
+    async def wait_for_change(self) -> None:
+        await self._changed.wait()
+        self._changed.clear()
+
+    def to_dict(self, include_events: bool = False) -> dict:
+        data = {
+            'job_id': self.id,
+            'product_id': self.product_id,
+            'priority': self.priority,
+            'status': self.status,
+            'attempts': self.attempts,
+            'submitted_at': self.submitted_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'result': self.result,
+            'error': self.error
+        }
+        if include_events:
+            data['events'] = self.events
+        return data
+
+
+def _merge_into(target: dict, update: dict) -> None:
+    """Recursively apply a partial result update (e.g. a backfilled explanation)."""
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge_into(target[key], value)
+        else:
+            target[key] = value
+
+
+class CycleJobQueue:
+    """
+    Worker pool draining a bounded queue of decision cycles.
+
+    Usage:
+        async with CycleJobQueue(workers=16) as queue:
+            producer = asyncio.create_task(queue.submit_all(product_ids))
+            async for job in queue.completed():
+                ...
+
+    Args:
+        run_cycle: Coroutine ``run_cycle(product_id, on_event=None) -> dict``
+        workers: Number of cycles executing concurrently
+        max_queue_depth: Jobs allowed to wait before submit() blocks
+        max_retries: Extra attempts after a failed cycle
+        backoff_base: First retry delay in seconds (doubles each attempt)
+        on_progress: Optional callback receiving progress() after each job
+        collect_results: Hold finished jobs for completed(). Long-lived
+            queues whose callers keep their own job references (the API,
+            the UI runner) pass False, or every finished job stays queued
+    """
+
+    def __init__(
+        self,
+        run_cycle=run_cycle_async,
+        workers: int = DEFAULT_WORKERS,
+        max_queue_depth: int = DEFAULT_QUEUE_DEPTH,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        on_progress=None,
+        collect_results: bool = True
+    ):
+        self._run_cycle = run_cycle
+        self._num_workers = workers
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._on_progress = on_progress
+
+        self._pending = asyncio.PriorityQueue(maxsize=max_queue_depth)
+        self._sequence = itertools.count()
+        self._finished = asyncio.Queue() if collect_results else None
+        self._workers = []
+        self._closed = False
+
+        self._submitted = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._retries = 0
+        self._latency = LatencyStats()
+
+    # ================================================================
+    # LIFECYCLE
+    # ================================================================
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.shutdown()
+
+    def start(self) -> None:
+        """Spawn the worker tasks."""
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker())
+                for _ in range(self._num_workers)
+            ]
+
+    def close(self) -> None:
+        """Stop accepting jobs; completed() ends once in-flight jobs drain."""
+        self._closed = True
+        if self._finished is not None:
+            self._finished.put_nowait(None)
+
+    async def shutdown(self) -> None:
+        """Cancel all workers, abandoning queued jobs."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    # ================================================================
+    # SUBMISSION
+    # ================================================================
+
+    async def submit(self, product_id: int, priority: float = 0.0) -> CycleJob:
+        """Enqueue a cycle, waiting while the queue is full (backpressure)."""
+        job = self._new_job(product_id, priority)
+        await self._pending.put(self._entry(job))
+        return job
+
+    def try_submit(self, product_id: int, priority: float = 0.0) -> CycleJob:
+        """Enqueue a cycle without waiting; raises QueueFullError if full."""
+        if self._pending.full():
+            raise QueueFullError(f"Cycle queue is full ({self._pending.maxsize} jobs waiting)")
+        job = self._new_job(product_id, priority)
+        self._pending.put_nowait(self._entry(job))
+        return job
+
+    async def submit_all(self, product_ids, priorities=None) -> None:
+        """
+        Submit every product (with backpressure), then close the queue.
+
+        Args:
+            product_ids: Products in the order they should be submitted
+            priorities: Optional {product_id: priority} mapping
+        """
+        priorities = priorities or {}
+        for product_id in product_ids:
+            await self.submit(product_id, priorities.get(product_id, 0.0))
+        self.close()
+
+    def _new_job(self, product_id: int, priority: float) -> CycleJob:
+        if self._closed:
+            raise RuntimeError("Cycle queue is closed")
+        self._submitted += 1
+        return CycleJob(product_id, priority)
+
+    def _entry(self, job: CycleJob) -> tuple:
+        return (job.priority, next(self._sequence), job)
+
+    # ================================================================
+    # RESULTS & PROGRESS
+    # ================================================================
+
+    async def completed(self):
+        """Yield finished jobs (completed or failed) in completion order."""
+        if self._finished is None:
+            raise RuntimeError("Cycle queue was created with collect_results=False")
+        delivered = 0
+        while not (self._closed and delivered == self._submitted):
+            job = await self._finished.get()
+            if job is not None:
+                delivered += 1
+                yield job
+
+    def progress(self) -> dict:
+        """Snapshot of queue counters."""
+        return {
+            'submitted': self._submitted,
+            'queued': self._pending.qsize(),
+            'running': self._running,
+            'completed': self._completed,
+            'failed': self._failed,
+            'retries': self._retries,
+            # Duration of successful cycle attempts (excludes queueing and backoff)
+            'cycle_latency': self._latency.summary()
+        }
+
+    # ================================================================
+    # WORKERS
+    # ================================================================
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job = await self._pending.get()
+            try:
+                await self._execute(job)
+            finally:
+                self._pending.task_done()
+
+            if job.status == 'completed':
+                self._completed += 1
+            else:
+                self._failed += 1
+            if self._finished is not None:
+                self._finished.put_nowait(job)
+            if self._on_progress is not None:
+                self._on_progress(self.progress())
+
+    async def _execute(self, job: CycleJob) -> None:
+        """Run one job, retrying transient failures with backoff."""
+        self._running += 1
+        job.status = 'running'
+        try:
+            while True:
+                job.attempts += 1
+                try:
+                    start = time.monotonic()
+                    job.result = await self._run_cycle(job.product_id, on_event=job.record_event)
+                    self._latency.record(time.monotonic() - start)
+                    # An earlier attempt's error no longer describes the job
+                    job.error = None
+                    job.finish('completed')
+                    return
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    job.error = str(e)
+                    if isinstance(e, NON_RETRYABLE_ERRORS) or job.attempts > self._max_retries:
+                        job.finish('failed')
+                        return
+                self._retries += 1
+                await asyncio.sleep(self._backoff_delay(job.attempts))
+        finally:
+            self._running -= 1
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        ceiling = min(MAX_BACKOFF, self._backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
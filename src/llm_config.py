@@ -1,23 +1,486 @@
 import os
-from langchain_openai import ChatOpenAI
+import json
+import time
+import random
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
 from dotenv import load_dotenv
 
+from metrics import LatencyStats
+
 load_dotenv()
 
 
-def get_llm():
+# Provider behind get_llm(): "openrouter" (default) or "stub"
+# (deterministic rule-based answers for load tests and offline runs, see stub_llm.py)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openrouter").lower()
+
+# Default cap on simultaneous in-flight requests per provider.
+# Override per provider with <PROVIDER>_MAX_CONCURRENCY, e.g. OPENROUTER_MAX_CONCURRENCY=32
+# This is the ceiling; the adaptive limit below it shrinks on 429/5xx responses.
+DEFAULT_PROVIDER_CONCURRENCY = 16
+
+# Request and token budgets per provider (<PROVIDER>_RPM, <PROVIDER>_TPM, 0 = unlimited)
+DEFAULT_PROVIDER_RPM = 0
+DEFAULT_PROVIDER_TPM = 0
+
+# Token buckets hold at most this many seconds of budget, so a cold start
+# does not fire a whole minute's worth of requests at once
+BUCKET_BURST_SECONDS = 10.0
+
+
+# Retries for throttled / failed requests (ChatOpenAI's own retries are disabled)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_RETRY_BACKOFF_S = float(os.getenv("LLM_RETRY_BACKOFF_S", "0.5"))
+LLM_RETRY_MAX_DELAY_S = float(os.getenv("LLM_RETRY_MAX_DELAY_S", "30"))
+
+# Status codes worth retrying; 429 and 5xx also shrink the concurrency limit
+RETRYABLE_STATUS = {408, 409, 429}
+
+# Minimum time between multiplicative decreases, so one burst of 429s
+# (many requests rejected at once) halves the limit once, not to the floor
+AIMD_DECREASE_COOLDOWN_S = 1.0
+
+# Model profiles: which model, output budget and request timeout each agent uses.
+# Explanation-only and classification agents get the cheap, fast profile; the
+# coordinator, which makes the actual procurement call, gets the strong one.
+# Override with LLM_PROFILES_FILE (JSON, same shape as below) and/or env vars:
+#   LLM_PROFILE_<PROFILE>_MODEL / _MAX_TOKENS / _TIMEOUT_S, LLM_AGENT_<AGENT>_PROFILE
+DEFAULT_MODEL_PROFILES = {
+    "fast": {
+        "model": os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini"),
+        "max_tokens": 400,
+        "timeout": 20.0,
+    },
+    "strong": {
+        "model": "openai/gpt-4o",
+        "max_tokens": 1000,
+        "timeout": 60.0,
+    },
+}
+DEFAULT_AGENT_PROFILES = {
+    "demand": "fast",
+    "inventory": "fast",
+    "risk": "fast",
+    "logistics": "fast",
+    "coordinator": "strong",
+}
+DEFAULT_PROFILE = "fast"
+
+# Calls kept per profile for latency percentiles
+PROFILE_LATENCY_WINDOW = 1000
+
+# Pooled clients, one per event loop and model profile (async HTTP pools cannot cross loops)
+_llm_clients = weakref.WeakKeyDictionary()
+
+# Per-provider rate limiters, one set per event loop
+_provider_limiters = weakref.WeakKeyDictionary()
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    name: str
+    model: str
+    max_tokens: int
+    timeout: float
+
+
+# Settings a profile may override (its name is its key)
+PROFILE_SETTINGS = {field.name for field in fields(ModelProfile)} - {"name"}
+
+
+@lru_cache(maxsize=1)
+def load_model_profiles() -> tuple[dict, dict]:
+    """
+    Resolve model profiles and the agent -> profile mapping.
+
+    Precedence: environment variables, then LLM_PROFILES_FILE, then defaults.
+
+    Returns:
+        ({profile name: ModelProfile}, {agent name: profile name})
+    """
+    profiles = {name: dict(values) for name, values in DEFAULT_MODEL_PROFILES.items()}
+    agents = dict(DEFAULT_AGENT_PROFILES)
+
+    config_path = os.getenv("LLM_PROFILES_FILE")
+    if config_path:
+        with open(config_path, encoding="utf-8") as f:
+            config = json.load(f)
+        for name, values in config.get("profiles", {}).items():
+            unexpected = set(values) - PROFILE_SETTINGS
+            if unexpected:
+                raise ValueError(
+                    f"Unknown setting(s) {sorted(unexpected)} for model profile '{name}' in {config_path} "
+                    f"(expected {sorted(PROFILE_SETTINGS)})"
+                )
+            profiles.setdefault(name, dict(DEFAULT_MODEL_PROFILES[DEFAULT_PROFILE])).update(values)
+        agents.update(config.get("agents", {}))
+
+    for name, values in profiles.items():
+        prefix = f"LLM_PROFILE_{name.upper()}"
+        values["model"] = os.getenv(f"{prefix}_MODEL", values["model"])
+        values["max_tokens"] = int(os.getenv(f"{prefix}_MAX_TOKENS", values["max_tokens"]))
+        values["timeout"] = float(os.getenv(f"{prefix}_TIMEOUT_S", values["timeout"]))
+    for agent in agents:
+        agents[agent] = os.getenv(f"LLM_AGENT_{agent.upper()}_PROFILE", agents[agent])
+
+    unknown = {profile for profile in agents.values() if profile not in profiles}
+    if unknown:
+        raise ValueError(f"Unknown model profile(s) in agent mapping: {sorted(unknown)}")
+
+    return (
+        {name: ModelProfile(name=name, **values) for name, values in profiles.items()},
+        agents,
+    )
+
+
+def get_model_profile(agent: str | None = None) -> ModelProfile:
+    """Model profile for an agent (the default profile for unknown or no agent)."""
+    profiles, agents = load_model_profiles()
+    return profiles[agents.get(agent, DEFAULT_PROFILE)]
+
+
+def get_llm(profile: ModelProfile | None = None):
     """
-    Get LLM configured for OpenRouter with async support.
+    Get the chat client for a model profile (default profile if None).
+
+    The client is shared by every agent using that profile and every
+    concurrent cycle running on the same event loop, so they all reuse
+    one HTTP connection pool.
     """
+    profile = profile or get_model_profile()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _create_llm(profile)
+
+    clients = _llm_clients.setdefault(loop, {})
+    llm = clients.get(profile.name)
+    if llm is None:
+        llm = _create_llm(profile)
+        clients[profile.name] = llm
+    return llm
+
+
+def _create_llm(profile: ModelProfile):
+    """Create a new chat client for the configured provider and a model profile."""
+    if LLM_PROVIDER == "stub":
+        from stub_llm import StubChatModel
+        return StubChatModel()
+    
+    # Imported on first use: the client stack takes most of a second to load
+    from langchain_openai import ChatOpenAI
+    
     llm = ChatOpenAI(
-        base_url="https://openrouter.ai/api/v1",
+        base_url=os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
         api_key=os.getenv("OPENROUTER_API_KEY"),
-        model=os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini"),
+        model=profile.model,
+        max_tokens=profile.max_tokens,
+        timeout=profile.timeout,
         temperature=0.0,
+        # Retries are handled by invoke_llm, which coordinates them across cycles
+        max_retries=0,
     )
     return llm
 
 
+# End-to-end invoke_llm latency (limiter wait + retries included), per profile
+_profile_latency = {}
+
+
+def get_profile_stats() -> dict:
+    """{profile name: {'model', 'calls', 'errors', 'mean_s', 'p50_s', 'p95_s'}} for this process."""
+    profiles, _ = load_model_profiles()
+    return {
+        name: {'model': profiles[name].model, **stats.summary()}
+        for name, stats in _profile_latency.items()
+    }
+
+
+def get_provider_concurrency(provider: str = LLM_PROVIDER) -> int:
+    """Maximum simultaneous requests allowed against a provider."""
+    env_key = f"{provider.upper()}_MAX_CONCURRENCY"
+    return int(os.getenv(env_key, DEFAULT_PROVIDER_CONCURRENCY))
+
+
+def get_provider_budget(provider: str = LLM_PROVIDER) -> tuple[int, int]:
+    """(requests per minute, tokens per minute) budget for a provider, 0 = unlimited."""
+    prefix = provider.upper()
+    rpm = int(os.getenv(f"{prefix}_RPM", DEFAULT_PROVIDER_RPM))
+    tpm = int(os.getenv(f"{prefix}_TPM", DEFAULT_PROVIDER_TPM))
+    return rpm, tpm
+
+
+# ================================================================
+# CLIENT-SIDE RATE LIMITING
+# ================================================================
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute / 60` per second.
+
+    Waiters are served in arrival order. The balance may go negative when a
+    request turns out to cost more than estimated (see debit()); later
+    requests then wait until the debt is repaid.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = BUCKET_BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until `amount` tokens are available, then take them."""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def debit(self, amount: float) -> None:
+        """Adjust the balance without waiting (negative amounts refund)."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit.
+
+    Every successful request raises the limit by 1/limit, which adds about one
+    slot per round of requests. A throttled request (429 or 5xx) halves it,
+    at most once per AIMD_DECREASE_COOLDOWN_S.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1):
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.limit = float(self.maximum)
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+        self._last_decrease = float('-inf')
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_throttle(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease >= AIMD_DECREASE_COOLDOWN_S:
+            self.limit = max(self.minimum, self.limit / 2)
+            self._last_decrease = now
+
+
+class ProviderLimiter:
+    """
+    Client-side limiter for one provider: request and token budgets,
+    an adaptive concurrency limit, and a shared pause that honors Retry-After.
+    """
+
+    def __init__(self, provider: str):
+        rpm, tpm = get_provider_budget(provider)
+        self.provider = provider
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.concurrency = AdaptiveConcurrency(get_provider_concurrency(provider))
+        self._resume_at = 0.0
+        self.counters = {'requests': 0, 'throttled': 0, 'retries': 0, 'failed': 0}
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int):
+        """Wait for budget and a concurrency slot for one request."""
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None:
+            await self.tokens.acquire(estimated_tokens)
+
+        await self.concurrency.acquire()
+        try:
+            # Checked last: a pause may have started while this request queued
+            while (delay := self._resume_at - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+            self.counters['requests'] += 1
+            yield
+        finally:
+            await self.concurrency.release()
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every new request for `seconds` (provider asked us to wait)."""
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def settle_tokens(self, estimated: int, actual: int | None) -> None:
+        """Correct the token budget once the real usage is known."""
+        if self.tokens is not None and actual is not None:
+            self.tokens.debit(actual - estimated)
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            'concurrency_limit': int(self.concurrency.limit),
+            'in_flight': self.concurrency.in_flight
+        }
+
+
+def _provider_limiter(provider: str) -> ProviderLimiter:
+    """Rate limiter for a provider on the running event loop."""
+    loop = asyncio.get_running_loop()
+    limiters = _provider_limiters.setdefault(loop, {})
+    if provider not in limiters:
+        limiters[provider] = ProviderLimiter(provider)
+    return limiters[provider]
+
+
+def get_limiter_stats(provider: str = LLM_PROVIDER) -> dict:
+    """Counters and current concurrency limit for a provider on the running loop."""
+    return _provider_limiter(provider).stats()
+
+
+def estimate_tokens(prompt, max_tokens: int) -> int:
+    """Rough token cost of a request (~4 characters per token plus the completion budget)."""
+    text = prompt if isinstance(prompt, str) else str(prompt)
+    return len(text) // 4 + max_tokens
+
+
+def _classify_error(exc: Exception) -> tuple[bool, bool, float | None]:
+    """
+    Classify a failed request.
+
+    Returns:
+        (retryable, throttled, retry_after_seconds)
+    """
+    import openai
+    
+    if isinstance(exc, openai.APIConnectionError):
+        # Covers timeouts: worth retrying, but not evidence of provider overload
+        return True, False, None
+    status = getattr(exc, 'status_code', None)
+    if status is None:
+        return False, False, None
+    throttled = status == 429 or status >= 500
+    retryable = throttled or status in RETRYABLE_STATUS
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    return retryable, throttled, _parse_retry_after(headers)
+
+
+def _parse_retry_after(headers) -> float | None:
+    """Seconds to wait from retry-after-ms / Retry-After (seconds or HTTP date)."""
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _retry_delay(attempt: int, retry_after: float | None) -> float:
+    """Full-jitter exponential backoff; never earlier than Retry-After."""
+    backoff = random.uniform(0, min(LLM_RETRY_MAX_DELAY_S, LLM_RETRY_BACKOFF_S * 2 ** attempt))
+    if retry_after is None:
+        return backoff
+    # Spread retries out past the window so they do not all land at once
+    return min(LLM_RETRY_MAX_DELAY_S, retry_after) + random.uniform(0, LLM_RETRY_BACKOFF_S)
+
+
+async def invoke_llm(prompt, config=None, agent=None):
+    """
+    Invoke the agent's model profile through the provider's rate limiter.
+
+    All agents call the LLM through here, so no matter how many cycles are
+    in flight, requests stay within <PROVIDER>_RPM / <PROVIDER>_TPM and the
+    adaptive concurrency limit (at most <PROVIDER>_MAX_CONCURRENCY).
+    Throttled (429), overloaded (5xx) and dropped requests are retried up to
+    LLM_MAX_RETRIES times with jittered backoff, waiting at least as long as
+    the provider's Retry-After.
+
+    Args:
+        prompt: Prompt text (or messages)
+        config: Optional LangChain run config (tracing name, tags, metadata)
+        agent: Calling agent name, selects its model profile (see DEFAULT_AGENT_PROFILES)
+    """
+    profile = get_model_profile(agent)
+    stats = _profile_latency.get(profile.name)
+    if stats is None:
+        stats = _profile_latency[profile.name] = LatencyStats(PROFILE_LATENCY_WINDOW)
+    start = time.monotonic()
+    try:
+        response = await _invoke_with_retries(prompt, config, profile)
+    except BaseException:
+        stats.record(time.monotonic() - start, ok=False)
+        raise
+    stats.record(time.monotonic() - start)
+    return response
+
+
+async def _invoke_with_retries(prompt, config, profile: ModelProfile):
+    limiter = _provider_limiter(LLM_PROVIDER)
+    estimated = estimate_tokens(prompt, profile.max_tokens)
+    attempt = 0
+
+    while True:
+        async with limiter.slot(estimated):
+            try:
+                response = await get_llm(profile).ainvoke(prompt, config=config)
+            except Exception as exc:
+                retryable, throttled, retry_after = _classify_error(exc)
+                if throttled:
+                    limiter.counters['throttled'] += 1
+                    limiter.concurrency.on_throttle()
+                if not retryable or attempt >= LLM_MAX_RETRIES:
+                    limiter.counters['failed'] += 1
+                    raise
+                delay = _retry_delay(attempt, retry_after)
+                if retry_after is not None:
+                    limiter.pause(retry_after)
+            else:
+                limiter.concurrency.on_success()
+                usage = getattr(response, 'usage_metadata', None) or {}
+                limiter.settle_tokens(estimated, usage.get('total_tokens'))
+                return response
+
+        # Back off outside the slot so waiting retries do not hold concurrency
+        attempt += 1
+        limiter.counters['retries'] += 1
+        await asyncio.sleep(delay)
+
+
 def verify_tracing():
     """Verify LangSmith tracing is configured correctly."""
     tracing_enabled = os.getenv("LANGCHAIN_TRACING_V2", "false").lower() == "true"
@@ -9,15 +9,30 @@ import json
 from datetime import datetime
 import time
 import asyncio
+import argparse
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 if __name__ == '__main__':
     current_dir = os.path.dirname(os.path.abspath(__file__))
     if current_dir not in sys.path:
         sys.path.insert(0, current_dir)
 
-from graph import create_supply_chain_graph
-from state import SupplyChainState
-from db_init import init_database, seed_data
+# The graph, job queue and agents (LangGraph and the LLM client stack) take
+# most of a second to import; they are imported where first needed, so a run
+# whose products are all settled by the pre-screen never loads them.
+from state import new_cycle_state
+from records import to_dict
+from db_init import prepare_database, SCHEMA_VERSION
+from portfolio import load_portfolio_arrays
+from prescreen import screen_portfolio, auto_hold_clear_products
+from scheduler import prioritize_products
+from db_service import read_suppliers
+from explanations import schedule_explanations, drain_explanations
+from prefetch import SnapshotPrefetcher, prefetching, dispatch_order
+from llm_config import get_profile_stats
 
 
 def print_section(title):
@@ -27,85 +42,287 @@ def print_section(title):
     print("="*70)
 
 
-def print_streaming_dots(message, duration=1.5):
-    """Print message with animated dots."""
-    print(f"{message}", end='', flush=True)
-    for _ in range(3):
-        time.sleep(duration / 3)
-        print(".", end='', flush=True)
-    print(" ✓")
-
-
-async def stream_graph_execution_async(app, initial_state, product_id):
+async def stream_graph_execution_async(app, initial_state, product_id, on_event=None):
     """Execute graph with async streaming."""
     print(f"\n🔄 Processing Product {product_id}")
     
-    node_count = 0
-    final_state = initial_state.copy()
+    final_state = initial_state
     
-    # CHANGED: stream → astream
-    async for event in app.astream(initial_state):
-        node_count += 1
+    # "updates" yields each node's delta for progress output; "values" yields
+    # the reducer-merged state, so the last one is the final state
+    async for mode, chunk in app.astream(initial_state, stream_mode=['updates', 'values']):
+        if mode == 'values':
+            final_state = chunk
+            continue
         
-        for node_name, node_output in event.items():
-            for key, value in node_output.items():
-                if key == 'agent_outputs' and key in final_state:
-                    final_state['agent_outputs'].update(value)
-                else:
-                    final_state[key] = value
+        for node_name, node_output in chunk.items():
+            if on_event is not None:
+                on_event(node_name, node_output)
             
             if node_name == "ingest_data":
-                snapshot = final_state.get('db_snapshot', {})
+                snapshot = node_output.get('db_snapshot')
                 if snapshot:
-                    product = snapshot.get('product', {})
-                    inventory = snapshot.get('inventory', {})
-                    print(f"  ✓ Loaded: {product.get('name', 'Unknown')}")
+                    print(f"  ✓ Loaded: {snapshot.product.name}")
             
-            elif node_name in ["demand_agent", "inventory_agent", "risk_agent", "logistics_agent", "coordinator"]:
+            elif node_name in ["demand_agent", "inventory_agent", "risk_agent", "logistics_agent", "coordinator", "hold_synthesizer"]:
                 print(f"  ✓ {node_name.replace('_', ' ').title()} completed")
             
             elif node_name == "decision_gate":
-                risk_level = final_state.get('decision_risk', 'N/A')
+                risk_level = node_output.get('decision_risk', 'N/A')
                 print(f"  ✓ Decision Gate: {risk_level} risk")
             
             elif node_name == "human_approval":
-                feedback = final_state.get('human_feedback', 'N/A')
+                feedback = node_output.get('human_feedback', 'N/A')
                 print(f"  ✓ Human Approval: {feedback}")
             
             elif node_name == "execute":
-                exec_data = final_state.get('agent_outputs', {}).get('execution', {})
-                if exec_data.get('executed'):
-                    print(f"  ✓ Executed: {exec_data.get('message', '')}")
+                exec_data = node_output['agent_outputs'].get('execution')
+                if exec_data and exec_data.executed:
+                    print(f"  ✓ Executed: {exec_data.message}")
+    
+    # EXPLANATION_MODE=deferred: narratives are generated in the background
+    schedule_explanations(final_state, on_event)
     
-    return final_state
+    # Records stay in the graph; callers get plain dicts
+    return to_dict(final_state)
 
 
-async def run_product_workflow_async(app, product_id):
-    """Run workflow for single product (async)."""
-    initial_state = {
-        'product_id': product_id,
-        'db_snapshot': {},
-        'agent_outputs': {},
-        'final_decision': None,
-        'decision_risk': None,
-        'human_feedback': None
-    }
+async def run_product_workflow_async(app, product_id, on_event=None, snapshot=None):
+    """Run workflow for single product (async), from a prefetched snapshot if given."""
+    initial_state = new_cycle_state(product_id, snapshot)
     
-    result = await stream_graph_execution_async(app, initial_state, product_id)
+    result = await stream_graph_execution_async(app, initial_state, product_id, on_event)
     return result
 
 
-async def run_all_products_async(app, product_ids):
-    """Run workflows for all products in parallel."""
-    print_section("Processing All Products (Parallel)")
+def format_latency(stats, unit="calls"):
+    """One-line latency summary from a metrics.LatencyStats summary."""
+    if not stats.get('calls'):
+        return f"no {unit}"
+    return (
+        f"{stats['calls']} {unit}, mean {stats['mean_s']:.2f}s, "
+        f"p50 {stats['p50_s']:.2f}s, p95 {stats['p95_s']:.2f}s"
+    )
+
+
+def print_latency_report(cycle_latency, profile_stats, label=""):
+    """Print end-to-end cycle latency and LLM latency per model profile."""
+    print(f"  ⏱  {label}Cycle latency: {format_latency(cycle_latency, unit='cycles')}")
+    for name, stats in sorted(profile_stats.items()):
+        print(f"     LLM profile '{name}' ({stats['model']}): {format_latency(stats)}")
+
+
+def print_explanation_report(stats, label=""):
+    """Print deferred explanation counters (nothing when none were deferred)."""
+    if stats['submitted']:
+        print(
+            f"  📝 {label}Deferred explanations: {stats['completed']} backfilled, "
+            f"{stats['failed']} failed"
+        )
+
+
+def print_prefetch_report(stats, label=""):
+    """Print how many cycles started from a prefetched snapshot."""
+    if stats['prefetched']:
+        print(
+            f"  ⚡ {label}Prefetched snapshots: {stats['hits']} used, "
+            f"{stats['misses']} cycles read their own"
+        )
+
+
+def print_progress(progress):
+    """Print one-line queue progress."""
+    done = progress['completed'] + progress['failed']
+    print(
+        f"  ⏳ Progress: {done}/{progress['submitted']} done "
+        f"({progress['failed']} failed, {progress['retries']} retries, "
+        f"{progress['running']} running, {progress['queued']} queued)"
+    )
+
+
+async def run_all_products_async(app, product_ids, priorities=None, workers=None):
+    """
+    Run workflows for all products through the bounded job queue.
     
-    # Create tasks for all products
-    tasks = [run_product_workflow_async(app, pid) for pid in product_ids]
+    Yields each product's result as soon as its cycle finishes, so callers
+    can report decisions while the rest of the portfolio is still running.
     
-    # Run all in parallel
-    results = await asyncio.gather(*tasks)
+    Args:
+        app: Compiled graph
+        product_ids: Products in dispatch order
+        priorities: Optional {product_id: priority}, lower runs first
+        workers: Optional worker count (default: CYCLE_WORKERS)
+    """
+    print_section("Processing All Products (Job Queue)")
+    from job_queue import CycleJobQueue
     
-    return results
+    queue_kwargs = {'workers': workers} if workers else {}
+    async with SnapshotPrefetcher(dispatch_order(product_ids, priorities)) as prefetcher:
+        # Cycles start from snapshots read ahead while earlier cycles wait on the LLM
+        run_cycle = prefetching(partial(run_product_workflow_async, app), prefetcher)
+        async with CycleJobQueue(
+            run_cycle=run_cycle,
+            on_progress=print_progress,
+            **queue_kwargs
+        ) as queue:
+            producer = asyncio.create_task(queue.submit_all(product_ids, priorities))
+            
+            async for job in queue.completed():
+                if job.status == 'failed':
+                    print(f"  ✗ Product {job.product_id} failed after {job.attempts} attempts: {job.error}")
+                    continue
+                yield job.result
+            
+            await producer
+            explanations = await drain_explanations()
+            print_latency_report(queue.progress()['cycle_latency'], get_profile_stats())
+            print_explanation_report(explanations)
+            print_prefetch_report(prefetcher.stats())
+
+
+# ================================================================
+# SHARDED (MULTI-PROCESS) MODE
+# ================================================================
+
+# Result channel for the current shard worker process (set by _init_shard_worker)
+_shard_results = None
+
+
+def partition_products(product_ids, shards):
+    """
+    Split products round-robin into at most `shards` non-empty partitions.
+    
+    Round-robin keeps each partition in the same urgency order as the
+    input, so every shard starts with its most urgent products.
+    """
+    shards = max(1, min(shards, len(product_ids)))
+    return [product_ids[i::shards] for i in range(shards)]
+
+
+def _init_shard_worker(results):
+    global _shard_results
+    _shard_results = results
+
+
+def _run_shard(shard_id, product_ids, priorities, workers, supplier_assessment):
+    """Process entry point: run one partition on this process's own event loop."""
+    return asyncio.run(
+        _run_shard_async(shard_id, product_ids, priorities, workers, supplier_assessment)
+    )
+
+
+async def _run_shard_async(shard_id, product_ids, priorities, workers, supplier_assessment):
+    """
+    Run one shard's cycles through a local job queue, streaming each result
+    back to the parent as soon as it finishes.
+    
+    The graph (get_supply_chain_graph) and LLM client are created lazily
+    per process, so each shard has its own.
+    """
+    from job_queue import CycleJobQueue
+    from backend_interface import run_cycle_async
+    from agents.risk_agent import seed_supplier_risk
+    
+    if supplier_assessment is not None:
+        seed_supplier_risk(read_suppliers(), supplier_assessment)
+    
+    queue_kwargs = {'workers': workers} if workers else {}
+    async with SnapshotPrefetcher(dispatch_order(product_ids, priorities)) as prefetcher:
+        run_cycle = prefetching(run_cycle_async, prefetcher)
+        async with CycleJobQueue(run_cycle=run_cycle, **queue_kwargs) as job_queue:
+            producer = asyncio.create_task(job_queue.submit_all(product_ids, priorities))
+            
+            async for job in job_queue.completed():
+                if job.status == 'failed':
+                    _shard_results.put(('failed', shard_id, {
+                        'product_id': job.product_id,
+                        'attempts': job.attempts,
+                        'error': job.error
+                    }))
+                else:
+                    _shard_results.put(('result', shard_id, job.result))
+            
+            await producer
+            progress = job_queue.progress()
+        progress['prefetch'] = prefetcher.stats()
+    
+    progress['explanations'] = await drain_explanations()
+    progress['llm_profiles'] = get_profile_stats()
+    _shard_results.put(('done', shard_id, progress))
+    return progress
+
+
+async def run_sharded_async(product_ids, priorities=None, shards=2, workers=None,
+                            supplier_assessment=None):
+    """
+    Run workflows across a pool of worker processes.
+    
+    Products are partitioned across `shards` processes. Each process runs its
+    own event loop, compiled graph, LLM client and job queue of `workers`
+    concurrent cycles. Results stream back over a multiprocessing queue and
+    are yielded as soon as any shard finishes a cycle.
+    
+    Args:
+        product_ids: Products in dispatch order
+        priorities: Optional {product_id: priority}, lower runs first
+        shards: Number of worker processes
+        workers: Optional concurrent cycles per process (default: CYCLE_WORKERS)
+        supplier_assessment: Optional run-level supplier risk to reuse in every shard
+    """
+    partitions = partition_products(product_ids, shards)
+    print_section(f"Processing All Products ({len(partitions)} Shards)")
+    
+    priorities = priorities or {}
+    loop = asyncio.get_running_loop()
+    # Spawn (not fork): workers must not inherit the parent's DB connections
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    
+    with ProcessPoolExecutor(
+        max_workers=len(partitions),
+        mp_context=ctx,
+        initializer=_init_shard_worker,
+        initargs=(results,)
+    ) as pool:
+        futures = {
+            pool.submit(
+                _run_shard, shard_id, partition,
+                {pid: priorities[pid] for pid in partition if pid in priorities},
+                workers, supplier_assessment
+            ): shard_id
+            for shard_id, partition in enumerate(partitions)
+        }
+        pending = set(futures.values())
+        
+        while pending:
+            try:
+                kind, shard_id, payload = await loop.run_in_executor(None, results.get, True, 0.5)
+            except queue.Empty:
+                # A shard that crashed never reports 'done'
+                for future, shard_id in futures.items():
+                    if shard_id in pending and future.done() and future.exception():
+                        print(f"  ✗ Shard {shard_id} crashed: {future.exception()}")
+                        pending.discard(shard_id)
+                continue
+            
+            if kind == 'result':
+                yield payload
+            elif kind == 'failed':
+                print(
+                    f"  ✗ Product {payload['product_id']} failed after "
+                    f"{payload['attempts']} attempts: {payload['error']}"
+                )
+            elif kind == 'done':
+                pending.discard(shard_id)
+                print(
+                    f"  ✓ Shard {shard_id} finished: {payload['completed']} completed, "
+                    f"{payload['failed']} failed, {payload['retries']} retries"
+                )
+                print_latency_report(
+                    payload['cycle_latency'], payload['llm_profiles'], label=f"Shard {shard_id} "
+                )
+                print_explanation_report(payload['explanations'], label=f"Shard {shard_id} ")
+                print_prefetch_report(payload['prefetch'], label=f"Shard {shard_id} ")
 
 
 def print_product_summary(result):
@@ -114,8 +331,8 @@ def print_product_summary(result):
         print("\n⚠️  No result available")
         return
     
-    snapshot = result.get('db_snapshot', {})
-    final_decision = result.get('final_decision', {})
+    snapshot = result.get('db_snapshot') or {}
+    final_decision = result.get('final_decision') or {}
     
     product = snapshot.get('product', {})
     product_name = product.get('name', 'Unknown Product')
@@ -133,43 +350,88 @@ def print_product_summary(result):
         print(f"   Expedite: {'Yes' if details.get('expedite') else 'No'}")
 
 
-async def run_supply_chain_cycle_async():
-    """Run async decision cycle for all products."""
+async def run_supply_chain_cycle_async(shards=1, workers=None):
+    """
+    Run async decision cycle for all products.
+    
+    Args:
+        shards: Worker processes to partition products across (1 = in-process)
+        workers: Optional concurrent cycles per process (default: CYCLE_WORKERS)
+    """
     
     print_section("SUPPLY CHAIN CONTROL TOWER - ASYNC MODE")
     print(f"Timestamp: {datetime.now().isoformat()}")
     
-    # Initialize database
+    # Initialize database (a schema version check once it exists)
     print_section("Step 1: Database Initialization")
     try:
-        print_streaming_dots("Initializing database", 1.0)
-        engine = init_database()
-        seed_data(engine)
-        print("✓ Database ready")
+        if prepare_database():
+            print(f"✓ Database initialized (schema v{SCHEMA_VERSION})")
+        else:
+            print(f"✓ Database ready (schema v{SCHEMA_VERSION})")
     except Exception as e:
         print(f"✗ Database initialization failed: {e}")
         return
     
+    # Pre-screen the catalog: auto-HOLD clear cases, route the rest to agents
+    print_section("Step 2: Portfolio Pre-Screen")
+    start = time.perf_counter()
+    arrays = load_portfolio_arrays()
+    screen = screen_portfolio(arrays=arrays)
+    held = auto_hold_clear_products(screen)
+    print(f"✓ Screened {len(arrays['product_id'])} products in {time.perf_counter() - start:.2f}s")
+    print(f"  {len(held)} auto-HOLD, {len(screen['ambiguous'])} routed to agents")
+    
+    # Score stockout urgency so the most critical products are decided first
+    print_section("Step 3: Scheduling by Stockout Urgency")
+    ambiguous = set(screen['ambiguous'])
+    ranked = [(pid, u) for pid, u in prioritize_products(arrays=arrays) if pid in ambiguous]
+    product_ids = [pid for pid, _ in ranked]
+    priorities = {pid: -urgency for pid, urgency in ranked}
+    for pid, urgency in ranked[:10]:
+        print(f"  Product {pid}: urgency {urgency:.2f}")
+    
+    if not product_ids:
+        print_section("Results Summary")
+        print(f"No products need agent review; {len(held)} products auto-held by pre-screen")
+        return
+    
     # Create graph
-    print_section("Step 2: Building LangGraph Workflow")
+    print_section("Step 4: Building LangGraph Workflow")
     try:
-        print_streaming_dots("Compiling state graph", 1.0)
+        from graph import create_supply_chain_graph
         app = create_supply_chain_graph()
         print("✓ Graph compiled successfully")
     except Exception as e:
         print(f"✗ Graph compilation failed: {e}")
         return
     
-    # Process all products in parallel
-    product_ids = [1, 2, 3]
+    # Supplier risk is the same for every product: assess it once for the run
+    print_section("Step 5: Run-Level Supplier Risk")
+    from agents.risk_agent import assess_supplier_risk
+    supplier_assessment = await assess_supplier_risk(read_suppliers())
+    print(f"✓ Supplier risk: {supplier_assessment['supplier_risk']} (shared by all cycles)")
     
     try:
-        results = await run_all_products_async(app, product_ids)
+        if shards > 1 and len(product_ids) > 1:
+            cycle_results = run_sharded_async(
+                product_ids, priorities, shards, workers, supplier_assessment
+            )
+        else:
+            cycle_results = run_all_products_async(app, product_ids, priorities, workers)
         
-        # Display summaries
-        print_section("Results Summary")
-        for result in results:
+        results = []
+        start = time.perf_counter()
+        async for result in cycle_results:
             print_product_summary(result)
+            results.append(result)
+        elapsed = time.perf_counter() - start
+        
+        print_section("Results Summary")
+        print(f"{len(results)}/{len(product_ids)} agent-reviewed products decided")
+        print(f"{len(held)} products auto-held by pre-screen")
+        if results:
+            print(f"Agent cycles: {elapsed:.1f}s ({len(results) / elapsed:.1f} cycles/s)")
         
     except Exception as e:
         print(f"✗ Workflow failed: {e}")
@@ -177,21 +439,37 @@ async def run_supply_chain_cycle_async():
         traceback.print_exc()
 
 
-def main():
+def parse_args(argv=None):
+    """Parse CLI options."""
+    parser = argparse.ArgumentParser(description="Supply Chain Control Tower - portfolio run")
+    parser.add_argument(
+        '--shards', type=int, default=int(os.getenv('CYCLE_SHARDS', '1')),
+        help="Worker processes to partition products across (default: CYCLE_SHARDS or 1)"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help="Concurrent cycles per process (default: CYCLE_WORKERS)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main entry point."""
+    args = parse_args(argv)
+    
     env_path = os.path.join(os.path.dirname(__file__), '..', '.env')
     load_dotenv(env_path)
     
-    if not os.getenv('OPENROUTER_API_KEY'):
+    from llm_config import LLM_PROVIDER, verify_tracing
+    if LLM_PROVIDER != 'stub' and not os.getenv('OPENROUTER_API_KEY'):
         print("ERROR: OPENROUTER_API_KEY not found in environment variables")
         return
     
     print_section("Observability Check")
-    from llm_config import verify_tracing
     verify_tracing()
     
     # CHANGED: Run async function
-    asyncio.run(run_supply_chain_cycle_async())
+    asyncio.run(run_supply_chain_cycle_async(shards=args.shards, workers=args.workers))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,34 @@
+"""
+In-process latency metrics.
+"""
+
+from collections import deque
+
+
+class LatencyStats:
+    """Call count, errors and latency percentiles over a sliding window of calls."""
+
+    def __init__(self, window: int = 1000):
+        self.calls = 0
+        self.errors = 0
+        self.total_s = 0.0
+        self._recent = deque(maxlen=window)
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        self.calls += 1
+        self.errors += 0 if ok else 1
+        self.total_s += seconds
+        self._recent.append(seconds)
+
+    def summary(self) -> dict:
+        """{'calls', 'errors', 'mean_s', 'p50_s', 'p95_s'} (percentiles over the window)."""
+        recent = sorted(self._recent)
+        if not recent:
+            return {'calls': 0, 'errors': 0}
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'mean_s': round(self.total_s / self.calls, 3),
+            'p50_s': round(recent[len(recent) // 2], 3),
+            'p95_s': round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 3),
+        }
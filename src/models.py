@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index, LargeBinary
 from sqlalchemy.orm import DeclarativeBase
 from datetime import datetime
 
@@ -23,6 +23,11 @@ class Inventory(Base):
     product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
     quantity = Column(Integer, default=0)
     reorder_point = Column(Integer, default=100)
+    
+    __table_args__ = (
+        # Inventory is looked up by product (snapshots, feed imports)
+        Index('ix_inventory_product_id', 'product_id'),
+    )
 
 
 class Supplier(Base):
@@ -55,14 +60,61 @@ class Shipment(Base):
     actual_arrival = Column(DateTime, nullable=True)
 
 
+class ReasoningBlob(Base):
+    """Reasoning text stored once per distinct content, keyed by its SHA-256 (zlib-compressed)."""
+    __tablename__ = 'reasoning_blobs'
+    
+    hash = Column(String, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)  # uncompressed bytes
+
+
 class DecisionLog(Base):
     __tablename__ = 'decision_log'
     
     id = Column(Integer, primary_key=True)
     agent_name = Column(String, nullable=False)
     decision = Column(String, nullable=False)
-    reasoning = Column(String)
+    reasoning = Column(String)  # inline text, only for rows logged before schema version 5
+    reasoning_hash = Column(String, ForeignKey('reasoning_blobs.hash'), nullable=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    
+    # Linkage (NULL for rows logged before schema version 3)
+    product_id = Column(Integer, ForeignKey('products.id'), nullable=True)
+    po_id = Column(Integer, ForeignKey('purchase_orders.id'), nullable=True)
+    cycle_id = Column(String, nullable=True)
+    
+    # Structured decision (decision above is the human-readable summary)
+    decision_type = Column(String, nullable=True)  # REORDER, HOLD, HUMAN_APPROVAL_REQUESTED
+    supplier_id = Column(Integer, ForeignKey('suppliers.id'), nullable=True)
+    quantity = Column(Integer, nullable=True)
+    expedite = Column(Boolean, nullable=True)
+    
+    __table_args__ = (
+        # Time-window aggregates (portfolio overview) read only this index
+        Index('ix_decision_log_timestamp_agent', 'timestamp', 'agent_name'),
+        # Per-product and per-type history, newest first
+        Index('ix_decision_log_product_timestamp', 'product_id', 'timestamp'),
+        Index('ix_decision_log_type_timestamp', 'decision_type', 'timestamp'),
+        Index('ix_decision_log_cycle', 'cycle_id'),
+        # Finding unreferenced reasoning blobs
+        Index('ix_decision_log_reasoning_hash', 'reasoning_hash'),
+    )
+
+class ArchivedDecision(Base):
+    """Index of decision log rows moved to archive partitions (see retention.py)."""
+    __tablename__ = 'decision_archive_index'
+    
+    decision_log_id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, nullable=True)
+    decision_type = Column(String, nullable=True)
+    timestamp = Column(DateTime, nullable=False)
+    partition = Column(String, nullable=False)  # archive file name, e.g. decisions-2026-07.jsonl.gz
+    member_offset = Column(Integer, nullable=False)  # byte offset of the compressed member holding the row
+    
+    __table_args__ = (
+        Index('ix_decision_archive_product_timestamp', 'product_id', 'timestamp'),
+    )
 
 class ApprovalQueue(Base):
     __tablename__ = 'approval_queue'
@@ -1,21 +1,35 @@
+import asyncio
+
 from state import SupplyChainState
 from db_service import read_supply_chain_snapshot
+from deadlines import start_cycle_deadline
 
 
-def data_ingestion_node(state: SupplyChainState) -> dict:
+async def data_ingestion_node(state: SupplyChainState) -> dict:
     """
     Load current supply chain state from database.
     
     Processes one product at a time based on state['product_id'].
     If not set, defaults to product_id=1.
+    
+    A snapshot already in the initial state (prefetched by the pipelined
+    portfolio runner) is used instead of reading the database. The node is
+    async so that case returns without a worker-thread hop; the database
+    read itself still runs in a thread.
     """
     # Get product ID from state, default to 1
     product_id = state.get('product_id', 1)
     
-    # Read snapshot for specific product
-    snapshot = read_supply_chain_snapshot(product_id=product_id)
+    snapshot = state.get('prefetched_snapshot')
+    if snapshot is None or snapshot.product.id != product_id:
+        # Read snapshot for specific product
+        snapshot = await asyncio.to_thread(read_supply_chain_snapshot, product_id=product_id)
     
     return {
         'db_snapshot': snapshot,
-        'agent_outputs': {}
+        # Used once: a looping graph reads fresh data on its next pass
+        'prefetched_snapshot': None,
+        'agent_outputs': {},
+        # Agent nodes get at most the time left until this deadline
+        'cycle_deadline': start_cycle_deadline()
     }
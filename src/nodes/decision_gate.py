@@ -8,6 +8,7 @@ def decision_gate_node(state: SupplyChainState) -> dict:
     Routes workflow based on risk assessment:
     - HIGH risk → requires human approval
     - LOW risk → auto-execute
+    - Any deadline fallback output → HIGH (escalated for review)
     
     This is a pure routing decision based on simple rules.
     
@@ -18,15 +19,15 @@ def decision_gate_node(state: SupplyChainState) -> dict:
         Partial state update with decision_risk classification
     """
     agent_outputs = state['agent_outputs']
-    risk_output = agent_outputs.get('risk', {})
-    demand_output = agent_outputs.get('demand', {})
-    final_decision = state.get('final_decision', {})
+    risk_output = agent_outputs.get('risk')
+    demand_output = agent_outputs.get('demand')
+    final_decision = state.get('final_decision')
     
-    # Extract risk signals
-    supplier_risk = risk_output.get('supplier_risk', 'UNKNOWN')
-    logistics_risk = risk_output.get('logistics_risk', 'UNKNOWN')
-    demand_risk = demand_output.get('demand_risk', 'UNKNOWN')
-    decision_type = final_decision.get('decision_type', 'HOLD')
+    # Extract risk signals (missing outputs count as UNKNOWN)
+    supplier_risk = risk_output.supplier_risk if risk_output else 'UNKNOWN'
+    logistics_risk = risk_output.logistics_risk if risk_output else 'UNKNOWN'
+    demand_risk = demand_output.demand_risk if demand_output else 'UNKNOWN'
+    decision_type = final_decision.decision_type if final_decision else 'HOLD'
     
     # Deterministic gate logic
     # HIGH risk if ANY risk dimension is HIGH
@@ -42,6 +43,11 @@ def decision_gate_node(state: SupplyChainState) -> dict:
     if decision_type == 'HOLD':
         decision_risk = 'LOW'
     
+    # Any agent that missed its deadline fell back to rules: escalate for review
+    outputs = [*agent_outputs.values(), final_decision]
+    if any(getattr(output, 'fallback', False) for output in outputs):
+        decision_risk = 'HIGH'
+    
     # Return risk classification
     # Downstream graph routing will use this to decide next node
     return {
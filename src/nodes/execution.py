@@ -1,5 +1,6 @@
 from state import SupplyChainState
-from db_service import create_purchase_order, log_decision
+from db_service import create_purchase_order, log_decision, invalidate_catalog
+from records import DecisionDetails, ExecutionOutput, FinalDecision
 
 
 def execution_node(state: SupplyChainState) -> dict:
@@ -12,6 +13,7 @@ def execution_node(state: SupplyChainState) -> dict:
     Responsibilities:
     1. Create purchase order if decision is REORDER
     2. Log the decision and reasoning to decision_log table
+    3. Invalidate the product's cached catalog entry after writing
     
     Args:
         state: Current graph state with final_decision
@@ -19,25 +21,25 @@ def execution_node(state: SupplyChainState) -> dict:
     Returns:
         Partial state update with execution status
     """
-    final_decision = state.get('final_decision', {})
+    final_decision = state.get('final_decision') or FinalDecision(
+        decision_type='HOLD',
+        details=DecisionDetails(supplier_id=None, quantity=0, expedite=False),
+        explanation='No explanation provided'
+    )
     snapshot = state['db_snapshot']
     
     # Extract decision details
-    decision_type = final_decision.get('decision_type', 'HOLD')
-    details = final_decision.get('details', {})
-    explanation = final_decision.get('explanation', 'No explanation provided')
+    decision_type = final_decision.decision_type
+    details = final_decision.details
+    explanation = final_decision.explanation
     
-    supplier_id = details.get('supplier_id')
-    quantity = details.get('quantity', 0)
-    expedite = details.get('expedite', False)
-    product_id = snapshot['product']['id']
+    supplier_id = details.supplier_id
+    quantity = details.quantity
+    expedite = details.expedite
+    product_id = snapshot.product.id
+    cycle_id = state.get('cycle_id')
     
-    execution_result = {
-        'executed': False,
-        'po_id': None,
-        'log_id': None,
-        'message': ''
-    }
+    execution_result = ExecutionOutput(executed=False, message='')
     
     try:
         # Execute REORDER decision
@@ -57,15 +59,22 @@ def execution_node(state: SupplyChainState) -> dict:
             log_id = log_decision(
                 agent_name='coordinator',
                 decision=decision_text,
-                reasoning=explanation
+                reasoning=explanation,
+                product_id=product_id,
+                po_id=po_id,
+                cycle_id=cycle_id,
+                decision_type='REORDER',
+                supplier_id=supplier_id,
+                quantity=quantity,
+                expedite=expedite
             )
             
-            execution_result = {
-                'executed': True,
-                'po_id': po_id,
-                'log_id': log_id,
-                'message': f'Purchase order #{po_id} created successfully'
-            }
+            execution_result = ExecutionOutput(
+                executed=True,
+                message=f'Purchase order #{po_id} created successfully',
+                po_id=po_id,
+                log_id=log_id
+            )
         
         # Execute HOLD decision (just log, no PO)
         elif decision_type == 'HOLD':
@@ -73,79 +82,41 @@ def execution_node(state: SupplyChainState) -> dict:
             log_id = log_decision(
                 agent_name='coordinator',
                 decision='HOLD: No reorder needed',
-                reasoning=explanation
+                reasoning=explanation,
+                product_id=product_id,
+                cycle_id=cycle_id,
+                decision_type='HOLD',
+                quantity=0,
+                expedite=False
             )
             
-            execution_result = {
-                'executed': True,
-                'po_id': None,
-                'log_id': log_id,
-                'message': 'HOLD decision logged, no purchase order created'
-            }
+            execution_result = ExecutionOutput(
+                executed=True,
+                message='HOLD decision logged, no purchase order created',
+                log_id=log_id
+            )
         
         else:
             # Invalid decision state
-            execution_result = {
-                'executed': False,
-                'po_id': None,
-                'log_id': None,
-                'message': f'Invalid decision: {decision_type}, supplier={supplier_id}, qty={quantity}'
-            }
+            execution_result = ExecutionOutput(
+                executed=False,
+                message=f'Invalid decision: {decision_type}, supplier={supplier_id}, qty={quantity}'
+            )
     
     except Exception as e:
         # Handle execution errors
-        execution_result = {
-            'executed': False,
-            'po_id': None,
-            'log_id': None,
-            'message': f'Execution failed: {str(e)}'
-        }
+        execution_result = ExecutionOutput(
+            executed=False,
+            message=f'Execution failed: {str(e)}'
+        )
     
-    # Return execution status (could be logged or displayed)
-    return {
-        'agent_outputs': {
-            **state['agent_outputs'],
-            'execution': execution_result
-        }
-    }
-
-
-def human_approval_node(state: SupplyChainState) -> dict:
-    """
-    Placeholder for human approval workflow.
-    
-    In a real system, this would:
-    - Send notification to human operator
-    - Wait for approval/rejection/modification
-    - Update state with human_feedback
-    
-    For MVP: just log that human approval is required.
-    """
-    final_decision = state.get('final_decision', {})
-    decision_type = final_decision.get('decision_type', 'HOLD')
-    details = final_decision.get('details', {})
-    
-    # Log decision awaiting approval
-    approval_message = (
-        f"Decision requires human approval: {decision_type}, "
-        f"supplier={details.get('supplier_id')}, "
-        f"quantity={details.get('quantity')}"
-    )
+    # Next cycle for this product re-reads its catalog row
+    if execution_result.executed:
+        invalidate_catalog(product_id=product_id)
     
-    log_decision(
-        agent_name='system',
-        decision='AWAITING_HUMAN_APPROVAL',
-        reasoning=approval_message
-    )
-    
-    # In MVP, simulate approval (in production, this would pause and wait)
+    # Return only the execution entry; the agent_outputs reducer merges it
     return {
-        'human_feedback': 'PENDING - Human approval required for HIGH risk decision',
         'agent_outputs': {
-            **state['agent_outputs'],
-            'execution': {
-                'executed': False,
-                'message': approval_message
-            }
+            'execution': execution_result
         }
     }
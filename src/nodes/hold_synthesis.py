@@ -0,0 +1,74 @@
+import os
+
+from state import SupplyChainState
+from records import DecisionDetails, FinalDecision
+
+
+# Which agents a HOLD cycle skips (set per deployment):
+# - off: every cycle runs all agents and the coordinator
+# - standard: HOLD skips the logistics agent and the coordinator
+# - aggressive: HOLD also skips the risk agent
+HOLD_PRUNING = os.getenv('HOLD_PRUNING', 'standard').lower()
+HOLD_PRUNING_MODES = ('off', 'standard', 'aggressive')
+
+# A synthesized HOLD is explained by the inventory agent's reasoning
+HOLD_EXPLANATION_PREFIX = 'The inventory agent recommends HOLD.'
+
+
+def hold_synthesizer_node(state: SupplyChainState) -> dict:
+    """
+    Deterministic HOLD decision - NO LLM.
+
+    Replaces the coordinator when the inventory agent decides HOLD.
+    The coordinator's rules always follow the inventory agent's HOLD,
+    and the decision gate auto-executes HOLDs, so there is nothing left
+    to weigh: no supplier, no quantity, no expedite.
+
+    Args:
+        state: Current graph state with the inventory agent's output
+
+    Returns:
+        Partial state update with final_decision
+    """
+    inventory_output = state['agent_outputs'].get('inventory')
+
+    return {
+        'final_decision': FinalDecision(
+            decision_type='HOLD',
+            details=DecisionDetails(supplier_id=None, quantity=0, expedite=False),
+            explanation=hold_explanation(getattr(inventory_output, 'reasoning', '')),
+            # A templated inventory reasoning is backfilled with its narrative
+            # (explanations.py), in the logged HOLD as well
+            explanation_pending=getattr(inventory_output, 'explanation_pending', False)
+        )
+    }
+
+
+def hold_explanation(inventory_reasoning: str) -> str:
+    """Explanation of a synthesized HOLD, from the inventory agent's reasoning."""
+    return f'{HOLD_EXPLANATION_PREFIX} {inventory_reasoning}'.strip()
+
+
+def decided_by_hold_synthesizer(agent_outputs: dict) -> bool:
+    """
+    True if the cycle's decision came from the HOLD synthesizer.
+
+    Every path to the coordinator runs the logistics agent (or its deadline
+    fallback); the pruned HOLD paths never do.
+    """
+    inventory_output = agent_outputs.get('inventory')
+    return getattr(inventory_output, 'action', None) == 'HOLD' and 'logistics' not in agent_outputs
+
+
+def route_after_inventory_decision(state: SupplyChainState) -> str:
+    """
+    Conditional edge function for HOLD pruning.
+
+    Returns:
+        "hold" if the inventory agent decided HOLD
+        "full" otherwise (continue through the remaining agents)
+    """
+    inventory_output = state['agent_outputs'].get('inventory')
+    if getattr(inventory_output, 'action', None) == 'HOLD':
+        return "hold"
+    return "full"
@@ -19,16 +19,16 @@ def human_approval_node(state: SupplyChainState) -> dict:
     Returns:
         Partial state update with human_feedback
     """
-    final_decision = state.get('final_decision', {})
-    decision_type = final_decision.get('decision_type', 'HOLD')
-    details = final_decision.get('details', {})
-    explanation = final_decision.get('explanation', '')
+    final_decision = state.get('final_decision')
     decision_risk = state.get('decision_risk', 'UNKNOWN')
     
     # Extract decision details for logging
-    supplier_id = details.get('supplier_id')
-    quantity = details.get('quantity', 0)
-    expedite = details.get('expedite', False)
+    decision_type = final_decision.decision_type if final_decision else 'HOLD'
+    explanation = final_decision.explanation if final_decision else ''
+    details = final_decision.details if final_decision else None
+    supplier_id = getattr(details, 'supplier_id', None)
+    quantity = getattr(details, 'quantity', 0)
+    expedite = getattr(details, 'expedite', False)
     
     # Build approval request message
     approval_request = (
@@ -41,11 +41,20 @@ def human_approval_node(state: SupplyChainState) -> dict:
         f"Explanation: {explanation}"
     )
     
-    # Log the approval request to database
+    # Log the approval request to database. The request's details are the
+    # structured fields; its reasoning is the coordinator's explanation, which
+    # the decision log stores once for this row and the executed decision.
+    snapshot = state.get('db_snapshot')
     approval_log_id = log_decision(
         agent_name='system',
         decision='HUMAN_APPROVAL_REQUESTED',
-        reasoning=approval_request
+        reasoning=explanation,
+        product_id=snapshot.product.id if snapshot else state.get('product_id'),
+        cycle_id=state.get('cycle_id'),
+        decision_type='HUMAN_APPROVAL_REQUESTED',
+        supplier_id=supplier_id,
+        quantity=quantity,
+        expedite=expedite
     )
     
     # ================================================================
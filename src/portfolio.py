@@ -0,0 +1,115 @@
+"""
+Columnar portfolio arrays.
+
+Loads inventory, purchase order and shipment columns for many products
+into NumPy arrays aligned by product, so portfolio-wide rules (urgency
+scoring, pre-screening) can run as single vectorized passes.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from db_service import read_portfolio_columns
+
+
+def load_portfolio_arrays(product_ids=None, now=None):
+    """
+    Load per-product arrays for the whole catalog (or a subset).
+
+    Args:
+        product_ids: Optional list of product IDs. If None, loads every product.
+        now: Reference time for ETA calculation (default: utcnow)
+
+    Returns:
+        Dictionary of equal-length arrays, one entry per product with inventory:
+        - product_id, name, sku, quantity, reorder_point
+        - active_po_count: active purchase orders
+        - inbound_count: in-transit shipments on active purchase orders
+        - next_eta_days / max_eta_days: earliest / latest shipment ETA in days
+          (NaN without inbound shipments; unset ETAs count as +inf)
+        - next_reliability: reliability of the supplier behind the earliest shipment
+        - min_reliability: lowest reliability among inbound suppliers
+    """
+    columns = read_portfolio_columns(product_ids)
+    inventory = columns['inventory']
+
+    ids = np.asarray(inventory['product_id'], dtype=np.int64)
+    arrays = {
+        'product_id': ids,
+        'name': np.asarray(inventory['name'], dtype=object),
+        'sku': np.asarray(inventory['sku'], dtype=object),
+        'quantity': np.asarray(inventory['quantity'], dtype=np.float64),
+        'reorder_point': np.asarray(inventory['reorder_point'], dtype=np.float64),
+        'active_po_count': align_to_products(
+            ids, columns['active_pos']['product_id'], columns['active_pos']['count'], fill=0
+        ).astype(np.int64)
+    }
+    arrays.update(_reduce_inbound(ids, columns['inbound'], now))
+    return arrays
+
+
+def align_to_products(product_ids, keys, values, fill=np.nan):
+    """
+    Scatter per-key values onto product_ids order.
+
+    Args:
+        product_ids: int array defining the output order
+        keys: Unique product IDs that have a value
+        values: Values aligned with keys
+        fill: Value for products missing from keys
+
+    Returns:
+        float64 array aligned with product_ids
+    """
+    out = np.full(len(product_ids), fill, dtype=np.float64)
+    if len(keys) == 0 or len(product_ids) == 0:
+        return out
+
+    keys = np.asarray(keys, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    order = np.argsort(keys)
+    keys, values = keys[order], values[order]
+
+    positions = np.clip(np.searchsorted(keys, product_ids), 0, len(keys) - 1)
+    found = keys[positions] == product_ids
+    out[found] = values[positions[found]]
+    return out
+
+
+def _reduce_inbound(product_ids, inbound, now=None):
+    """Reduce inbound shipment rows to per-product ETA and reliability arrays."""
+    empty = np.full(len(product_ids), np.nan)
+    if not inbound['product_id']:
+        return {
+            'inbound_count': np.zeros(len(product_ids), dtype=np.int64),
+            'next_eta_days': empty,
+            'max_eta_days': empty.copy(),
+            'next_reliability': empty.copy(),
+            'min_reliability': empty.copy()
+        }
+
+    now = np.datetime64(now or datetime.utcnow(), 's')
+    inbound_pids = np.asarray(inbound['product_id'], dtype=np.int64)
+    eta = np.array(inbound['expected_arrival'], dtype='datetime64[s]')
+    eta_days = (eta - now) / np.timedelta64(1, 'D')
+    eta_days = np.where(np.isnan(eta_days), np.inf, eta_days)
+    reliability = np.asarray(inbound['reliability_score'], dtype=np.float64)
+
+    # Sort by product then ETA so each product's group starts with its earliest shipment
+    order = np.lexsort((eta_days, inbound_pids))
+    sorted_pids = inbound_pids[order]
+    sorted_eta = eta_days[order]
+    sorted_reliability = reliability[order]
+    unique_pids, starts, counts = np.unique(sorted_pids, return_index=True, return_counts=True)
+    ends = starts + counts - 1
+
+    return {
+        'inbound_count': align_to_products(product_ids, unique_pids, counts, fill=0).astype(np.int64),
+        'next_eta_days': align_to_products(product_ids, unique_pids, sorted_eta[starts]),
+        'max_eta_days': align_to_products(product_ids, unique_pids, sorted_eta[ends]),
+        'next_reliability': align_to_products(product_ids, unique_pids, sorted_reliability[starts]),
+        'min_reliability': align_to_products(
+            product_ids, unique_pids, np.minimum.reduceat(sorted_reliability, starts)
+        )
+    }
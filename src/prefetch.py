@@ -0,0 +1,149 @@
+"""
+Snapshot prefetching for pipelined portfolio runs.
+
+Without prefetching, each cycle's data ingestion reads the database on the
+cycle's critical path, one product at a time. The prefetcher reads
+snapshots for the next products in dispatch order, in batches
+(read_supply_chain_snapshots), into a bounded buffer while the running
+cycles wait on LLM responses. Each cycle then starts with its snapshot
+already in the initial state.
+
+A product whose snapshot is not buffered (e.g. a retried cycle, or a
+product dispatched out of order) falls back to the normal read in data
+ingestion, so prefetching never blocks a cycle on a later batch.
+
+Configuration:
+- PREFETCH_BUFFER: snapshots held ahead of the running cycles (0 disables, default 64)
+- PREFETCH_BATCH: products per batched read (default 16)
+"""
+
+import os
+import asyncio
+
+from db_service import read_supply_chain_snapshots
+
+
+PREFETCH_BUFFER = int(os.getenv('PREFETCH_BUFFER', '64'))
+PREFETCH_BATCH = int(os.getenv('PREFETCH_BATCH', '16'))
+
+
+class SnapshotPrefetcher:
+    """
+    Bounded read-ahead buffer of snapshots, filled by a background task.
+
+    Usage:
+        async with SnapshotPrefetcher(product_ids) as prefetcher:
+            snapshot = await prefetcher.take(product_id)   # None if not prefetched
+
+    Args:
+        product_ids: Products in the order their cycles will be dispatched
+        buffer_size: Maximum snapshots read ahead and not yet taken
+        batch_size: Maximum products per batched read
+    """
+
+    def __init__(self, product_ids, buffer_size: int = PREFETCH_BUFFER, batch_size: int = PREFETCH_BATCH):
+        self._product_ids = list(product_ids)
+        self._buffer_size = buffer_size
+        self._batch_size = max(1, batch_size)
+        self._buffer = {}
+        self._reading = {}   # product_id -> future of the batch read in progress
+        self._room = asyncio.Condition()
+        self._task = None
+        self.prefetched = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def start(self) -> None:
+        """Start reading ahead (no-op when buffer_size is 0: prefetching disabled)."""
+        if self._task is None and self._buffer_size > 0:
+            self._task = asyncio.create_task(self._fill())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def take(self, product_id: int):
+        """
+        Remove and return a product's prefetched snapshot.
+
+        Waits only if the product is in the batch being read right now.
+
+        Returns:
+            Snapshot record, or None if it was not prefetched
+        """
+        reading = self._reading.get(product_id)
+        if reading is not None:
+            await asyncio.shield(reading)
+
+        snapshot = self._buffer.pop(product_id, None)
+        if snapshot is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        async with self._room:
+            self._room.notify()
+        return snapshot
+
+    def stats(self) -> dict:
+        return {'prefetched': self.prefetched, 'hits': self.hits, 'misses': self.misses}
+
+    async def _fill(self) -> None:
+        loop = asyncio.get_running_loop()
+        position = 0
+        while position < len(self._product_ids):
+            async with self._room:
+                await self._room.wait_for(lambda: len(self._buffer) < self._buffer_size)
+                free = self._buffer_size - len(self._buffer)
+
+            batch = self._product_ids[position:position + min(free, self._batch_size)]
+            position += len(batch)
+
+            done = loop.create_future()
+            for product_id in batch:
+                self._reading[product_id] = done
+            try:
+                snapshots = await asyncio.to_thread(read_supply_chain_snapshots, batch)
+                self._buffer.update(snapshots)
+                self.prefetched += len(snapshots)
+            except Exception:
+                # Leave these products to data ingestion's own read
+                pass
+            finally:
+                for product_id in batch:
+                    self._reading.pop(product_id, None)
+                done.set_result(None)
+
+
+def prefetching(run_cycle, prefetcher: SnapshotPrefetcher):
+    """
+    Wrap a cycle runner so each cycle starts from its prefetched snapshot.
+
+    Args:
+        run_cycle: Coroutine ``run_cycle(product_id, on_event=None, snapshot=None)``
+        prefetcher: Started SnapshotPrefetcher
+
+    Returns:
+        Coroutine function ``(product_id, on_event=None)`` for CycleJobQueue
+    """
+    async def run_prefetched_cycle(product_id, on_event=None):
+        snapshot = await prefetcher.take(product_id)
+        return await run_cycle(product_id, on_event=on_event, snapshot=snapshot)
+
+    return run_prefetched_cycle
+
+
+def dispatch_order(product_ids, priorities=None) -> list:
+    """Products in the order CycleJobQueue dispatches them (priority, then submission)."""
+    if not priorities:
+        return list(product_ids)
+    return sorted(product_ids, key=lambda product_id: priorities.get(product_id, 0.0))
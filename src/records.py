@@ -0,0 +1,177 @@
+"""
+Compact, immutable records for snapshots and agent outputs.
+
+Snapshots and agent outputs travel through every node of every cycle.
+Frozen ``__slots__`` dataclasses keep them small (no per-instance __dict__),
+make accidental mutation of shared catalog data impossible, and keep
+timestamps as native datetimes.
+
+Records are converted to plain dicts only at the UI/API boundary, via to_dict().
+"""
+
+from dataclasses import dataclass, fields, is_dataclass
+from datetime import datetime
+
+
+# ================================================================
+# SNAPSHOT RECORDS
+# ================================================================
+
+@dataclass(frozen=True, slots=True)
+class ProductRecord:
+    id: int
+    name: str
+    sku: str
+
+
+@dataclass(frozen=True, slots=True)
+class InventoryRecord:
+    quantity: int
+    reorder_point: int
+
+
+@dataclass(frozen=True, slots=True)
+class SupplierRecord:
+    id: int
+    name: str
+    lead_time_days: int
+    reliability_score: float
+
+
+@dataclass(frozen=True, slots=True)
+class PurchaseOrderRecord:
+    id: int
+    supplier_id: int
+    quantity: int
+    status: str
+    created_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class ShipmentRecord:
+    id: int
+    po_id: int
+    status: str
+    expected_arrival: datetime | None
+
+
+@dataclass(frozen=True, slots=True)
+class SupplierCandidates:
+    most_reliable: SupplierRecord | None
+    fastest: SupplierRecord | None
+    frontier: tuple[SupplierRecord, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    product: ProductRecord
+    inventory: InventoryRecord
+    suppliers: tuple[SupplierRecord, ...]
+    supplier_candidates: SupplierCandidates
+    purchase_orders: tuple[PurchaseOrderRecord, ...]
+    shipments: tuple[ShipmentRecord, ...]
+
+
+# ================================================================
+# AGENT OUTPUT RECORDS
+# ================================================================
+
+# fallback=True marks a rule-derived output used because the agent missed
+# its deadline (see deadlines.py); the decision gate escalates these.
+
+@dataclass(frozen=True, slots=True)
+class DemandOutput:
+    demand_risk: str
+    reasoning: str
+    fallback: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class InventoryOutput:
+    action: str
+    quantity: int
+    reasoning: str
+    fallback: bool = False
+    # Templated reasoning; the LLM narrative is backfilled later (explanations.py)
+    explanation_pending: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class RiskOutput:
+    supplier_risk: str
+    logistics_risk: str
+    reasoning: str
+    fallback: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class LogisticsOutput:
+    expedite: bool
+    reasoning: str
+    fallback: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class ExecutionOutput:
+    executed: bool
+    message: str
+    po_id: int | None = None
+    log_id: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class DecisionDetails:
+    supplier_id: int | None
+    quantity: int
+    expedite: bool
+
+
+@dataclass(frozen=True, slots=True)
+class FinalDecision:
+    decision_type: str
+    details: DecisionDetails
+    explanation: str
+    fallback: bool = False
+    explanation_pending: bool = False
+
+
+# ================================================================
+# DECISION HISTORY RECORDS
+# ================================================================
+
+@dataclass(frozen=True, slots=True)
+class DecisionLogRecord:
+    id: int
+    timestamp: datetime
+    agent_name: str
+    decision: str
+    reasoning: str | None
+    product_id: int | None
+    po_id: int | None
+    cycle_id: str | None
+    decision_type: str | None
+    supplier_id: int | None
+    quantity: int | None
+    expedite: bool | None
+
+
+# ================================================================
+# BOUNDARY SERIALIZATION
+# ================================================================
+
+def to_dict(value):
+    """
+    Convert records (and containers of records) to plain JSON-friendly data.
+
+    Dataclasses become dicts, tuples become lists and datetimes become ISO
+    strings. Use only at the UI/API boundary.
+    """
+    if is_dataclass(value):
+        return {f.name: to_dict(getattr(value, f.name)) for f in fields(value)}
+    if isinstance(value, dict):
+        return {key: to_dict(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_dict(item) for item in value]
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
@@ -0,0 +1,322 @@
+"""
+Decision log retention and archival.
+
+Every cycle adds decision log rows carrying full LLM reasoning, so a
+continuously monitored catalog grows the database without limit. The
+retention job moves rows older than the retention age out of decision_log
+into compressed JSON Lines archive partitions, one per month
+(decisions-2026-07.jsonl.gz). Each archived row keeps a small entry in
+decision_archive_index (ID, product, type, timestamp, partition), so archived
+decisions can still be fetched by ID or product.
+
+Each archive batch appends a new compressed member (gzip) or frame (zstd) to
+the month's partition; both formats read back as one stream. The index
+records the byte offset of each row's member, so fetching a row decompresses
+only its own member (at most one batch), not the whole month.
+
+Configuration:
+- DECISION_RETENTION_DAYS: age in days after which rows are archived (default 90)
+- DECISION_ARCHIVE_DIR: directory holding the partitions (default data/archive)
+- DECISION_ARCHIVE_COMPRESSION: "gzip" (default) or "zstd" (needs the zstandard package)
+
+Run with:
+    python src/retention.py [--days N] [--vacuum]
+"""
+
+import os
+import io
+import sys
+import gzip
+import json
+import argparse
+from collections import defaultdict
+from dataclasses import fields
+from datetime import datetime, timedelta
+
+if __name__ == '__main__':
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
+
+from sqlalchemy import delete, func, insert
+
+from db_service import engine, get_session, inflate_reasoning, delete_unreferenced_reasoning, unindex_decisions
+from models import DecisionLog, ArchivedDecision, ReasoningBlob
+from records import DecisionLogRecord
+
+
+DECISION_RETENTION_DAYS = int(os.getenv('DECISION_RETENTION_DAYS', '90'))
+DECISION_ARCHIVE_DIR = os.getenv('DECISION_ARCHIVE_DIR', os.path.join('data', 'archive'))
+DECISION_ARCHIVE_COMPRESSION = os.getenv('DECISION_ARCHIVE_COMPRESSION', 'gzip').lower()
+
+# Rows moved per transaction
+ARCHIVE_BATCH_SIZE = 5000
+
+PARTITION_EXTENSIONS = {'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+
+_RECORD_FIELDS = [f.name for f in fields(DecisionLogRecord)]
+
+
+# ================================================================
+# PARTITION FILES
+# ================================================================
+
+def partition_name(timestamp: datetime, compression: str = DECISION_ARCHIVE_COMPRESSION) -> str:
+    """Archive file holding decisions logged in timestamp's month."""
+    return f"decisions-{timestamp:%Y-%m}{PARTITION_EXTENSIONS[compression]}"
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd archives need the zstandard package (pip install zstandard)")
+    return zstandard
+
+
+def _append_partition(path: str, rows) -> int:
+    """
+    Append rows (dicts) to a partition as one compressed member, synced to disk.
+
+    Returns:
+        Byte offset at which the member starts
+    """
+    data = ''.join(json.dumps(row, default=datetime.isoformat) + '\n' for row in rows).encode('utf-8')
+    if path.endswith('.zst'):
+        data = _zstandard().ZstdCompressor().compress(data)
+    else:
+        data = gzip.compress(data, compresslevel=6)
+
+    with open(path, 'ab') as f:
+        offset = f.seek(0, os.SEEK_END)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return offset
+
+
+def _read_partition(path: str, offset: int = 0):
+    """Yield the archived rows of a partition (dicts) from the member at offset on."""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        if path.endswith('.zst'):
+            stream = _zstandard().ZstdDecompressor().stream_reader(f, read_across_frames=True)
+        else:
+            stream = gzip.GzipFile(fileobj=f)
+        for line in io.TextIOWrapper(stream, encoding='utf-8'):
+            yield json.loads(line)
+
+
+def _record_from_archive(item: dict) -> DecisionLogRecord:
+    values = {name: item.get(name) for name in _RECORD_FIELDS}
+    values['timestamp'] = datetime.fromisoformat(values['timestamp'])
+    return DecisionLogRecord(**values)
+
+
+# ================================================================
+# ARCHIVING
+# ================================================================
+
+def archive_decisions(older_than_days: int = DECISION_RETENTION_DAYS,
+                      archive_dir: str = DECISION_ARCHIVE_DIR,
+                      compression: str = DECISION_ARCHIVE_COMPRESSION,
+                      now: datetime | None = None,
+                      batch_size: int = ARCHIVE_BATCH_SIZE) -> dict:
+    """
+    Move decision log rows older than the retention age into archive partitions.
+
+    Rows are written to their month's partition and synced before they are
+    indexed and deleted (one transaction per batch), so a crash can at worst
+    leave an unindexed copy in a partition (never read back), never lose a row.
+
+    The newest log row is never archived: SQLite reuses row IDs once a table
+    is emptied, and archived IDs must stay unique.
+
+    Args:
+        older_than_days: Archive rows logged more than this many days ago
+        archive_dir: Directory holding the partitions
+        compression: "gzip" or "zstd"
+        now: Reference time (default: utcnow)
+        batch_size: Rows moved per transaction
+
+    Returns:
+        Dictionary with 'archived' (rows moved), 'partitions' (files written to),
+        'blobs_deleted' (reasoning blobs no longer referenced by the log) and
+        'cutoff' (rows logged before this time were archived)
+    """
+    if compression not in PARTITION_EXTENSIONS:
+        raise ValueError(
+            f"Unknown archive compression {compression!r}, "
+            f"expected one of {', '.join(PARTITION_EXTENSIONS)}"
+        )
+    if compression == 'zstd':
+        _zstandard()
+
+    cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+    os.makedirs(archive_dir, exist_ok=True)
+
+    archived = 0
+    partitions = set()
+    while True:
+        with get_session() as session:
+            newest_id = session.query(func.max(DecisionLog.id)).scalar()
+            rows = session.query(
+                *[getattr(DecisionLog, name) for name in _RECORD_FIELDS], ReasoningBlob.data
+            ).outerjoin(
+                ReasoningBlob, ReasoningBlob.hash == DecisionLog.reasoning_hash
+            ).filter(
+                DecisionLog.timestamp < cutoff,
+                DecisionLog.id < newest_id
+            ).order_by(DecisionLog.timestamp).limit(batch_size).all()
+        if not rows:
+            break
+
+        by_partition = defaultdict(list)
+        for row in rows:
+            # Archives are self-contained: reasoning is written as text
+            item = dict(zip(_RECORD_FIELDS, row))
+            item['reasoning'] = inflate_reasoning(row.reasoning, row.data)
+            by_partition[partition_name(row.timestamp, compression)].append(item)
+        offsets = {
+            partition: _append_partition(os.path.join(archive_dir, partition), partition_rows)
+            for partition, partition_rows in by_partition.items()
+        }
+
+        with get_session() as session:
+            session.execute(insert(ArchivedDecision), [
+                {
+                    'decision_log_id': row['id'],
+                    'product_id': row['product_id'],
+                    'decision_type': row['decision_type'],
+                    'timestamp': row['timestamp'],
+                    'partition': partition,
+                    'member_offset': offsets[partition]
+                }
+                for partition, partition_rows in by_partition.items()
+                for row in partition_rows
+            ])
+            session.execute(delete(DecisionLog).where(DecisionLog.id.in_([row.id for row in rows])))
+            unindex_decisions(session, [
+                (item['id'], item['decision'], item['reasoning'])
+                for partition_rows in by_partition.values()
+                for item in partition_rows
+            ])
+
+        archived += len(rows)
+        partitions.update(by_partition)
+
+    blobs_deleted = delete_unreferenced_reasoning() if archived else 0
+    return {
+        'archived': archived,
+        'partitions': sorted(partitions),
+        'blobs_deleted': blobs_deleted,
+        'cutoff': cutoff
+    }
+
+
+def vacuum_database() -> None:
+    """Rewrite the SQLite file to return the space freed by archiving to the OS."""
+    with engine.connect() as connection:
+        connection.exec_driver_sql('VACUUM')
+
+
+# ================================================================
+# READING ARCHIVED DECISIONS
+# ================================================================
+
+def read_archived_decisions(log_ids=None, product_id=None, since=None, until=None,
+                            limit=50, offset=0, archive_dir: str = DECISION_ARCHIVE_DIR):
+    """
+    Page through archived decisions, newest first.
+
+    The archive index selects the page; only the compressed members holding
+    those rows are decompressed.
+
+    Args:
+        log_ids: Only these decision log IDs
+        product_id: Only decisions for this product
+        since: Only decisions at or after this datetime
+        until: Only decisions before this datetime
+        limit: Page size
+        offset: Rows to skip (page * limit)
+        archive_dir: Directory holding the partitions
+
+    Returns:
+        (list of DecisionLogRecords, total number of matches)
+    """
+    with get_session() as session:
+        entries = session.query(
+            ArchivedDecision.decision_log_id, ArchivedDecision.partition, ArchivedDecision.member_offset
+        )
+        if log_ids is not None:
+            entries = entries.filter(ArchivedDecision.decision_log_id.in_(list(log_ids)))
+        if product_id is not None:
+            entries = entries.filter(ArchivedDecision.product_id == product_id)
+        if since is not None:
+            entries = entries.filter(ArchivedDecision.timestamp >= since)
+        if until is not None:
+            entries = entries.filter(ArchivedDecision.timestamp < until)
+
+        total = entries.with_entities(func.count(ArchivedDecision.decision_log_id)).scalar()
+        page = entries.order_by(
+            ArchivedDecision.timestamp.desc(), ArchivedDecision.decision_log_id.desc()
+        ).limit(limit).offset(offset).all()
+
+    wanted = defaultdict(set)
+    for log_id, partition, offset in page:
+        wanted[partition, offset].add(log_id)
+
+    found = {}
+    for (partition, offset), member_ids in wanted.items():
+        remaining = set(member_ids)
+        for item in _read_partition(os.path.join(archive_dir, partition), offset):
+            if item['id'] in remaining:
+                found[item['id']] = _record_from_archive(item)
+                remaining.discard(item['id'])
+                if not remaining:
+                    break
+
+    return [found[log_id] for log_id, _, _ in page if log_id in found], total
+
+
+# ================================================================
+# CLI
+# ================================================================
+
+def parse_args(argv=None):
+    """Parse CLI options."""
+    parser = argparse.ArgumentParser(description="Archive old decision log rows")
+    parser.add_argument(
+        '--days', type=int, default=DECISION_RETENTION_DAYS,
+        help="Archive rows older than this many days (default: DECISION_RETENTION_DAYS or 90)"
+    )
+    parser.add_argument(
+        '--compression', choices=sorted(PARTITION_EXTENSIONS), default=DECISION_ARCHIVE_COMPRESSION,
+        help="Partition compression (default: DECISION_ARCHIVE_COMPRESSION or gzip)"
+    )
+    parser.add_argument(
+        '--vacuum', action='store_true',
+        help="Compact the database file afterwards (SQLite)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Archive once and report."""
+    args = parse_args(argv)
+
+    from db_init import prepare_database
+    prepare_database()
+
+    result = archive_decisions(older_than_days=args.days, compression=args.compression)
+    print(f"✓ Archived {result['archived']} decisions logged before {result['cutoff']:%Y-%m-%d %H:%M}")
+    for partition in result['partitions']:
+        print(f"  - {os.path.join(DECISION_ARCHIVE_DIR, partition)}")
+
+    if args.vacuum and engine.dialect.name == 'sqlite':
+        vacuum_database()
+        print("✓ Database compacted")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Urgency-ordered scheduling for portfolio runs.
+
+Scores every product's stockout urgency in one vectorized NumPy pass so
+that, under load, the most critical decisions are dispatched first.
+
+Urgency combines:
+- Stock pressure: quantity relative to reorder point
+- ETA risk: days until the next inbound shipment (none / overdue = worst)
+- Supplier risk: unreliability of the supplier behind that shipment
+
+    urgency = stock_pressure * (1 + ETA_WEIGHT * eta_risk + SUPPLIER_WEIGHT * supplier_risk)
+
+Stock pressure gates the other terms, so a comfortably stocked SKU never
+outranks a depleted one just because its next delivery is far away.
+"""
+
+import numpy as np
+
+from portfolio import load_portfolio_arrays
+
+
+# Stock pressure is 1.0 at zero stock, 0.5 at reorder point, 0.0 at this multiple of it
+SAFE_STOCK_MULTIPLE = 2.0
+
+# ETA risk reaches 1.0 when the next shipment is this many days out (or later)
+ETA_HORIZON_DAYS = 14.0
+
+ETA_WEIGHT = 0.5
+SUPPLIER_WEIGHT = 0.5
+
+
+def score_urgency(quantity, reorder_point, next_eta_days, inbound_reliability):
+    """
+    Compute urgency scores for many products at once.
+
+    All arguments are equal-length arrays. Products without an inbound
+    shipment must have NaN in next_eta_days and inbound_reliability.
+
+    Returns:
+        float64 array of urgency scores (higher = more urgent)
+    """
+    quantity = np.asarray(quantity, dtype=np.float64)
+    reorder_point = np.maximum(np.asarray(reorder_point, dtype=np.float64), 1.0)
+    next_eta_days = np.asarray(next_eta_days, dtype=np.float64)
+    inbound_reliability = np.asarray(inbound_reliability, dtype=np.float64)
+
+    stock_pressure = np.clip(1.0 - quantity / (SAFE_STOCK_MULTIPLE * reorder_point), 0.0, 1.0)
+
+    # No inbound shipment or overdue shipment counts as maximum ETA risk
+    eta_risk = np.clip(next_eta_days / ETA_HORIZON_DAYS, 0.0, 1.0)
+    eta_risk = np.where(np.isnan(next_eta_days) | (next_eta_days < 0), 1.0, eta_risk)
+
+    supplier_risk = np.where(
+        np.isnan(inbound_reliability), 1.0, 1.0 - np.clip(inbound_reliability, 0.0, 1.0)
+    )
+
+    return stock_pressure * (1.0 + ETA_WEIGHT * eta_risk + SUPPLIER_WEIGHT * supplier_risk)
+
+
+def prioritize_products(product_ids=None, arrays=None):
+    """
+    Order products by descending stockout urgency.
+
+    Args:
+        product_ids: Optional list of product IDs. If None, scores the whole catalog.
+        arrays: Optional preloaded load_portfolio_arrays() result (skips the DB read)
+
+    Returns:
+        List of (product_id, urgency) tuples, most urgent first.
+        Requested products without an inventory row are appended last with urgency 0.
+    """
+    if arrays is None:
+        arrays = load_portfolio_arrays(product_ids)
+
+    ids = arrays['product_id']
+    urgency = score_urgency(
+        arrays['quantity'], arrays['reorder_point'],
+        arrays['next_eta_days'], arrays['next_reliability']
+    )
+
+    # Stable sort keeps product ID order among equal scores
+    order = np.argsort(-urgency, kind='stable')
+    ranked = [(int(ids[i]), float(urgency[i])) for i in order]
+
+    if product_ids is not None:
+        scored = set(ids.tolist())
+        ranked.extend((pid, 0.0) for pid in product_ids if pid not in scored)
+
+    return ranked
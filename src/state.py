@@ -1,17 +1,28 @@
+import uuid
+
 from typing_extensions import TypedDict, Annotated
+from records import Snapshot, FinalDecision
 
 
 def merge_agent_outputs(left: dict, right: dict | None) -> dict:
     """
     Reducer function to safely merge agent outputs.
     Prevents overwriting - appends new agent outputs to existing ones.
+
+    Nodes return only their own entry (a delta), never the whole dict.
+    Empty sides are passed through without allocating. Otherwise the merge
+    is copy-on-write: LangGraph shares channel values between checkpoints
+    and streamed state, so ``left`` must not be mutated in place. The output
+    records themselves are immutable and are shared, not copied.
     """
-    if right is None:
+    if not right:
         return left
+    if not left:
+        return right
     return {**left, **right}
 
 
-def replace_snapshot(left: dict, right: dict | None) -> dict:
+def replace_snapshot(left: Snapshot | None, right: Snapshot | None) -> Snapshot | None:
     """
     Reducer function for db_snapshot.
     Always replaces with the latest snapshot (no merging needed).
@@ -34,17 +45,25 @@ class SupplyChainState(TypedDict):
     - Other fields: Default overwrite behavior
     """
     product_id: int
+    
+    # Identifies this cycle in the decision log (links its log rows together)
+    cycle_id: str
+    
     # Current snapshot of database state (read by agents)
     # Reducer: Always replace with latest
-    db_snapshot: Annotated[dict, replace_snapshot]
+    db_snapshot: Annotated[Snapshot | None, replace_snapshot]
+    
+    # Snapshot read ahead of the cycle (pipelined runner), consumed by ingestion
+    # Default behavior: overwrite
+    prefetched_snapshot: Snapshot | None
     
-    # Outputs from individual agents (keyed by agent name)
+    # Outputs from individual agents (keyed by agent name, values are output records)
     # Reducer: Merge dictionaries to preserve all agent outputs
     agent_outputs: Annotated[dict, merge_agent_outputs]
     
     # Final procurement decision (supplier_id, quantity, reasoning)
     # Default behavior: overwrite
-    final_decision: dict | None
+    final_decision: FinalDecision | None
     
     # Risk assessment from Risk Agent
     # Default behavior: overwrite
@@ -53,3 +72,29 @@ class SupplyChainState(TypedDict):
     # Optional human override or approval
     # Default behavior: overwrite
     human_feedback: str | None
+    
+    # Whole-cycle deadline (time.monotonic()), set at ingestion, see deadlines.py
+    # Default behavior: overwrite
+    cycle_deadline: float | None
+
+
+def new_cycle_state(product_id: int, snapshot: Snapshot | None = None,
+                    cycle_id: str | None = None) -> SupplyChainState:
+    """
+    Build the initial state for one decision cycle of a product.
+
+    A prefetched snapshot (see prefetch.py) is used as-is by data ingestion
+    instead of reading the database on the cycle's critical path.
+    A cycle_id is generated unless one is given.
+    """
+    return {
+        'product_id': product_id,
+        'cycle_id': cycle_id or uuid.uuid4().hex,
+        'db_snapshot': None,
+        'prefetched_snapshot': snapshot,
+        'agent_outputs': {},
+        'final_decision': None,
+        'decision_risk': None,
+        'human_feedback': None,
+        'cycle_deadline': None
+    }
@@ -0,0 +1,121 @@
+"""
+Supplier ranking index.
+
+Keeps suppliers sorted by reliability and by lead time, plus the Pareto
+frontier between the two (suppliers no other supplier beats on both), so
+supplier selection gets its top candidates in O(1) instead of scanning
+and reasoning over the whole supplier table.
+
+The index is updated incrementally: upserting or removing one supplier
+adjusts both sorted lists by bisection; the frontier is recomputed lazily
+the next time it is read.
+"""
+
+from bisect import bisect_left, insort
+
+from records import SupplierCandidates, SupplierRecord
+
+
+class SupplierRanking:
+    """
+    Incrementally maintained ranking of suppliers.
+
+    Suppliers are SupplierRecord instances (the catalog cache format).
+    """
+
+    def __init__(self, suppliers=()):
+        self._by_id = {}
+        # Sort keys end with the supplier ID so ties are deterministic
+        self._by_reliability = []  # (-reliability, lead_time, id)
+        self._by_lead_time = []    # (lead_time, -reliability, id)
+        self._frontier = None
+        for supplier in suppliers:
+            self.upsert(supplier)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    @staticmethod
+    def _reliability_key(supplier):
+        return (-supplier.reliability_score, supplier.lead_time_days, supplier.id)
+
+    @staticmethod
+    def _lead_time_key(supplier):
+        return (supplier.lead_time_days, -supplier.reliability_score, supplier.id)
+
+    # ================================================================
+    # UPDATES
+    # ================================================================
+
+    def upsert(self, supplier: SupplierRecord) -> None:
+        """Add a supplier or replace an existing one with the same ID."""
+        if supplier.id in self._by_id:
+            self.remove(supplier.id)
+        self._by_id[supplier.id] = supplier
+        insort(self._by_reliability, self._reliability_key(supplier))
+        insort(self._by_lead_time, self._lead_time_key(supplier))
+        self._frontier = None
+
+    def remove(self, supplier_id: int) -> None:
+        """Remove a supplier if present."""
+        supplier = self._by_id.pop(supplier_id, None)
+        if supplier is None:
+            return
+        _remove_sorted(self._by_reliability, self._reliability_key(supplier))
+        _remove_sorted(self._by_lead_time, self._lead_time_key(supplier))
+        self._frontier = None
+
+    # ================================================================
+    # QUERIES
+    # ================================================================
+
+    def most_reliable(self) -> SupplierRecord | None:
+        """Supplier with the highest reliability (shortest lead time on ties)."""
+        if not self._by_reliability:
+            return None
+        return self._by_id[self._by_reliability[0][2]]
+
+    def fastest(self) -> SupplierRecord | None:
+        """Supplier with the shortest lead time (highest reliability on ties)."""
+        if not self._by_lead_time:
+            return None
+        return self._by_id[self._by_lead_time[0][2]]
+
+    def top_by_reliability(self, k: int) -> list[SupplierRecord]:
+        return [self._by_id[key[2]] for key in self._by_reliability[:k]]
+
+    def top_by_lead_time(self, k: int) -> list[SupplierRecord]:
+        return [self._by_id[key[2]] for key in self._by_lead_time[:k]]
+
+    def pareto_frontier(self) -> tuple[SupplierRecord, ...]:
+        """
+        Suppliers not dominated on (reliability, lead time), most reliable first.
+
+        Walking suppliers by descending reliability, a supplier is on the
+        frontier if its lead time is strictly shorter than every more
+        reliable supplier's.
+        """
+        if self._frontier is None:
+            frontier = []
+            best_lead_time = None
+            for key in self._by_reliability:
+                supplier = self._by_id[key[2]]
+                if best_lead_time is None or supplier.lead_time_days < best_lead_time:
+                    frontier.append(supplier)
+                    best_lead_time = supplier.lead_time_days
+            self._frontier = tuple(frontier)
+        return self._frontier
+
+    def candidates(self) -> SupplierCandidates:
+        """Short candidate set for supplier selection prompts and fallbacks."""
+        return SupplierCandidates(
+            most_reliable=self.most_reliable(),
+            fastest=self.fastest(),
+            frontier=self.pareto_frontier()
+        )
+
+
+def _remove_sorted(keys: list, key: tuple) -> None:
+    index = bisect_left(keys, key)
+    if index < len(keys) and keys[index] == key:
+        del keys[index]
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+# Modules under src/ import each other by flat name (as when run from src/)
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+# db_service binds its engine at import: point it at a throwaway database
+# before any test module imports it, never at data/supply_chain.db
+_TEST_DB_DIR = tempfile.mkdtemp(prefix='supply_chain_tests_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_TEST_DB_DIR, 'supply_chain.db')}"
@@ -0,0 +1,66 @@
+"""
+Cycles on the shared runner loop with deferred explanations and the
+offline stub provider.
+"""
+
+import threading
+import time
+
+import pytest
+
+import backend_interface
+import explanations
+import llm_config
+from db_init import prepare_database
+from db_service import query_decisions
+from nodes.hold_synthesis import hold_explanation
+
+
+@pytest.fixture
+def deferred_stub(monkeypatch):
+    prepare_database()
+    monkeypatch.setattr(llm_config, 'LLM_PROVIDER', 'stub')
+    monkeypatch.setattr(explanations, 'EXPLANATION_MODE', 'deferred')
+
+
+def _runner_threads():
+    return [t for t in threading.enumerate() if t.name == 'cycle-runner']
+
+
+def test_cycles_share_the_runner_loop_and_skip_unheard_narratives(deferred_stub):
+    runner = backend_interface.get_cycle_runner()
+    threads = len(_runner_threads())
+
+    results = [backend_interface.run_one_cycle(product_id) for product_id in (2, 3)]
+    stats = runner._call(explanations.drain_explanations())
+
+    assert len(_runner_threads()) == threads == 1
+    assert [r['final_decision']['decision_type'] for r in results] == ['REORDER', 'REORDER']
+    assert all(r['agent_outputs']['inventory']['explanation_pending'] for r in results)
+    # Only the logged coordinator narratives: nobody listens for the inventory ones
+    assert stats['submitted'] == 2
+    assert stats['completed'] == 2
+
+
+def test_pruned_hold_backfills_its_logged_reasoning(deferred_stub):
+    runner = backend_interface.get_cycle_runner()
+
+    job = runner.submit(1)
+    while not job.done:
+        time.sleep(0.01)
+    runner._call(explanations.drain_explanations())
+
+    # Decided by the HOLD synthesizer, with the templated inventory reasoning
+    synthesized = next(e['output']['final_decision'] for e in job.events if e['node'] == 'hold_synthesizer')
+    assert synthesized['decision_type'] == 'HOLD'
+    assert synthesized['explanation_pending']
+
+    # ...then explained by the inventory narrative, in the result and the log
+    narrative = job.result['agent_outputs']['inventory']['reasoning']
+    assert narrative not in synthesized['explanation']
+    assert job.result['final_decision']['explanation'] == hold_explanation(narrative)
+    assert not job.result['final_decision']['explanation_pending']
+
+    decisions, _ = query_decisions(product_id=1, decision_type='HOLD', limit=1)
+    assert decisions[0].id == job.result['agent_outputs']['execution']['log_id']
+    assert decisions[0].reasoning == hold_explanation(narrative)
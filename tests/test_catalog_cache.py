@@ -0,0 +1,46 @@
+"""
+upsert_supplier updates the cached supplier table and ranking in place.
+"""
+
+import pytest
+
+from db_init import prepare_database
+from db_service import CatalogCache, catalog_version, get_session, read_supply_chain_snapshot, upsert_supplier
+
+
+@pytest.fixture(scope='module', autouse=True)
+def database():
+    prepare_database()
+
+
+def _candidate_ids(candidates):
+    return candidates.most_reliable.id, candidates.fastest.id, [s.id for s in candidates.frontier]
+
+
+def test_upsert_supplier_updates_cached_ranking_and_candidates():
+    # Warm the cache so the upsert has to update it rather than load it
+    before = read_supply_chain_snapshot(product_id=1)
+    version = catalog_version()
+
+    supplier_id = upsert_supplier('Express Prime', lead_time_days=1, reliability_score=0.999)
+    snapshot = read_supply_chain_snapshot(product_id=1)
+
+    assert catalog_version() > version
+    assert supplier_id not in {s.id for s in before.suppliers}
+    assert supplier_id in {s.id for s in snapshot.suppliers}
+    assert _candidate_ids(snapshot.supplier_candidates) == (supplier_id, supplier_id, [supplier_id])
+
+    # Updating an existing supplier moves it down both rankings
+    upsert_supplier('Express Prime', lead_time_days=90, reliability_score=0.1, supplier_id=supplier_id)
+    snapshot = read_supply_chain_snapshot(product_id=1)
+
+    assert [s for s in snapshot.suppliers if s.id == supplier_id][0].lead_time_days == 90
+    assert supplier_id not in _candidate_ids(snapshot.supplier_candidates)[:2]
+    assert _candidate_ids(snapshot.supplier_candidates) == _candidate_ids(before.supplier_candidates)
+
+    # The incrementally updated cache matches one loaded from the database
+    with get_session() as session:
+        reloaded = CatalogCache()
+        assert sorted(reloaded.suppliers(session), key=lambda s: s.id) == \
+            sorted(snapshot.suppliers, key=lambda s: s.id)
+        assert reloaded.supplier_candidates(session) == snapshot.supplier_candidates
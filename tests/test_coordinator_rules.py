@@ -0,0 +1,58 @@
+"""
+The coordinator's direct decision (deferred explanations, deadline fallback)
+follows the same supplier rule as the coordination prompt.
+"""
+
+import pytest
+
+from agents.coordinator_agent import direct_decision
+from records import InventoryOutput, LogisticsOutput, RiskOutput, SupplierRecord
+from stub_llm import answer
+from supplier_index import SupplierRanking
+
+
+SUPPLIERS = (
+    SupplierRecord(id=1, name='Reliable Corp', lead_time_days=10, reliability_score=0.97),
+    SupplierRecord(id=2, name='Fast Shipping Inc', lead_time_days=2, reliability_score=0.85),
+)
+MOST_RELIABLE, FASTEST = 1, 2
+
+
+def _outputs(logistics_risk):
+    inventory = InventoryOutput(action='REORDER', quantity=150, reasoning='')
+    logistics = LogisticsOutput(expedite=logistics_risk == 'HIGH', reasoning='')
+    risk = RiskOutput(supplier_risk='LOW', logistics_risk=logistics_risk, reasoning='')
+    return inventory, logistics, risk
+
+
+@pytest.mark.parametrize('logistics_risk, supplier_id', [('LOW', MOST_RELIABLE), ('HIGH', FASTEST)])
+def test_direct_decision_prefers_short_lead_time_under_logistics_risk(logistics_risk, supplier_id):
+    inventory, logistics, risk = _outputs(logistics_risk)
+    candidates = SupplierRanking(SUPPLIERS).candidates()
+
+    decision_type, details = direct_decision(inventory, logistics, risk, candidates)
+
+    assert decision_type == 'REORDER'
+    assert details.supplier_id == supplier_id
+    assert details.quantity == 150
+    assert details.expedite == logistics.expedite
+
+
+@pytest.mark.parametrize('logistics_risk', ['LOW', 'HIGH'])
+def test_stub_coordinator_agrees_with_direct_decision(logistics_risk):
+    inventory, logistics, risk = _outputs(logistics_risk)
+    candidates = SupplierRanking(SUPPLIERS).candidates()
+    prompt = (
+        "AGENT RECOMMENDATIONS:\n"
+        f"   - Action: {inventory.action}\n"
+        f"   - Quantity: {inventory.quantity} units\n"
+        f"   - Logistics risk: {risk.logistics_risk}\n"
+        f"   - Expedite shipping: {logistics.expedite}\n"
+        f"  Highest reliability: Supplier {MOST_RELIABLE}\n"
+        f"  Shortest lead time: Supplier {FASTEST}\n"
+        "DECISION_TYPE: [REORDER or HOLD]\n"
+    )
+
+    _, details = direct_decision(inventory, logistics, risk, candidates)
+
+    assert f"SUPPLIER_ID: {details.supplier_id}\n" in answer(prompt)
@@ -0,0 +1,49 @@
+"""
+The synthetic catalog generator is reproducible from its CLI arguments.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from datagen import DEFAULT_NOW, generate_catalog, parse_args
+from models import Base, PurchaseOrder, Shipment, Supplier
+
+
+def _generate(tmp_path, name, argv):
+    engine = create_engine(f"sqlite:///{tmp_path / name}")
+    Base.metadata.create_all(engine)
+    args = parse_args(argv)
+    generate_catalog(engine, args.products, args.suppliers, seed=args.seed, now=args.now)
+    with engine.connect() as connection:
+        return {
+            model.__tablename__: connection.execute(select(model).order_by(model.id)).all()
+            for model in (Supplier, PurchaseOrder, Shipment)
+        }
+
+
+def test_same_arguments_generate_the_same_catalog(tmp_path):
+    argv = ['--products', '200', '--suppliers', '20', '--seed', '7']
+
+    first = _generate(tmp_path, 'first.db', argv)
+    second = _generate(tmp_path, 'second.db', argv)
+
+    assert first['purchase_orders'] and first['shipments']
+    assert first == second
+
+
+def test_now_sets_the_reference_time(tmp_path):
+    assert parse_args([]).now == DEFAULT_NOW
+
+    argv = ['--products', '200', '--suppliers', '20', '--now', '2024-06-30']
+    orders = _generate(tmp_path, 'now.db', argv)['purchase_orders']
+
+    assert max(order.created_at for order in orders) <= datetime(2024, 6, 30)
+    assert min(order.created_at for order in orders) >= datetime(2023, 6, 30)
+
+
+def test_now_rejects_non_iso_dates(capsys):
+    with pytest.raises(SystemExit):
+        parse_args(['--now', 'yesterday'])
+    assert "expected an ISO date" in capsys.readouterr().err
@@ -0,0 +1,55 @@
+"""
+Streaming feed import: invalid records are skipped and reported, never fatal.
+"""
+
+import pytest
+from sqlalchemy import select
+
+import importer
+from db_init import prepare_database
+from db_service import get_session
+from models import Inventory
+
+
+@pytest.fixture(scope='module', autouse=True)
+def database():
+    prepare_database()
+
+
+def _quantities():
+    with get_session() as session:
+        return dict(session.execute(select(Inventory.product_id, Inventory.quantity)).all())
+
+
+def test_malformed_jsonl_lines_are_rejected_not_fatal(tmp_path):
+    feed = tmp_path / 'counts.jsonl'
+    feed.write_text(
+        '{"product_id": 1, "quantity": 11}\n'
+        '{"product_id": 2, "quantity": \n'
+        '[1, 2]\n'
+        '{"product_id": 3, "quantity": 33}\n'
+    )
+    events = []
+
+    stats = importer.import_feed(str(feed), 'inventory', batch_size=2,
+                                 on_event=lambda name, change: events.append(change))
+
+    assert stats['records'] == 4
+    assert stats['updated'] == 2
+    assert stats['rejected'] == 2
+    assert [number for number, _ in stats['errors']] == [2, 3]
+    assert stats['errors'][0][1].startswith('invalid JSON')
+    quantities = _quantities()
+    assert quantities[1] == 11 and quantities[3] == 33
+    assert sorted(p for change in events for p in change['product_ids']) == [1, 3]
+
+
+def test_invalid_csv_values_and_unknown_products_are_rejected(tmp_path):
+    feed = tmp_path / 'counts.csv'
+    feed.write_text('product_id,quantity,reorder_point\n1,12,\n2,x,10\n999,5,5\n')
+
+    stats = importer.import_feed(str(feed), 'inventory')
+
+    assert (stats['updated'], stats['rejected']) == (1, 2)
+    assert [number for number, _ in stats['errors']] == [2, 3]
+    assert _quantities()[1] == 12
@@ -0,0 +1,72 @@
+"""
+CycleJobQueue bookkeeping with a stand-in cycle (no graph, no database).
+"""
+
+import asyncio
+import gc
+import weakref
+
+import pytest
+
+from job_queue import CycleJobQueue
+
+
+async def _instant_cycle(product_id, on_event=None):
+    return {'product_id': product_id}
+
+
+async def _wait_until_idle(queue, submitted):
+    while queue.progress()['completed'] + queue.progress()['failed'] < submitted:
+        await asyncio.sleep(0.001)
+
+
+def test_non_collecting_queue_keeps_no_finished_jobs():
+    async def scenario():
+        async with CycleJobQueue(run_cycle=_instant_cycle, workers=4, max_queue_depth=500,
+                                 collect_results=False) as queue:
+            refs = [weakref.ref(queue.try_submit(product_id)) for product_id in range(1, 501)]
+            await _wait_until_idle(queue, 500)
+            gc.collect()
+
+            assert queue.progress()['completed'] == 500
+            # At most each idle worker's last job is still referenced
+            assert sum(ref() is not None for ref in refs) <= 4
+            with pytest.raises(RuntimeError):
+                async for _ in queue.completed():
+                    pass
+
+    asyncio.run(scenario())
+
+
+def test_collecting_queue_delivers_every_job():
+    async def scenario():
+        async with CycleJobQueue(run_cycle=_instant_cycle, workers=4) as queue:
+            producer = asyncio.create_task(queue.submit_all(range(1, 21)))
+            results = [job.result['product_id'] async for job in queue.completed()]
+            await producer
+        return results
+
+    assert sorted(asyncio.run(scenario())) == list(range(1, 21))
+
+
+def test_retried_job_that_succeeds_reports_no_error():
+    attempts = []
+
+    async def flaky_cycle(product_id, on_event=None):
+        attempts.append(product_id)
+        if len(attempts) == 1:
+            raise ConnectionError("provider unavailable")
+        return {'product_id': product_id}
+
+    async def scenario():
+        async with CycleJobQueue(run_cycle=flaky_cycle, workers=1, max_retries=2, backoff_base=0.0) as queue:
+            producer = asyncio.create_task(queue.submit_all([1]))
+            jobs = [job async for job in queue.completed()]
+            await producer
+        return jobs[0]
+
+    job = asyncio.run(scenario())
+
+    assert job.status == 'completed'
+    assert job.attempts == 2
+    assert job.to_dict()['error'] is None
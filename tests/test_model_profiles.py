@@ -0,0 +1,49 @@
+"""
+Model profiles loaded from LLM_PROFILES_FILE are validated when loaded.
+"""
+
+import json
+
+import pytest
+
+import llm_config
+
+
+@pytest.fixture
+def profiles_file(tmp_path, monkeypatch):
+    path = tmp_path / 'profiles.json'
+
+    def write(config):
+        path.write_text(json.dumps(config), encoding='utf-8')
+        monkeypatch.setenv('LLM_PROFILES_FILE', str(path))
+        llm_config.load_model_profiles.cache_clear()
+        return path
+
+    yield write
+    llm_config.load_model_profiles.cache_clear()
+
+
+def test_profiles_file_overrides_and_adds_profiles(profiles_file):
+    profiles_file({
+        'profiles': {'fast': {'max_tokens': 300}, 'long': {'model': 'openai/gpt-4o', 'timeout': 120}},
+        'agents': {'coordinator': 'long'}
+    })
+
+    profiles, agents = llm_config.load_model_profiles()
+
+    assert profiles['fast'].max_tokens == 300
+    assert profiles['long'].model == 'openai/gpt-4o'
+    assert profiles['long'].timeout == 120
+    assert agents['coordinator'] == 'long'
+
+
+@pytest.mark.parametrize('key', ['temperature', 'max_token'])
+def test_unknown_profile_setting_names_the_file_and_key(profiles_file, key):
+    path = profiles_file({'profiles': {'fast': {key: 1}}})
+
+    with pytest.raises(ValueError) as error:
+        llm_config.load_model_profiles()
+
+    assert str(path) in str(error.value)
+    assert repr(key) in str(error.value)
+    assert "'fast'" in str(error.value)
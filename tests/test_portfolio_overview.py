@@ -0,0 +1,40 @@
+"""
+Portfolio overview: pending approvals are derived from the decision log.
+"""
+
+import uuid
+
+import pytest
+
+from db_init import prepare_database
+from db_service import log_decision, read_portfolio_overview
+
+
+@pytest.fixture(scope='module', autouse=True)
+def database():
+    prepare_database()
+
+
+def _request_approval(cycle_id):
+    log_decision(
+        agent_name='system', decision='HUMAN_APPROVAL_REQUESTED', reasoning='High risk',
+        product_id=1, cycle_id=cycle_id, decision_type='HUMAN_APPROVAL_REQUESTED',
+        supplier_id=1, quantity=100, expedite=True
+    )
+
+
+def test_pending_approvals_counts_requests_without_executed_decision():
+    before = read_portfolio_overview()
+    approved, waiting = uuid.uuid4().hex, uuid.uuid4().hex
+
+    _request_approval(approved)
+    _request_approval(waiting)
+    log_decision(
+        agent_name='coordinator', decision='REORDER: 100 units from supplier 1, expedite=True',
+        reasoning='High risk', product_id=1, cycle_id=approved, decision_type='REORDER',
+        supplier_id=1, quantity=100, expedite=True
+    )
+    after = read_portfolio_overview()
+
+    assert after['approval_requests'] - before['approval_requests'] == 2
+    assert after['pending_approvals'] - before['pending_approvals'] == 1
@@ -0,0 +1,98 @@
+"""
+invoke_llm's limiter and retries against a throttling stand-in provider.
+
+One workload (REQUESTS concurrent calls, client ceiling 16, server cap 4,
+5% random 503s) runs once per module; the tests check its outcome.
+"""
+
+import asyncio
+from collections import defaultdict
+
+import pytest
+
+import llm_config
+from throttled_provider import ThrottledProvider
+
+
+SERVER_CAP = 4
+CLIENT_MAX_CONCURRENCY = 16
+REQUESTS = 120
+
+
+async def _run_requests():
+    pending = REQUESTS
+    samples = []   # (requests not yet answered, concurrency limit)
+
+    async def call(i):
+        nonlocal pending
+        try:
+            return await llm_config.invoke_llm(f"request-{i}", agent='demand')
+        finally:
+            pending -= 1
+
+    async def sample_limit():
+        while True:
+            samples.append((pending, llm_config.get_limiter_stats('openrouter')['concurrency_limit']))
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.create_task(sample_limit())
+    try:
+        responses = await asyncio.gather(*[call(i) for i in range(REQUESTS)])
+    finally:
+        sampler.cancel()
+    return responses, samples, llm_config.get_limiter_stats('openrouter')
+
+
+@pytest.fixture(scope='module')
+def workload():
+    with ThrottledProvider(cap=SERVER_CAP, error_rate=0.05, latency_s=0.05, retry_after_ms=300) as provider, \
+            pytest.MonkeyPatch.context() as patch:
+        patch.setattr(llm_config, 'LLM_PROVIDER', 'openrouter')
+        patch.setattr(llm_config, 'LLM_MAX_RETRIES', 20)
+        patch.setattr(llm_config, 'LLM_RETRY_BACKOFF_S', 0.05)
+        patch.setenv('OPENROUTER_BASE_URL', provider.url)
+        patch.setenv('OPENROUTER_API_KEY', 'test-key')
+        patch.setenv('OPENROUTER_MAX_CONCURRENCY', str(CLIENT_MAX_CONCURRENCY))
+        patch.setenv('OPENROUTER_RPM', '0')
+        patch.setenv('OPENROUTER_TPM', '0')
+
+        responses, samples, stats = asyncio.run(_run_requests())
+        yield {'responses': responses, 'samples': samples, 'stats': stats, 'log': provider.log}
+
+
+def test_every_request_eventually_succeeds(workload):
+    stats = workload['stats']
+
+    assert [r.content for r in workload['responses']] == [f"OK: request-{i}" for i in range(REQUESTS)]
+    assert stats['failed'] == 0
+    assert stats['throttled'] > 0
+    assert stats['retries'] == stats['throttled']
+
+
+def test_concurrency_limit_shrinks_to_server_cap(workload):
+    samples = workload['samples']
+    assert samples[0][1] == CLIENT_MAX_CONCURRENCY
+
+    # While more requests wait than the client would ever run at once, the
+    # limit is what bounds concurrency. Once adapted it saws around the cap:
+    # additive increase probes above it until a 429 halves it, so it stays
+    # within a factor of two of the cap and never returns to the ceiling.
+    contended = [limit for pending, limit in samples if pending > CLIENT_MAX_CONCURRENCY]
+    settled = contended[len(contended) // 2:]
+    assert min(contended) <= SERVER_CAP
+    assert settled and max(settled) <= 2 * SERVER_CAP
+    assert SERVER_CAP / 2 <= sum(settled) / len(settled) <= 1.5 * SERVER_CAP
+
+
+def test_retries_wait_for_retry_after(workload):
+    attempts = defaultdict(list)
+    for prompt, status, received_at, sent_at, retry_after in workload['log']:
+        attempts[prompt].append((received_at, sent_at, retry_after))
+
+    checked = 0
+    for prompt, history in attempts.items():
+        for (_, sent_at, retry_after), (next_received_at, _, _) in zip(history, history[1:]):
+            if retry_after is not None:
+                assert next_received_at - sent_at >= retry_after, (prompt, history)
+                checked += 1
+    assert checked > 0
@@ -0,0 +1,45 @@
+"""
+Reasoning blobs a writer is about to reference survive the retention GC.
+"""
+
+import sqlite3
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from db_init import prepare_database
+from db_service import delete_unreferenced_reasoning, engine, get_session, store_reasoning
+from models import DecisionLog, ReasoningBlob
+
+
+@pytest.fixture(scope='module', autouse=True)
+def database():
+    prepare_database()
+
+
+def test_storing_an_existing_blob_locks_out_the_gc_until_commit():
+    reasoning = f"Reorder to cover lead time ({uuid.uuid4().hex})"
+    with get_session() as session:
+        # Stored earlier, no longer referenced (e.g. its rows were archived)
+        digest = store_reasoning(session, [reasoning])[0]
+
+    with get_session() as session:
+        assert store_reasoning(session, [reasoning]) == [digest]
+
+        # The GC cannot delete the blob while this transaction may still refer to it
+        gc = sqlite3.connect(engine.url.database, timeout=0)
+        try:
+            with pytest.raises(sqlite3.OperationalError, match='locked'):
+                gc.execute('DELETE FROM reasoning_blobs WHERE hash = ?', (digest,))
+        finally:
+            gc.close()
+
+        session.add(DecisionLog(agent_name='coordinator', decision='REORDER',
+                                reasoning_hash=digest, timestamp=datetime.utcnow()))
+
+    delete_unreferenced_reasoning()
+
+    with get_session() as session:
+        assert session.scalar(select(ReasoningBlob.hash).where(ReasoningBlob.hash == digest)) == digest
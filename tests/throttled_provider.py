@@ -0,0 +1,188 @@
+"""
+Local stand-in for an OpenAI-compatible provider that throttles.
+
+Serves POST /chat/completions with a canned answer after a short delay and
+behaves like a provider under load:
+- More than `cap` requests in flight: 429 with a retry-after-ms header
+  (every 4th one with a whole-second Retry-After header instead)
+- Otherwise, with probability `error_rate`: 503 (overloaded, no Retry-After)
+
+Every request is logged as (prompt, status, received_at, sent_at,
+retry_after_s) with time.monotonic() timestamps, so tests can check how
+clients retried.
+
+Point the client at it with OPENROUTER_BASE_URL=http://127.0.0.1:<port>.
+
+Run standalone with:
+    python tests/throttled_provider.py --port 8099 --cap 4 --error-rate 0.05
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ThrottledProvider:
+    """
+    Throttling chat completions server on a background thread.
+
+    Usage:
+        with ThrottledProvider(cap=4) as provider:
+            os.environ['OPENROUTER_BASE_URL'] = provider.url
+            ...
+            provider.log   # [(prompt, status, received_at, sent_at, retry_after_s), ...]
+
+    Args:
+        cap: Requests served concurrently; more are rejected with 429
+        error_rate: Probability of a 503 for an admitted request
+        latency_s: Time taken to answer an admitted request
+        retry_after_ms: Wait asked for in retry-after-ms headers
+        port: Port to listen on (0 picks a free one)
+        seed: Seed for the 503 draws
+    """
+
+    def __init__(self, cap: int = 4, error_rate: float = 0.05, latency_s: float = 0.05,
+                 retry_after_ms: int = 300, port: int = 0, seed: int = 0):
+        self.cap = cap
+        self.error_rate = error_rate
+        self.latency_s = latency_s
+        self.retry_after_ms = retry_after_ms
+        self.log = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._throttled = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def _admit(self):
+        """Decide a request's fate: (status, headers), counting it in flight if admitted."""
+        with self._lock:
+            if self.in_flight >= self.cap:
+                self._throttled += 1
+                if self._throttled % 4 == 0:
+                    return 429, {'Retry-After': '1'}
+                return 429, {'retry-after-ms': str(self.retry_after_ms)}
+            if self._random.random() < self.error_rate:
+                return 503, {}
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return 200, {}
+
+    def _handler(self):
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                received_at = time.monotonic()
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                messages = body.get('messages') or [{}]
+                prompt = messages[-1].get('content', '')
+
+                status, headers = provider._admit()
+                if status == 200:
+                    try:
+                        time.sleep(provider.latency_s)
+                        payload = _completion(body.get('model', 'stand-in'), prompt)
+                    finally:
+                        with provider._lock:
+                            provider.in_flight -= 1
+                else:
+                    payload = {'error': {'message': 'Rate limited' if status == 429 else 'Overloaded',
+                                         'type': 'rate_limit_error' if status == 429 else 'server_error'}}
+
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+                with provider._lock:
+                    provider.log.append((prompt, status, received_at, time.monotonic(), _retry_after_s(headers)))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog (5) refuses connections under a burst of
+    # clients; those connection errors would be retried as unthrottled
+    request_queue_size = 128
+
+
+def _completion(model: str, prompt: str) -> dict:
+    return {
+        'id': 'chatcmpl-stand-in',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': model,
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': f"OK: {prompt}"},
+            'finish_reason': 'stop'
+        }],
+        'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15}
+    }
+
+
+def _retry_after_s(headers: dict):
+    if 'retry-after-ms' in headers:
+        return int(headers['retry-after-ms']) / 1000
+    if 'Retry-After' in headers:
+        return float(headers['Retry-After'])
+    return None
+
+
+def parse_args(argv=None):
+    """Parse CLI options."""
+    parser = argparse.ArgumentParser(description="Throttling stand-in for an OpenAI-compatible provider")
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--cap', type=int, default=4, help="Concurrent requests served (default 4)")
+    parser.add_argument('--error-rate', type=float, default=0.05, help="Share of random 503s (default 0.05)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    provider = ThrottledProvider(cap=args.cap, error_rate=args.error_rate, port=args.port)
+    print(f"✓ Throttled provider listening on {provider.url}")
+    provider.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,12 @@ Minimal Streamlit UI for Multi-Agent Supply Chain Control Tower
 
 This is a thin visualization layer over a LangGraph-based multi-agent system.
 It does not contain intelligence — it only exposes decisions and reasoning for inspection.
+
+Scales to large catalogs and several operators:
+- The product list is searched and paginated in SQL
+- The compiled graph, DB engine and background cycle runner are shared
+  process-wide (st.cache_resource); snapshots are cached briefly (st.cache_data)
+- Cycles run in the background; the page polls their progress
 """
 
 import streamlit as st
@@ -12,45 +18,81 @@ import os
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from backend_interface import run_one_cycle
+import backend_interface
+from db_service import search_products, read_supply_chain_snapshot, query_decisions
+from explanations import EXPLANATION_EVENT
+from job_queue import QueueFullError
+from records import to_dict
 
-# Page config
-st.set_page_config(
-    page_title="Supply Chain Control Tower",
-    layout="wide"
-)
 
-# Title
-st.title(" Multi-Agent Supply Chain Control Tower")
-st.caption("LangGraph-based decision system with 5 specialized agents")
+# Products per page in the product picker
+PAGE_SIZE = 50
 
-st.markdown("---")
+# Seconds a product snapshot stays cached for the "current state" panel
+SNAPSHOT_TTL_S = 10
 
-# Product selection
-product_id = st.selectbox(
-    "Select Product",
-    options=[1, 2, 3],
-    format_func=lambda x: f"Product {x} - " + 
-        ["Widget A (Standard)", "Widget B (Premium)", "Widget C (Specialized)"][x-1]
-)
+# Past decisions listed for the selected product
+HISTORY_SIZE = 10
 
-# Run button
-if st.button("Run Supply Chain Decision Cycle", type="primary", use_container_width=True):
-    with st.spinner("Executing multi-agent workflow..."):
-        try:
-            result = run_one_cycle(product_id)
-            st.session_state['result'] = result
-            st.session_state['executed'] = True
-            st.success("✓ Decision cycle completed")
-        except Exception as e:
-            st.error(f"Workflow failed: {str(e)}")
-            st.session_state['executed'] = False
+# Seconds between progress refreshes while a cycle runs
+PROGRESS_REFRESH_S = 1.0
 
-st.markdown("---")
+# Graph nodes in flow order, for progress display (HOLD cycles may skip some)
+PIPELINE_NODES = [
+    "ingest_data", "demand_agent", "inventory_agent", "risk_agent",
+    "logistics_agent", "coordinator", "decision_gate", "execute"
+]
+
+
+# ================================================================
+# SHARED RESOURCES (one per server process, shared by all sessions)
+# ================================================================
 
-# Display results if available
-if st.session_state.get('executed'):
-    result = st.session_state['result']
+@st.cache_resource
+def get_engine():
+    from db_service import engine
+    from db_init import prepare_database
+    prepare_database(engine)
+    return engine
+
+
+@st.cache_resource
+def get_graph():
+    from graph import get_supply_chain_graph
+    return get_supply_chain_graph()
+
+
+@st.cache_resource
+def get_cycle_runner():
+    # Compile the graph before the first cycle needs it
+    get_graph()
+    # The backend's process-wide runner, also used by run_one_cycle
+    return backend_interface.get_cycle_runner()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_product_page(query, page):
+    products, total = search_products(query, limit=PAGE_SIZE, offset=page * PAGE_SIZE)
+    return to_dict(products), total
+
+
+@st.cache_data(ttl=SNAPSHOT_TTL_S, show_spinner=False)
+def load_snapshot(product_id):
+    return to_dict(read_supply_chain_snapshot(product_id))
+
+
+@st.cache_data(ttl=SNAPSHOT_TTL_S, show_spinner=False)
+def load_decision_history(product_id):
+    decisions, total = query_decisions(product_id=product_id, limit=HISTORY_SIZE)
+    return to_dict(decisions), total
+
+
+# ================================================================
+# RESULT RENDERING
+# ================================================================
+
+def render_result(result):
+    """Render a finished cycle's snapshot, agent reasoning, decision and governance status."""
     
     # SECTION 1: Supply Chain State
     st.header("Supply Chain State (Database Snapshot)")
@@ -196,5 +238,123 @@ if st.session_state.get('executed'):
         else:
             st.warning(f"⚠ {exec_result.get('message')}")
 
+
+def render_progress(job):
+    """Render a running cycle's status and the nodes completed so far."""
+    completed = [event['node'] for event in job.events if event['node'] != EXPLANATION_EVENT]
+    st.progress(
+        min(len(completed) / len(PIPELINE_NODES), 1.0),
+        text=f"Product {job.product_id}: {job.status} ({len(completed)} steps done)"
+    )
+    for node in completed:
+        st.write(f"✓ {node.replace('_', ' ').title()}")
+
+
+@st.fragment(run_every=PROGRESS_REFRESH_S)
+def render_job_progress(job):
+    """Poll a running cycle; once it finishes, rerun the page to show the result."""
+    if job.done:
+        # The full rerun renders the result outside this fragment, which
+        # stops the polling (a fragment only refreshes while it is rendered)
+        st.rerun()
+    render_progress(job)
+
+
+def render_job(job):
+    """Render the session's current cycle: live progress while it runs, then its result."""
+    if not job.done:
+        render_job_progress(job)
+        return
+    
+    if job.status == 'failed':
+        st.error(f"Workflow failed: {job.error}")
+        return
+    
+    st.success("✓ Decision cycle completed")
+    render_result(job.result)
+
+
+# ================================================================
+# PAGE
+# ================================================================
+
+# Page config
+st.set_page_config(
+    page_title="Supply Chain Control Tower",
+    layout="wide"
+)
+
+get_engine()
+
+# Title
+st.title(" Multi-Agent Supply Chain Control Tower")
+st.caption("LangGraph-based decision system with 5 specialized agents")
+
+st.markdown("---")
+
+# Product selection: server-side search and pagination
+with st.sidebar:
+    st.header("Products")
+    query = st.text_input("Search name or SKU", key="product_query")
+    _, total = load_product_page(query, 0)
+    page_count = max(1, -(-total // PAGE_SIZE))
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1) - 1
+    products, total = load_product_page(query, page)
+    st.caption(f"{total} matching products, page {page + 1} of {page_count}")
+
+    queue = get_cycle_runner().progress()
+    st.caption(f"Cycles (all operators): {queue['running']} running, {queue['queued']} queued")
+
+if not products:
+    st.info("No products match the search")
+    st.stop()
+
+product_names = {p['id']: f"#{p['id']} - {p['name']} ({p['sku']})" for p in products}
+product_id = st.selectbox(
+    "Select Product",
+    options=list(product_names),
+    format_func=product_names.get
+)
+
+# Current state (briefly cached, so reruns don't re-query)
+snapshot = load_snapshot(product_id)
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Current Stock", snapshot['inventory']['quantity'])
+col2.metric("Reorder Point", snapshot['inventory']['reorder_point'])
+col3.metric("Active Purchase Orders", len(snapshot['purchase_orders']))
+col4.metric("Active Shipments", len(snapshot['shipments']))
+
+decisions, decision_count = load_decision_history(product_id)
+with st.expander(f"Decision History ({decision_count} logged)"):
+    if decisions:
+        st.dataframe(
+            [
+                {
+                    'Time': d['timestamp'],
+                    'Decision': d['decision_type'] or d['decision'],
+                    'Quantity': d['quantity'],
+                    'Supplier': d['supplier_id'],
+                    'PO': d['po_id'],
+                    'By': d['agent_name']
+                }
+                for d in decisions
+            ],
+            hide_index=True
+        )
+    else:
+        st.write("No decisions logged for this product yet")
+
+# Run button: queue the cycle in the background and return immediately
+if st.button("Run Supply Chain Decision Cycle", type="primary", use_container_width=True):
+    try:
+        st.session_state['job'] = get_cycle_runner().submit(product_id)
+    except QueueFullError as e:
+        st.error(f"Too many cycles running, try again shortly: {e}")
+
+st.markdown("---")
+
+if st.session_state.get('job') is not None:
+    # Explanations backfilled after the cycle show on the next page rerun
+    render_job(st.session_state['job'])
 else:
     st.info("Select a product and click 'Run Supply Chain Decision Cycle' to begin")
@@ -0,0 +1,80 @@
+"""
+Decision search page for the Supply Chain Control Tower.
+
+Full-text search over every logged decision's summary and reasoning
+(search_decisions, backed by the decision_search FTS5 index), ranked by
+relevance and paginated in SQL.
+"""
+
+import streamlit as st
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from db_service import search_decisions, SEARCH_COUNT_LIMIT
+from records import to_dict
+
+
+# Results per page
+PAGE_SIZE = 20
+
+# Characters of reasoning shown before "Show full reasoning"
+EXCERPT_LENGTH = 300
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_results(query, product_id, page):
+    decisions, total = search_decisions(
+        query, product_id=product_id, limit=PAGE_SIZE, offset=page * PAGE_SIZE
+    )
+    return to_dict(decisions), total
+
+
+st.set_page_config(
+    page_title="Decision Search",
+    layout="wide"
+)
+
+st.title("Decision Search")
+st.caption('Find decisions by words in their reasoning, e.g. "overdue", "expedite", a supplier name. '
+           'All words must match; end a word with * to match prefixes.')
+
+col1, col2 = st.columns([3, 1])
+query = col1.text_input("Search decisions", key="decision_query")
+product_filter = col2.number_input("Product ID (optional)", min_value=0, value=0, step=1)
+product_id = int(product_filter) or None
+
+st.markdown("---")
+
+if not query.strip():
+    st.info("Enter search terms to find decisions")
+    st.stop()
+
+_, total = load_results(query, product_id, 0)
+page_count = max(1, -(-total // PAGE_SIZE))
+page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1) - 1
+decisions, total = load_results(query, product_id, page)
+
+if product_id is not None:
+    st.caption(f"{total} matching decisions for product {product_id}, page {page + 1} of {page_count}, newest first")
+elif total < SEARCH_COUNT_LIMIT:
+    st.caption(f"{total} matching decisions, page {page + 1} of {page_count}, best matches first")
+else:
+    st.caption(f"{SEARCH_COUNT_LIMIT:,}+ matching decisions, page {page + 1}, newest first "
+               "(add words to narrow the search and rank by relevance)")
+
+if not decisions:
+    st.info("No decisions match the search")
+
+for d in decisions:
+    product = f"product {d['product_id']}" if d['product_id'] is not None else "no product"
+    st.markdown(f"**#{d['id']} · {d['decision']}** · {product} · {d['agent_name']} · {d['timestamp'][:19]}")
+    reasoning = d['reasoning'] or ''
+    if len(reasoning) <= EXCERPT_LENGTH:
+        st.write(reasoning)
+    else:
+        st.write(reasoning[:EXCERPT_LENGTH] + "...")
+        with st.expander("Show full reasoning"):
+            st.write(reasoning)
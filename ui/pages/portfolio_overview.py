@@ -0,0 +1,72 @@
+"""
+Portfolio overview page for the Supply Chain Control Tower.
+
+Shows portfolio-wide health at a glance. Every figure comes from SQL
+aggregates (read_portfolio_overview), never from per-product snapshots,
+so the page costs the same few queries for 3 SKUs or 100k.
+"""
+
+import streamlit as st
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from db_service import read_portfolio_overview
+
+
+# Seconds the figures stay cached (shared by every session)
+OVERVIEW_TTL_S = 15
+
+# Window for the decision and approval figures
+OVERVIEW_HOURS = 24
+
+
+@st.cache_data(ttl=OVERVIEW_TTL_S, show_spinner=False)
+def load_overview(hours):
+    return read_portfolio_overview(hours=hours)
+
+
+st.set_page_config(
+    page_title="Portfolio Overview",
+    layout="wide"
+)
+
+st.title("Portfolio Overview")
+st.caption(f"All products; decision figures cover the last {OVERVIEW_HOURS} hours")
+
+st.markdown("---")
+
+overview = load_overview(OVERVIEW_HOURS)
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Products", f"{overview['products']:,}")
+col2.metric("Below Reorder Point", f"{overview['below_reorder_point']:,}")
+col3.metric("Overdue Shipments", f"{overview['overdue_shipments']:,}")
+col4.metric(
+    "Pending Approvals",
+    f"{overview['pending_approvals']:,}",
+    help=(
+        "Approval requests whose cycle has not executed a decision yet; "
+        f"{overview['approval_requests']:,} approvals requested in the window"
+    )
+)
+
+st.subheader("Decisions per Hour")
+decisions_per_hour = overview['decisions_per_hour']
+if decisions_per_hour:
+    st.bar_chart(
+        {
+            'hour': [hour for hour, _ in decisions_per_hour],
+            'decisions': [count for _, count in decisions_per_hour]
+        },
+        x='hour',
+        y='decisions'
+    )
+    st.caption(
+        f"{overview['decisions']:,} decisions, "
+        f"{overview['decisions'] / OVERVIEW_HOURS:,.1f} per hour on average"
+    )
+else:
+    st.info("No decisions logged in the window")